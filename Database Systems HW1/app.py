@@ -1,26 +1,14 @@
-from flask import Flask, request, jsonify, render_template
+from flask import Flask, request, jsonify, render_template, url_for
 import mysql.connector
 from mysql.connector import Error
+import base64
+import binascii
+import json
 
-app = Flask(__name__)
+from db import pool
+import bulk_import
 
- # MySQL connection settings
-db_config = {
-    'host': 'localhost',
-    'user': 'root',
-    'password': 'maverick2005',
-    'database': 'flask_demo',
-    'port': 3306
-}
-
-def get_db_connection():
-    """Create a database connection"""
-    try:
-        conn = mysql.connector.connect(**db_config)
-        return conn
-    except Error as e:
-        print("Database connection error:", e)
-        return None
+app = Flask(__name__)
 
 # Home page
 @app.route('/')
@@ -40,19 +28,12 @@ def add_employee():
         if not all([employee_ID, employee_name, first_name, last_name]):
             return jsonify({"error": "Please fill in all fields"}), 400
 
-        conn = get_db_connection()
-        if conn is None:
-            return jsonify({"error": "Cannot connect to the database"}), 500
-
-        cursor = conn.cursor()
         insert_query = """
         INSERT INTO employee (employee_ID, employee_name, first_name, last_name)
         VALUES (%s, %s, %s, %s)
         """
-        cursor.execute(insert_query, (employee_ID, employee_name, first_name, last_name))
-        conn.commit()
-        cursor.close()
-        conn.close()
+        with pool.cursor() as cursor:
+            cursor.execute(insert_query, (employee_ID, employee_name, first_name, last_name))
 
         return jsonify({"message": f"Employee {employee_name} (ID: {employee_ID}) added successfully!"}), 200
 
@@ -61,33 +42,110 @@ def add_employee():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-# Show all employees
+# API: Bulk import employees from a streamed CSV or NDJSON upload
+#   curl -T employees.csv -H 'Content-Type: text/csv' \
+#        'http://127.0.0.1:5000/import_employees?batch_size=5000&on_duplicate=upsert'
+@app.route('/import_employees', methods=['POST'])
+def import_employees():
+    fmt = request.args.get('format')
+    if fmt is None:
+        fmt = 'csv' if request.mimetype in ('text/csv', 'application/csv') else 'ndjson'
+    if fmt not in bulk_import.PARSERS:
+        return jsonify({"error": "format must be csv or ndjson"}), 400
+    on_duplicate = request.args.get('on_duplicate', 'skip')
+    if on_duplicate not in bulk_import.ON_DUPLICATE:
+        return jsonify({"error": "on_duplicate must be skip or upsert"}), 400
+    batch_size = request.args.get('batch_size', bulk_import.DEFAULT_BATCH_SIZE, type=int)
+    if not 1 <= batch_size <= bulk_import.MAX_BATCH_SIZE:
+        return jsonify({"error": f"batch_size must be 1-{bulk_import.MAX_BATCH_SIZE}"}), 400
+
+    try:
+        # request.stream is read incrementally; the upload is never held in memory
+        result = bulk_import.import_employees(request.stream, fmt, batch_size, on_duplicate)
+    except Error as e:
+        print("Database error:", e)
+        return jsonify({"error": "Cannot connect to the database"}), 500
+    return jsonify(result), 200
+
+# Employee list paging
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+SORTS = {'id': ['employee_ID'], 'name': ['employee_name', 'employee_ID']}
+COLUMNS = ['employee_ID', 'employee_name', 'first_name', 'last_name']
+
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip('=')
+
+
+def decode_cursor(token, size):
+    """Sort-key values of the last row on the previous page, or None if malformed"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+    except (ValueError, binascii.Error):
+        return None
+    return values if isinstance(values, list) and len(values) == size else None
+
+
+# Show employees, one page at a time
 @app.route('/show')
 def show():
-    conn = get_db_connection()
-    if conn is None:
+    sort = request.args.get('sort', 'id')
+    if sort not in SORTS:
+        return "sort must be id or name", 400
+    descending = request.args.get('order') == 'desc'
+    limit = min(max(request.args.get('limit', PAGE_SIZE, type=int), 1), MAX_PAGE_SIZE)
+    prefix = request.args.get('q', '').strip()
+    after = request.args.get('after')
+
+    keys = SORTS[sort]
+    direction = 'DESC' if descending else 'ASC'
+    where, params = [], []
+    if prefix:
+        where.append("employee_name LIKE %s")
+        params.append(prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%')
+    if after:
+        values = decode_cursor(after, len(keys))
+        if values is None:
+            return "Invalid cursor", 400
+        # keyset: continue right after the last row of the previous page
+        where.append("({}) {} ({})".format(
+            ', '.join(keys), '<' if descending else '>', ', '.join(['%s'] * len(keys))
+        ))
+        params += values
+
+    query = "SELECT {} FROM employee {} ORDER BY {} LIMIT %s".format(
+        ', '.join(COLUMNS),
+        'WHERE ' + ' AND '.join(where) if where else '',
+        ', '.join(f'{k} {direction}' for k in keys),
+    )
+    try:
+        with pool.cursor() as cursor:
+            cursor.execute(query, params + [limit + 1])
+            employees = cursor.fetchall()
+    except Error as e:
+        print("Database error:", e)
         return "Cannot connect to the database", 500
 
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM employee")
-    employees = cursor.fetchall()
-    cursor.close()
-    conn.close()
-    return render_template('show.html', employees=employees)
+    args = request.args.to_dict()
+    args.pop('after', None)
+    first_url = url_for('show', **args) if after else None
+    next_url = None
+    if len(employees) > limit:
+        employees = employees[:limit]
+        last = employees[-1]
+        next_url = url_for('show', **args, after=encode_cursor([last[COLUMNS.index(k)] for k in keys]))
+
+    return render_template('show.html', employees=employees, next_url=next_url,
+                           first_url=first_url, sort=sort,
+                           order='desc' if descending else 'asc', limit=limit, q=prefix)
 
 # Delete employee
 @app.route('/delete_employee/<int:employee_ID>', methods=['POST'])
 def delete_employee(employee_ID):
-    conn = get_db_connection()
-    if conn is None:
-        return "Cannot connect to the database", 500
-
     try:
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM employee WHERE employee_ID = %s", (employee_ID,))
-        conn.commit()
-        cursor.close()
-        conn.close()
+        with pool.cursor() as cursor:
+            cursor.execute("DELETE FROM employee WHERE employee_ID = %s", (employee_ID,))
         return jsonify({"message": f"Employee ID {employee_ID} deleted successfully"}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
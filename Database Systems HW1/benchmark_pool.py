@@ -0,0 +1,81 @@
+"""
+Requests/sec for the /show query with a fresh connection per request (the
+old get_db_connection) versus the pooled data-access layer in db.py, at
+1-64 concurrent clients. Needs a local MySQL (or MariaDB) with the
+employee table from the README.
+
+    python benchmark_pool.py
+    MYSQL_POOL_SIZE=16 python benchmark_pool.py --seconds 10
+"""
+import argparse
+import threading
+import time
+
+import mysql.connector
+
+from db import db_config, pool
+
+LEVELS = (1, 2, 4, 8, 16, 32, 64)
+
+
+def per_request_connect():
+    conn = mysql.connector.connect(**db_config)
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM employee")
+        cursor.fetchall()
+        cursor.close()
+    finally:
+        conn.close()
+
+
+def pooled():
+    with pool.cursor() as cursor:
+        cursor.execute("SELECT * FROM employee")
+        cursor.fetchall()
+
+
+def run(fn, clients, seconds):
+    done, errors = [0], [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def client():
+        n = bad = 0
+        while time.perf_counter() < deadline:
+            try:
+                fn()
+                n += 1
+            except mysql.connector.Error:
+                # e.g. "Too many connections" when each client opens its own
+                bad += 1
+        with lock:
+            done[0] += n
+            errors[0] += bad
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return done[0] / (time.perf_counter() - start), errors[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-request connect vs pooled connections")
+    parser.add_argument("--seconds", type=float, default=5, help="per concurrency level")
+    args = parser.parse_args()
+
+    print(f"pool_size={pool.size}, {args.seconds:g}s per level")
+    print(f"{'clients':>7} {'connect rps':>12} {'err':>5} {'pooled rps':>12} {'err':>5} {'speedup':>8}")
+    for clients in LEVELS:
+        before, before_err = run(per_request_connect, clients, args.seconds)
+        after, after_err = run(pooled, clients, args.seconds)
+        speedup = after / before if before else float("inf")
+        print(f"{clients:>7} {before:>12.1f} {before_err:>5} {after:>12.1f} {after_err:>5} "
+              f"{speedup:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
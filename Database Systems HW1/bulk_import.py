@@ -0,0 +1,151 @@
+import csv
+import io
+import json
+import time
+
+from mysql.connector import Error
+
+from db import pool
+
+FIELDS = ('employee_ID', 'employee_name', 'first_name', 'last_name')
+MAX_NAME_LENGTH = 100  # VARCHAR(100) in the employee table
+DEFAULT_BATCH_SIZE = 1000
+MAX_BATCH_SIZE = 10000
+MAX_REPORTED_ERRORS = 20
+
+INSERT_SQL = """
+INSERT INTO employee (employee_ID, employee_name, first_name, last_name)
+VALUES (%s, %s, %s, %s)
+ON DUPLICATE KEY UPDATE {}
+"""
+ON_DUPLICATE = {
+    # no-op assignment: duplicates are left untouched
+    'skip': INSERT_SQL.format('employee_ID = employee_ID'),
+    'upsert': INSERT_SQL.format(
+        'employee_name = VALUES(employee_name), first_name = VALUES(first_name), '
+        'last_name = VALUES(last_name)'
+    ),
+}
+
+
+def parse_csv(text):
+    """Yield (line number, dict) from CSV text with a header row."""
+    reader = csv.DictReader(text)
+    for record in reader:
+        yield reader.line_num, record
+
+
+def parse_ndjson(text):
+    """Yield (line number, dict) from newline-delimited JSON; bad lines yield the error."""
+    for line_num, line in enumerate(text, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_num, f"invalid JSON: {e}"
+            continue
+        yield line_num, record if isinstance(record, dict) else "expected a JSON object"
+
+
+PARSERS = {'csv': parse_csv, 'ndjson': parse_ndjson}
+
+
+def validate(record):
+    """Row tuple for the INSERT, or raise ValueError."""
+    if not isinstance(record, dict):
+        raise ValueError(record)
+    values = [record.get(f) for f in FIELDS]
+    if any(v is None or str(v).strip() == '' for v in values):
+        raise ValueError("missing " + ", ".join(f for f, v in zip(FIELDS, values)
+                                                if v is None or str(v).strip() == ''))
+    try:
+        employee_id = int(values[0])
+    except (TypeError, ValueError):
+        raise ValueError(f"employee_ID must be an integer, got {values[0]!r}")
+    names = [str(v).strip() for v in values[1:]]
+    if any(len(n) > MAX_NAME_LENGTH for n in names):
+        raise ValueError(f"names are limited to {MAX_NAME_LENGTH} characters")
+    return (employee_id, *names)
+
+
+def import_employees(stream, fmt, batch_size=DEFAULT_BATCH_SIZE, on_duplicate='skip'):
+    """
+    Stream rows from a binary file-like object into the employee table.
+
+    Rows are parsed and validated one at a time and written with
+    executemany in batches of batch_size, committing once per batch, so
+    memory stays flat however large the upload is. A batch that the
+    database rejects is rolled back and counted as failed; the import
+    carries on with the next one.
+    """
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    sql = ON_DUPLICATE[on_duplicate]
+    counts = {'inserted': 0, 'updated': 0, 'skipped': 0, 'failed': 0, 'batches': 0}
+    errors = []
+    start = time.perf_counter()
+
+    def error(line, message):
+        counts['failed'] += 1
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append({'line': line, 'error': message})
+
+    def flush(conn, cursor, batch):
+        # one row per ID; within a batch the first wins for skip, the last for upsert
+        rows = {}
+        for row in batch:
+            if row[0] in rows and on_duplicate == 'skip':
+                counts['skipped'] += 1
+                continue
+            if row[0] in rows:
+                counts['updated'] += 1
+            rows[row[0]] = row
+        ids = list(rows)
+        try:
+            # exact inserted/duplicate split; rowcount from ON DUPLICATE KEY can't give it
+            cursor.execute(
+                "SELECT employee_ID FROM employee WHERE employee_ID IN ({})".format(
+                    ', '.join(['%s'] * len(ids))), ids)
+            existing = len(cursor.fetchall())
+            cursor.executemany(sql, list(rows.values()))
+            conn.commit()
+        except Error as e:
+            conn.rollback()
+            counts['failed'] += len(rows)
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append({'batch': counts['batches'] + 1, 'error': str(e)})
+        else:
+            counts['inserted'] += len(rows) - existing
+            counts['updated' if on_duplicate == 'upsert' else 'skipped'] += existing
+        counts['batches'] += 1
+
+    with pool.connection() as conn:
+        cursor = conn.cursor()
+        try:
+            batch = []
+            for line, record in PARSERS[fmt](text):
+                try:
+                    batch.append(validate(record))
+                except ValueError as e:
+                    error(line, str(e))
+                    continue
+                if len(batch) >= batch_size:
+                    flush(conn, cursor, batch)
+                    batch = []
+            if batch:
+                flush(conn, cursor, batch)
+        except (UnicodeDecodeError, csv.Error) as e:
+            error(None, f"could not parse upload: {e}")
+        finally:
+            cursor.close()
+
+    elapsed = time.perf_counter() - start
+    rows = counts['inserted'] + counts['updated'] + counts['skipped'] + counts['failed']
+    return {
+        **counts,
+        'rows': rows,
+        'seconds': round(elapsed, 3),
+        'rows_per_second': round(rows / elapsed, 1) if elapsed else None,
+        'errors': errors,
+    }
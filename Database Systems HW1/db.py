@@ -0,0 +1,97 @@
+import os
+import threading
+from contextlib import contextmanager
+
+from mysql.connector import Error, PoolError, pooling
+
+# MySQL connection settings (override with environment variables)
+db_config = {
+    'host': os.getenv('MYSQL_HOST', 'localhost'),
+    'user': os.getenv('MYSQL_USER', 'root'),
+    'password': os.getenv('MYSQL_PASSWORD', 'maverick2005'),
+    'database': os.getenv('MYSQL_DATABASE', 'flask_demo'),
+    'port': int(os.getenv('MYSQL_PORT', 3306))
+}
+
+# mysql.connector caps a pool at 32 connections
+POOL_SIZE = min(int(os.getenv('MYSQL_POOL_SIZE', 10)), pooling.CNX_POOL_MAXSIZE)
+POOL_TIMEOUT = float(os.getenv('MYSQL_POOL_TIMEOUT', 5))
+
+
+class PoolTimeout(PoolError):
+    """No pooled connection became free within POOL_TIMEOUT seconds."""
+
+
+class ConnectionPool:
+    """
+    Bounded pool of MySQL connections.
+
+    mysql.connector's own pool raises as soon as it is empty, so callers
+    wait on a semaphore instead: at most POOL_SIZE connections are ever
+    open, and extra requests queue for up to POOL_TIMEOUT seconds.
+    The pool is created lazily so the app can start before MySQL is up.
+    """
+
+    def __init__(self, config, size=POOL_SIZE, timeout=POOL_TIMEOUT):
+        self.config = config
+        self.size = size
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._pool = None
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = pooling.MySQLConnectionPool(
+                    pool_name='hw1', pool_size=self.size,
+                    pool_reset_session=True, **self.config
+                )
+            return self._pool
+
+    def _checkout(self):
+        conn = self._get_pool().get_connection()
+        try:
+            # health check: reconnects a connection the server dropped while idle
+            conn.ping(reconnect=True, attempts=2, delay=0)
+        except Error:
+            conn.close()
+            raise
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """
+        Borrow a connection for one unit of work. Commits on success, rolls
+        back on any exception, and always returns the connection to the pool.
+        """
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PoolTimeout(msg='Timed out waiting for a database connection')
+        try:
+            conn = self._checkout()
+            try:
+                yield conn
+                conn.commit()
+            except BaseException:
+                try:
+                    conn.rollback()
+                except Error:
+                    pass
+                raise
+            finally:
+                conn.close()  # pooled connections go back to the pool
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def cursor(self, **kwargs):
+        """Shortcut for a connection plus a cursor that is always closed."""
+        with self.connection() as conn:
+            cursor = conn.cursor(**kwargs)
+            try:
+                yield cursor
+            finally:
+                cursor.close()
+
+
+pool = ConnectionPool(db_config)
@@ -0,0 +1,8 @@
+-- Index for the paginated /show page (name sort, name-prefix filter).
+-- Run once against the app database:
+--   mysql -u root -p flask_demo < migrations/001_employee_name_index.sql
+--
+-- InnoDB appends the primary key (employee_ID) to secondary indexes, so this
+-- also covers the (employee_name, employee_ID) keyset comparison.
+
+CREATE INDEX ix_employee_name ON employee (employee_name);
@@ -1,31 +1,167 @@
-from flask import Flask, render_template, request, redirect
+from flask import Flask, render_template, request, redirect, g, abort, url_for
 import mysql.connector
+from mysql.connector import pooling
+import base64
+import binascii
+import json
+import os
+import threading
 
 app = Flask(__name__)
 
- # ✅ Connect to MySQL
-db = mysql.connector.connect(
-    host="localhost",
-    user="root",          # change if needed
-    password="maverick2005",  # change this to your actual MySQL password
-    database="flask_demo"
-)
-cursor = db.cursor(dictionary=True)
+ # ✅ MySQL settings (override with environment variables)
+db_config = {
+    "host": os.getenv("MYSQL_HOST", "localhost"),
+    "user": os.getenv("MYSQL_USER", "root"),          # change if needed
+    "password": os.getenv("MYSQL_PASSWORD", "maverick2005"),  # change this to your actual MySQL password
+    "database": os.getenv("MYSQL_DATABASE", "flask_demo"),
+}
+POOL_SIZE = min(int(os.getenv("MYSQL_POOL_SIZE", 10)), pooling.CNX_POOL_MAXSIZE)
+POOL_TIMEOUT = float(os.getenv("MYSQL_POOL_TIMEOUT", 5))
 
-# ✅ Home route: show employees with department + project join
+# ✅ Connection pool, created on first use so the app can start before MySQL.
+# mysql.connector's pool errors out when empty, so requests queue on a
+# semaphore for a free slot instead.
+_pool = None
+_pool_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(POOL_SIZE)
+
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = pooling.MySQLConnectionPool(
+                pool_name="hw2", pool_size=POOL_SIZE, pool_reset_session=True, **db_config
+            )
+        return _pool
+
+
+def get_cursor():
+    """Dictionary cursor for this request, on a connection borrowed from the pool."""
+    if "db" not in g:
+        if not _slots.acquire(timeout=POOL_TIMEOUT):
+            abort(503, "Database busy, try again")
+        try:
+            conn = get_pool().get_connection()
+            # reconnect if the server dropped this connection while it sat idle
+            conn.ping(reconnect=True, attempts=3, delay=0.2)
+        except Exception:
+            _slots.release()
+            raise
+        g.db = conn
+        g.cursor = conn.cursor(dictionary=True)
+    return g.cursor
+
+
+@app.teardown_appcontext
+def release_db(exc):
+    """Close the request's cursor and hand its connection back to the pool."""
+    conn = g.pop("db", None)
+    if conn is None:
+        return
+    try:
+        g.pop("cursor").close()
+        if exc is not None:
+            conn.rollback()
+    except mysql.connector.Error:
+        pass  # broken connection: the pool reconnects it on next checkout
+    finally:
+        try:
+            conn.close()
+        except mysql.connector.Error:
+            pass
+        _slots.release()
+
+# ✅ Listing: keyset-paginated, sorted and filtered in SQL
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+SORTS = {"id": ["employee_id"], "name": ["employee_name", "employee_id"]}
+
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+
+def decode_cursor(token, size):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    except (ValueError, binascii.Error):
+        abort(400, "Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        abort(400, "Invalid cursor")
+    return values
+
+
+def like_prefix(prefix):
+    return prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+# ✅ Home route: one page of employees with department + project join
 @app.route('/')
 def index():
-    query = """
+    sort = request.args.get("sort", "id")
+    if sort not in SORTS:
+        abort(400, "sort must be id or name")
+    descending = request.args.get("order") == "desc"
+    limit = min(max(request.args.get("limit", PAGE_SIZE, type=int), 1), MAX_PAGE_SIZE)
+    department_id = request.args.get("department_id", type=int)
+    prefix = request.args.get("q", "").strip()
+    after = request.args.get("after")
+
+    columns = SORTS[sort]
+    direction = "DESC" if descending else "ASC"
+    where, params = [], []
+    if department_id is not None:
+        where.append("department_id = %s")
+        params.append(department_id)
+    if prefix:
+        where.append("employee_name LIKE %s")
+        params.append(like_prefix(prefix))
+    if after:
+        # (employee_name, employee_id) > (%s, %s): resumes right after the last row shown
+        where.append("({}) {} ({})".format(
+            ", ".join(columns), "<" if descending else ">", ", ".join(["%s"] * len(columns))
+        ))
+        params += decode_cursor(after, len(columns))
+
+    # page through employee alone (index range scan + LIMIT), then join only that page
+    query = f"""
     SELECT e.employee_id, e.employee_name, e.first_name, e.last_name,
-           d.department_name, p.project_name
-    FROM employee e
+           e.department_id, d.department_name,
+           GROUP_CONCAT(p.project_name ORDER BY p.project_name SEPARATOR ', ') AS project_name
+    FROM (
+        SELECT employee_id, employee_name, first_name, last_name, department_id
+        FROM employee
+        {"WHERE " + " AND ".join(where) if where else ""}
+        ORDER BY {", ".join(f"{c} {direction}" for c in columns)}
+        LIMIT %s
+    ) e
     LEFT JOIN department d ON e.department_id = d.department_id
     LEFT JOIN project p ON d.department_id = p.department_id
-    ORDER BY e.employee_id;
+    GROUP BY e.employee_id, e.employee_name, e.first_name, e.last_name,
+             e.department_id, d.department_name
+    ORDER BY {", ".join(f"e.{c} {direction}" for c in columns)};
     """
-    cursor.execute(query)
+    cursor = get_cursor()
+    cursor.execute(query, params + [limit + 1])
     employees = cursor.fetchall()
-    return render_template('index.html', employees=employees)
+
+    args = request.args.to_dict()
+    args.pop("after", None)
+    first_url = url_for("index", **args) if after else None
+    next_url = None
+    if len(employees) > limit:
+        employees = employees[:limit]
+        next_url = url_for("index", **args, after=encode_cursor([employees[-1][c] for c in columns]))
+
+    cursor.execute("SELECT department_id, department_name FROM department ORDER BY department_name")
+    departments = cursor.fetchall()
+    return render_template(
+        'index.html', employees=employees, departments=departments,
+        next_url=next_url, first_url=first_url, sort=sort, order="desc" if descending else "asc", limit=limit,
+        department_id=department_id, q=prefix,
+    )
 
 # ✅ Create new employee
 @app.route('/add', methods=['POST'])
@@ -35,11 +171,12 @@ def add_employee():
     last_name = request.form['last_name']
     department_id = request.form['department_id']
 
+    cursor = get_cursor()
     cursor.execute("""
         INSERT INTO employee (employee_name, first_name, last_name, department_id)
         VALUES (%s, %s, %s, %s)
     """, (employee_name, first_name, last_name, department_id))
-    db.commit()
+    g.db.commit()
     return redirect('/')
 
 # ✅ Update employee
@@ -50,19 +187,21 @@ def update_employee(id):
     last_name = request.form['last_name']
     department_id = request.form['department_id']
 
+    cursor = get_cursor()
     cursor.execute("""
         UPDATE employee
         SET employee_name=%s, first_name=%s, last_name=%s, department_id=%s
         WHERE employee_id=%s
     """, (employee_name, first_name, last_name, department_id, id))
-    db.commit()
+    g.db.commit()
     return redirect('/')
 
 # ✅ Delete employee
 @app.route('/delete/<int:id>')
 def delete_employee(id):
+    cursor = get_cursor()
     cursor.execute("DELETE FROM employee WHERE employee_id = %s", (id,))
-    db.commit()
+    g.db.commit()
     return redirect('/')
 
 if __name__ == '__main__':
@@ -0,0 +1,14 @@
+-- Indexes for the paginated employee listing (app.py index route).
+-- Run once against the app database:
+--   mysql -u root -p flask_demo < migrations/001_listing_indexes.sql
+--
+-- InnoDB appends the primary key to every secondary index, so
+-- (department_id) also serves "WHERE department_id = ? AND employee_id > ?
+-- ORDER BY employee_id", and (employee_name) serves the name sort, the
+-- (employee_name, employee_id) keyset and "employee_name LIKE 'prefix%'".
+-- If a FOREIGN KEY already created an index on department_id, MySQL
+-- reports a duplicate index warning and keeps both; drop the old one if so.
+
+CREATE INDEX ix_employee_department_id ON employee (department_id);
+CREATE INDEX ix_employee_name ON employee (employee_name);
+CREATE INDEX ix_project_department_id ON project (department_id);
@@ -0,0 +1,167 @@
+"""
+Concurrent stress test for the HW2 app.
+
+Start the app first (threaded dev server or e.g. `gunicorn -w 1 --threads 16
+app:app`), then:
+
+    python stress_test.py --url http://127.0.0.1:5000 --threads 1 2 4 8 16
+
+Every worker loops add -> list (filtered to its own row) -> update on its
+own tagged employees while the others do the same, and each page it reads
+is checked for rows whose columns got mixed up between requests. After each
+level all tagged rows, read back page by page, must exist once with their
+updated values; they are deleted afterwards.
+Prints requests/sec per thread count and exits non-zero on any mismatch.
+"""
+import argparse
+import re
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from html import unescape
+
+ROW = re.compile(
+    r"<td>(\d+)</td>\s*<td>([^<]*)</td>\s*<td>([^<]*)</td>\s*<td>([^<]*)</td>"
+)
+NEXT = re.compile(r'<a rel="next" href="([^"]+)"')
+
+
+class NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+opener = urllib.request.build_opener(NoRedirect)
+
+
+def call(url, form=None):
+    data = urllib.parse.urlencode(form).encode() if form is not None else None
+    try:
+        with opener.open(url, data=data, timeout=30) as resp:
+            return resp.status, resp.read().decode()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read().decode(errors="replace")
+
+
+def tagged_rows(html, tag):
+    """{employee_id: (name, first, last)} for this run's rows; checks each row is consistent."""
+    rows, problems = {}, []
+    for emp_id, name, first, last in ROW.findall(html):
+        if not name.startswith(tag):
+            continue
+        key = name[len(tag):].removesuffix("-u")
+        if first != "F" + name[len(tag):] or last != "L" + key:
+            problems.append(f"row {emp_id} mixes columns: {name!r} {first!r} {last!r}")
+        rows[int(emp_id)] = (name, first, last)
+    return rows, problems
+
+
+def list_tagged(base, tag):
+    """All of this run's rows, following the listing's next-page links."""
+    rows, problems = {}, []
+    url = f"{base}/?" + urllib.parse.urlencode({"q": tag, "limit": 200})
+    while url:
+        status, html = call(url)
+        if status != 200:
+            return rows, problems + [f"/ returned {status}"]
+        page, bad = tagged_rows(html, tag)
+        rows.update(page)
+        problems += bad
+        link = NEXT.search(html)
+        url = base + unescape(link.group(1)) if link else None
+    return rows, problems
+
+
+def run_level(base, threads, seconds, department_id):
+    tag = f"st{uuid.uuid4().hex[:8]}-"
+    requests, problems = [0], []
+    created = {}  # (worker, i) -> employee_id
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def worker(w):
+        n, i = 0, 0
+        while time.perf_counter() < deadline:
+            key = f"{w}.{i}"
+            status, _ = call(f"{base}/add", {
+                "employee_name": tag + key, "first_name": "F" + key,
+                "last_name": "L" + key, "department_id": department_id,
+            })
+            n += 1
+            if status != 302:
+                with lock:
+                    problems.append(f"/add returned {status}")
+                break
+
+            status, html = call(f"{base}/?" + urllib.parse.urlencode({"q": tag + key}))
+            n += 1
+            rows, bad = tagged_rows(html, tag)
+            mine = [emp_id for emp_id, (name, _, _) in rows.items() if name == tag + key]
+            if status != 200 or bad or len(mine) != 1:
+                with lock:
+                    problems.extend(bad or [f"/ returned {status}, {len(mine)} rows for {key}"])
+                break
+
+            status, _ = call(f"{base}/update/{mine[0]}", {
+                "employee_name": tag + key + "-u", "first_name": "F" + key + "-u",
+                "last_name": "L" + key, "department_id": department_id,
+            })
+            n += 1
+            if status != 302:
+                with lock:
+                    problems.append(f"/update returned {status}")
+                break
+            with lock:
+                created[(w, i)] = mine[0]
+            i += 1
+        with lock:
+            requests[0] += n
+
+    workers = [threading.Thread(target=worker, args=(w,)) for w in range(threads)]
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    # final state: every row exactly once, with the update applied
+    rows, bad = list_tagged(base, tag)
+    problems += bad
+    for (w, i), emp_id in created.items():
+        if rows.get(emp_id, ("",))[0] != f"{tag}{w}.{i}-u":
+            problems.append(f"employee {emp_id} missing or not updated")
+    for emp_id in rows:
+        call(f"{base}/delete/{emp_id}")
+
+    return requests[0] / elapsed, len(created), problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent integrity/throughput test")
+    parser.add_argument("--url", default="http://127.0.0.1:5000")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--seconds", type=float, default=5, help="per thread count")
+    parser.add_argument("--department-id", default="1", help="an existing department")
+    args = parser.parse_args()
+
+    base = args.url.rstrip("/")
+    baseline, failed = None, False
+    print(f"{'threads':>7} {'req/s':>9} {'scaling':>8} {'employees':>9}  result")
+    for threads in args.threads:
+        rps, employees, problems = run_level(base, threads, args.seconds, args.department_id)
+        baseline = baseline or rps
+        print(f"{threads:>7} {rps:>9.1f} {rps / baseline:>7.1f}x {employees:>9}  "
+              f"{'ok' if not problems else 'FAIL'}")
+        for p in problems[:5]:
+            print(f"        {p}")
+        failed |= bool(problems)
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,11 @@
-import os, json
-from flask import Flask, render_template, request, redirect, url_for, flash
+import os, io, re
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, make_response
 from pymongo import MongoClient
+from pymongo.errors import PyMongoError
 from bson.objectid import ObjectId
 
+import ingest
+
 app = Flask(__name__)
 app.secret_key = "devkey"  # For flash messages
 
@@ -14,11 +17,62 @@ client = MongoClient(MONGODB_URI)
 db = client.get_database(DBNAME)
 users = db.get_collection("users")
 
+# --- Indexes for the listing filters (created once at startup) ---
+def ensure_indexes():
+    try:
+        users.create_index("name")
+        users.create_index("age")
+    except PyMongoError as e:
+        print("Could not create indexes:", e)
+
+ensure_indexes()
+
 # --- Routes ---
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+LIST_FIELDS = {"name": 1, "age": 1}  # only what index.html renders (_id is implied)
+
 @app.route("/", methods=["GET"])
 def index():
-    items = list(users.find().sort("_id", -1))
-    return render_template("index.html", items=items)
+    limit = min(max(request.args.get("limit", PAGE_SIZE, type=int), 1), MAX_PAGE_SIZE)
+    prefix = request.args.get("q", "").strip()
+    min_age = request.args.get("min_age", type=int)
+    max_age = request.args.get("max_age", type=int)
+    after = request.args.get("after")
+
+    query = {}
+    if prefix:
+        # anchored, case-sensitive prefix regex can use the name index
+        query["name"] = {"$regex": "^" + re.escape(prefix)}
+    if min_age is not None or max_age is not None:
+        query["age"] = {}
+        if min_age is not None:
+            query["age"]["$gte"] = min_age
+        if max_age is not None:
+            query["age"]["$lte"] = max_age
+    if after:
+        if not ObjectId.is_valid(after):
+            flash("Invalid page link.")
+            return redirect(url_for("index"))
+        # newest first: the next page continues below the last _id shown
+        query["_id"] = {"$lt": ObjectId(after)}
+
+    items = list(users.find(query, LIST_FIELDS).sort("_id", -1).limit(limit + 1))
+    args = request.args.to_dict()
+    args.pop("after", None)
+    first_url = url_for("index", **args) if after else None
+    next_url = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_url = url_for("index", **args, after=str(items[-1]["_id"]))
+
+    total = users.estimated_document_count()
+    response = make_response(render_template(
+        "index.html", items=items, total=total, next_url=next_url, first_url=first_url,
+        q=prefix, min_age=min_age, max_age=max_age, limit=limit,
+    ))
+    response.headers["X-Estimated-Total-Count"] = str(total)
+    return response
 
 @app.route("/insert_one", methods=["POST"])
 def insert_one():
@@ -31,20 +85,39 @@ def insert_one():
     flash("Added successfully!")
     return redirect(url_for("index"))
 
+def chunk_size_arg():
+    size = request.args.get("chunk_size", ingest.DEFAULT_CHUNK_SIZE, type=int)
+    return min(max(size, 1), ingest.MAX_CHUNK_SIZE)
+
 @app.route("/insert_many", methods=["POST"])
 def insert_many():
-    data = request.form.get("bulk_json", "").strip()
+    # uploaded file (JSON array or NDJSON) wins over the pasted text
+    upload = request.files.get("bulk_file")
+    if upload and upload.filename:
+        stream = upload.stream
+    else:
+        stream = io.BytesIO(request.form.get("bulk_json", "").encode())
     try:
-        json_data = json.loads(data)
-        if isinstance(json_data, list):
-            users.insert_many(json_data)
-            flash(f"Inserted {len(json_data)} users!")
-        else:
-            flash("Input must be a JSON array (list).")
+        report = ingest.bulk_insert(users, stream, chunk_size_arg())
     except Exception as e:
         flash(f"Error: {str(e)}")
+        return redirect(url_for("index"))
+
+    message = f"Inserted {report['inserted']} users in {len(report['chunks'])} chunk(s)"
+    if report["invalid"] or report["failed"]:
+        message += f"; {report['invalid']} invalid, {report['failed']} failed"
+    flash(message + "!")
+    for err in report["errors"][:5]:
+        where = f"Document {err['document']}" if "document" in err else f"Chunk {err['chunk']}"
+        flash(f"{where}: {err['error']}")
     return redirect(url_for("index"))
 
+@app.route("/api/users/bulk", methods=["POST"])
+def bulk_insert_api():
+    """Raw JSON-array / NDJSON body, read as it streams in; returns the full per-chunk report."""
+    report = ingest.bulk_insert(users, request.stream, chunk_size_arg())
+    return jsonify(report), 200 if report["inserted"] or not report["errors"] else 400
+
 @app.route("/delete/<id>", methods=["POST"])
 def delete(id):
     users.delete_one({"_id": ObjectId(id)})
@@ -1,7 +1,13 @@
-import os, json
-from flask import Flask, render_template, request, redirect, url_for, flash
+import os, io
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, make_response
 from pymongo import MongoClient
+from pymongo.errors import PyMongoError
 from bson.objectid import ObjectId
+from werkzeug.datastructures import MultiDict
+
+import ingest
+import bulk_delete
+import listing
 
 app = Flask(__name__)
 app.secret_key = "devkey"  # For flash messages
@@ -14,43 +20,89 @@ client = MongoClient(MONGODB_URI)
 db = client.get_database(DBNAME)
 users = db.get_collection("users")
 
+# --- Indexes for the listing filters (created once at startup) ---
+def ensure_indexes():
+    try:
+        users.create_index("name")
+        users.create_index("age")
+    except PyMongoError as e:
+        print("Could not create indexes:", e)
+
+ensure_indexes()
+
 # --- Routes ---
 @app.route("/", methods=["GET"])
 def index():
-    items = list(users.find().sort("_id", -1))
-    return render_template("index.html", items=items)
+    try:
+        query, limit = listing.page_query(request.args)
+    except ValueError as e:
+        flash(str(e))
+        return redirect(url_for("index"))
+
+    items = list(users.find(query, listing.LIST_FIELDS).sort("_id", -1).limit(limit + 1))
+    total = users.estimated_document_count()
+    response = make_response(render_template(
+        "index.html", total=total, **listing.page_context(request.args, items, limit, url_for)
+    ))
+    response.headers["X-Estimated-Total-Count"] = str(total)
+    return response
 
 @app.route("/insert_one", methods=["POST"])
 def insert_one():
-    name = request.form.get("name", "").strip()
-    age = request.form.get("age", "").strip()
-    if not name or not age.isdigit():
+    try:
+        user = ingest.normalize({"name": request.form.get("name"), "age": request.form.get("age")})
+    except ValueError:
         flash("Please enter a valid name and numeric age.")
         return redirect(url_for("index"))
-    users.insert_one({"name": name, "age": int(age)})
+    users.insert_one(user)
     flash("Added successfully!")
     return redirect(url_for("index"))
 
+def chunk_size_arg():
+    size = request.args.get("chunk_size", ingest.DEFAULT_CHUNK_SIZE, type=int)
+    return min(max(size, 1), ingest.MAX_CHUNK_SIZE)
+
 @app.route("/insert_many", methods=["POST"])
 def insert_many():
-    data = request.form.get("bulk_json", "").strip()
+    # uploaded file (JSON array or NDJSON) wins over the pasted text
+    upload = request.files.get("bulk_file")
+    if upload and upload.filename:
+        stream = upload.stream
+    else:
+        stream = io.BytesIO(request.form.get("bulk_json", "").encode())
     try:
-        json_data = json.loads(data)
-        if isinstance(json_data, list):
-            users.insert_many(json_data)
-            flash(f"Inserted {len(json_data)} users!")
-        else:
-            flash("Input must be a JSON array (list).")
+        report = ingest.bulk_insert(users, stream, chunk_size_arg())
     except Exception as e:
         flash(f"Error: {str(e)}")
+        return redirect(url_for("index"))
+
+    for message in ingest.summary(report):
+        flash(message)
     return redirect(url_for("index"))
 
+@app.route("/api/users/bulk", methods=["POST"])
+def bulk_insert_api():
+    """Raw JSON-array / NDJSON body, read as it streams in; returns the full per-chunk report."""
+    report = ingest.bulk_insert(users, request.stream, chunk_size_arg())
+    return jsonify(report), 200 if report["inserted"] or not report["errors"] else 400
+
 @app.route("/delete/<id>", methods=["POST"])
 def delete(id):
+    if not ObjectId.is_valid(id):
+        flash("Invalid user id.")
+        return redirect(url_for("index"))
     users.delete_one({"_id": ObjectId(id)})
     flash("Deleted successfully!")
     return redirect(url_for("index"))
 
+def flash_delete_report(report):
+    for message in bulk_delete.summary(report):
+        flash(message)
+
+def delete_chunk_size():
+    size = request.args.get("chunk_size", bulk_delete.DEFAULT_CHUNK_SIZE, type=int)
+    return min(max(size, 1), bulk_delete.MAX_CHUNK_SIZE)
+
 @app.route("/delete_many", methods=["POST"])
 def delete_many():
     ids = request.form.getlist("selected_ids")  # list of IDs
@@ -59,14 +111,49 @@ def delete_many():
         return redirect(url_for("index"))
 
     try:
-        object_ids = [ObjectId(i) for i in ids]
-        result = users.delete_many({"_id": {"$in": object_ids}})
-        flash(f"Deleted {result.deleted_count} user(s)!")
+        flash_delete_report(bulk_delete.delete_ids(users, ids, delete_chunk_size()))
     except Exception as e:
         flash(f"Error deleting users: {str(e)}")
 
     return redirect(url_for("index"))
 
+@app.route("/delete_by_filter", methods=["POST"])
+def delete_by_filter():
+    try:
+        query = listing.user_filter(request.form)
+    except ValueError as e:
+        flash(str(e))
+        return redirect(url_for("index"))
+    if not query:
+        flash("Set a name prefix or age range before deleting by filter.")
+        return redirect(url_for("index"))
+    try:
+        flash_delete_report(bulk_delete.delete_matching(users, query))
+    except Exception as e:
+        flash(f"Error deleting users: {str(e)}")
+    return redirect(url_for("index"))
+
+@app.route("/api/users/delete", methods=["POST"])
+def bulk_delete_api():
+    """JSON body {"ids": [...]} or {"filter": {"q", "min_age", "max_age"}}; returns the per-chunk report."""
+    body = request.get_json(silent=True) or {}
+    if not isinstance(body, dict):
+        return jsonify({"error": "body must be a JSON object"}), 400
+    if "ids" in body:
+        if not isinstance(body["ids"], list):
+            return jsonify({"error": "ids must be a list"}), 400
+        return jsonify(bulk_delete.delete_ids(users, body["ids"], delete_chunk_size()))
+    raw_filter = body.get("filter") or {}
+    if not isinstance(raw_filter, dict):
+        return jsonify({"error": "filter must be a JSON object"}), 400
+    try:
+        query = listing.user_filter(MultiDict(list(raw_filter.items())))  # a JSON list stays one (rejected) value
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if not query:
+        return jsonify({"error": "send ids or a non-empty filter"}), 400
+    return jsonify(bulk_delete.delete_matching(users, query))
+
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 5000))
     app.run(host="0.0.0.0", port=port, debug=True)
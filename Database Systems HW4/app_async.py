@@ -0,0 +1,181 @@
+"""
+Asyncio serving mode for the HW4 app: the same routes and templates as
+app.py, on Quart with pymongo's AsyncMongoClient, so one event loop keeps
+many requests in flight while they wait on MongoDB.
+
+    hypercorn app_async:app --bind 0.0.0.0:5000
+"""
+import os
+import tempfile
+
+from quart import Quart, render_template, request, redirect, url_for, flash, jsonify, make_response
+from pymongo import AsyncMongoClient
+from pymongo.errors import PyMongoError
+from bson.objectid import ObjectId
+from werkzeug.datastructures import MultiDict
+
+import ingest
+import bulk_delete
+import listing
+
+app = Quart(__name__)
+app.secret_key = "devkey"  # For flash messages
+
+# --- MongoDB connection (opened on the serving event loop) ---
+MONGODB_URI = os.environ.get("MONGODB_URI", "mongodb://localhost:27017")
+DBNAME = os.environ.get("DBNAME", "hw3db")
+SPOOL_BYTES = 1024 * 1024  # request bodies above this go to a temp file, not memory
+
+client = None
+users = None
+
+@app.before_serving
+async def connect():
+    global client, users
+    client = AsyncMongoClient(MONGODB_URI)
+    users = client.get_database(DBNAME).get_collection("users")
+    try:
+        await users.create_index("name")
+        await users.create_index("age")
+    except PyMongoError as e:
+        print("Could not create indexes:", e)
+
+@app.after_serving
+async def disconnect():
+    await client.close()
+
+# --- Routes ---
+@app.route("/", methods=["GET"])
+async def index():
+    try:
+        query, limit = listing.page_query(request.args)
+    except ValueError as e:
+        await flash(str(e))
+        return redirect(url_for("index"))
+
+    cursor = users.find(query, listing.LIST_FIELDS).sort("_id", -1).limit(limit + 1)
+    items = await cursor.to_list()
+    total = await users.estimated_document_count()
+    response = await make_response(await render_template(
+        "index.html", total=total, **listing.page_context(request.args, items, limit, url_for)
+    ))
+    response.headers["X-Estimated-Total-Count"] = str(total)
+    return response
+
+@app.route("/insert_one", methods=["POST"])
+async def insert_one():
+    form = await request.form
+    try:
+        user = ingest.normalize({"name": form.get("name"), "age": form.get("age")})
+    except ValueError:
+        await flash("Please enter a valid name and numeric age.")
+        return redirect(url_for("index"))
+    await users.insert_one(user)
+    await flash("Added successfully!")
+    return redirect(url_for("index"))
+
+def chunk_size_arg():
+    size = request.args.get("chunk_size", ingest.DEFAULT_CHUNK_SIZE, type=int)
+    return min(max(size, 1), ingest.MAX_CHUNK_SIZE)
+
+@app.route("/insert_many", methods=["POST"])
+async def insert_many():
+    form, files = await request.form, await request.files
+    upload = files.get("bulk_file")
+    if upload and upload.filename:
+        stream = upload.stream
+    else:
+        stream = tempfile.SpooledTemporaryFile(SPOOL_BYTES)
+        stream.write(form.get("bulk_json", "").encode())
+        stream.seek(0)
+    try:
+        report = await ingest.bulk_insert_async(users, stream, chunk_size_arg())
+    except Exception as e:
+        await flash(f"Error: {str(e)}")
+        return redirect(url_for("index"))
+
+    for message in ingest.summary(report):
+        await flash(message)
+    return redirect(url_for("index"))
+
+@app.route("/api/users/bulk", methods=["POST"])
+async def bulk_insert_api():
+    """Raw JSON-array / NDJSON body, spooled as it arrives; returns the full per-chunk report."""
+    with tempfile.SpooledTemporaryFile(SPOOL_BYTES) as stream:
+        async for data in request.body:
+            stream.write(data)
+        stream.seek(0)
+        report = await ingest.bulk_insert_async(users, stream, chunk_size_arg())
+    return jsonify(report), 200 if report["inserted"] or not report["errors"] else 400
+
+@app.route("/delete/<id>", methods=["POST"])
+async def delete(id):
+    if not ObjectId.is_valid(id):
+        await flash("Invalid user id.")
+        return redirect(url_for("index"))
+    await users.delete_one({"_id": ObjectId(id)})
+    await flash("Deleted successfully!")
+    return redirect(url_for("index"))
+
+async def flash_delete_report(report):
+    for message in bulk_delete.summary(report):
+        await flash(message)
+
+def delete_chunk_size():
+    size = request.args.get("chunk_size", bulk_delete.DEFAULT_CHUNK_SIZE, type=int)
+    return min(max(size, 1), bulk_delete.MAX_CHUNK_SIZE)
+
+@app.route("/delete_many", methods=["POST"])
+async def delete_many():
+    ids = (await request.form).getlist("selected_ids")  # list of IDs
+    if not ids:
+        await flash("No users selected for deletion.")
+        return redirect(url_for("index"))
+
+    try:
+        await flash_delete_report(await bulk_delete.delete_ids_async(users, ids, delete_chunk_size()))
+    except Exception as e:
+        await flash(f"Error deleting users: {str(e)}")
+
+    return redirect(url_for("index"))
+
+@app.route("/delete_by_filter", methods=["POST"])
+async def delete_by_filter():
+    try:
+        query = listing.user_filter(await request.form)
+    except ValueError as e:
+        await flash(str(e))
+        return redirect(url_for("index"))
+    if not query:
+        await flash("Set a name prefix or age range before deleting by filter.")
+        return redirect(url_for("index"))
+    try:
+        await flash_delete_report(await bulk_delete.delete_matching_async(users, query))
+    except Exception as e:
+        await flash(f"Error deleting users: {str(e)}")
+    return redirect(url_for("index"))
+
+@app.route("/api/users/delete", methods=["POST"])
+async def bulk_delete_api():
+    """JSON body {"ids": [...]} or {"filter": {"q", "min_age", "max_age"}}; returns the per-chunk report."""
+    body = await request.get_json(silent=True) or {}
+    if not isinstance(body, dict):
+        return jsonify({"error": "body must be a JSON object"}), 400
+    if "ids" in body:
+        if not isinstance(body["ids"], list):
+            return jsonify({"error": "ids must be a list"}), 400
+        return jsonify(await bulk_delete.delete_ids_async(users, body["ids"], delete_chunk_size()))
+    raw_filter = body.get("filter") or {}
+    if not isinstance(raw_filter, dict):
+        return jsonify({"error": "filter must be a JSON object"}), 400
+    try:
+        query = listing.user_filter(MultiDict(list(raw_filter.items())))  # a JSON list stays one (rejected) value
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if not query:
+        return jsonify({"error": "send ids or a non-empty filter"}), 400
+    return jsonify(await bulk_delete.delete_matching_async(users, query))
+
+if __name__ == "__main__":
+    port = int(os.environ.get("PORT", 5000))
+    app.run(host="0.0.0.0", port=port, debug=True)
@@ -0,0 +1,105 @@
+"""
+Side-by-side load test of the sync (app.py) and asyncio (app_async.py)
+servers against the same local mongod.
+
+Start both, e.g.
+
+    python app.py                                       # :5000, threaded dev server
+    hypercorn app_async:app --bind 127.0.0.1:5001
+
+then
+
+    python bench_async.py --sync-url http://127.0.0.1:5000 \
+        --async-url http://127.0.0.1:5001 --concurrency 16 64 256
+
+Each client thread keeps one HTTP/1.1 connection and alternates listing
+a page with inserting a user. Prints requests/sec and p50/p95/p99 per
+server and concurrency level.
+"""
+import argparse
+import http.client
+import random
+import threading
+import time
+import urllib.parse
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def run(base_url, concurrency, total):
+    url = urllib.parse.urlsplit(base_url)
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    per_client = max(1, total // concurrency)
+
+    def client(seed):
+        rng = random.Random(seed)
+        conn = http.client.HTTPConnection(url.hostname, url.port, timeout=60)
+        local, bad = [], 0
+        for i in range(per_client):
+            if i % 2:
+                body = urllib.parse.urlencode({"name": f"bench{rng.randrange(10**6)}",
+                                               "age": rng.randint(18, 90)})
+                request = ("POST", "/insert_one", body,
+                           {"Content-Type": "application/x-www-form-urlencoded"})
+            else:
+                request = ("GET", "/?limit=50", None, {})
+            t0 = time.perf_counter()
+            try:
+                conn.request(*request)
+                resp = conn.getresponse()
+                resp.read()
+                bad += resp.status >= 400
+            except (OSError, http.client.HTTPException):
+                bad += 1
+                conn.close()
+                conn = http.client.HTTPConnection(url.hostname, url.port, timeout=60)
+            local.append((time.perf_counter() - t0) * 1000)
+        conn.close()
+        with lock:
+            latencies.extend(local)
+            errors[0] += bad
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "errors": errors[0],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="sync vs asyncio HW4 server benchmark")
+    parser.add_argument("--sync-url", default="http://127.0.0.1:5000")
+    parser.add_argument("--async-url", default="http://127.0.0.1:5001")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[16, 64, 256])
+    parser.add_argument("--requests", type=int, default=4000, help="per server and level")
+    args = parser.parse_args()
+
+    print(f"{'clients':>7} {'server':>6} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'p99 ms':>8} {'errors':>6}")
+    for concurrency in args.concurrency:
+        for label, url in (("sync", args.sync_url), ("async", args.async_url)):
+            r = run(url, concurrency, args.requests)
+            print(f"{concurrency:>7} {label:>6} {r['rps']:>9.1f} {r['p50']:>8.2f} "
+                  f"{r['p95']:>8.2f} {r['p99']:>8.2f} {r['errors']:>6}")
+
+
+if __name__ == "__main__":
+    main()
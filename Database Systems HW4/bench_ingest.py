@@ -0,0 +1,88 @@
+"""
+Bulk-ingest throughput against a local mongod.
+
+For each size, writes a JSON-array file of random users, then
+loads it in a fresh child process either the old way (json.loads the whole
+array + one insert_many) or through ingest.bulk_insert (streamed, validated,
+chunked unordered insert_many), and reports docs/sec and peak RSS.
+
+    mongod --dbpath /tmp/mongo-bench &
+    python bench_ingest.py
+    python bench_ingest.py --sizes 10000 100000 1000000 --chunk-size 5000
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from pymongo import MongoClient
+
+MONGODB_URI = os.environ.get("MONGODB_URI", "mongodb://localhost:27017")
+BENCH_DB = os.environ.get("BENCH_DBNAME", "hw4_bench")
+
+
+def write_users(path, n):
+    """A JSON array, one user per line, so both loaders can read it."""
+    rng = random.Random(n)
+    with open(path, "w") as f:
+        f.write("[\n")
+        for i in range(n):
+            doc = json.dumps({"name": f"user{i}", "age": rng.randint(18, 90)})
+            f.write(doc + (",\n" if i < n - 1 else "\n"))
+        f.write("]\n")
+
+
+def child(mode, path, chunk_size):
+    users = MongoClient(MONGODB_URI)[BENCH_DB]["users"]
+    users.drop()
+    start = time.perf_counter()
+    if mode == "single":
+        with open(path) as f:
+            docs = json.load(f)
+        users.insert_many(docs)
+        inserted = len(docs)
+    else:
+        import ingest
+        with open(path, "rb") as f:
+            inserted = ingest.bulk_insert(users, f, chunk_size)["inserted"]
+    elapsed = time.perf_counter() - start
+    rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps({"inserted": inserted, "seconds": elapsed, "rss_mb": rss_mb}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="insert_many ingest benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child, args.chunk_size)
+        return
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    print(f"{'docs':>9} {'mode':>8} {'docs/s':>10} {'seconds':>8} {'peak RSS MB':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.sizes:
+            path = os.path.join(tmp, f"users_{n}.json")
+            write_users(path, n)
+            for mode in ("single", "chunked"):
+                out = subprocess.run(
+                    [sys.executable, __file__, "--child", mode, path,
+                     "--chunk-size", str(args.chunk_size)],
+                    cwd=here, capture_output=True, text=True, check=True,
+                ).stdout
+                r = json.loads(out.strip().splitlines()[-1])
+                print(f"{n:>9} {mode:>8} {r['inserted'] / r['seconds']:>10,.0f} "
+                      f"{r['seconds']:>8.2f} {r['rss_mb']:>12.1f}")
+    MongoClient(MONGODB_URI).drop_database(BENCH_DB)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Listing latency as the users collection grows, against a local mongod.
+
+Grows the collection through 1k, 10k, 100k and 1M documents and, at each
+size, times GET / through the Flask test client: the first page, a page
+deep in the collection (via the "after" cursor), and the name-prefix and
+age-range filters. With _id keyset paging, projection and the startup
+indexes, p50/p95 should stay roughly flat as the collection grows.
+
+    mongod --dbpath /tmp/mongo-bench &
+    python bench_listing.py
+"""
+import argparse
+import os
+import random
+import time
+
+os.environ.setdefault("DBNAME", "hw4_bench_listing")
+
+from app import app, users  # noqa: E402  (DBNAME must be set first)
+
+INSERT_CHUNK = 10_000
+
+
+def percentile(sorted_values, pct):
+    k = (len(sorted_values) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def grow_to(n, rng):
+    missing = n - users.estimated_document_count()
+    while missing > 0:
+        batch = min(missing, INSERT_CHUNK)
+        users.insert_many(
+            [{"name": f"user{rng.randrange(10**6):06d}", "age": rng.randint(18, 90)}
+             for _ in range(batch)],
+            ordered=False,
+        )
+        missing -= batch
+
+
+def timed(client, url, repeat):
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        assert client.get(url).status_code == 200, url
+        samples.append((time.perf_counter() - t0) * 1000)
+    samples.sort()
+    return percentile(samples, 50), percentile(samples, 95)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GET / latency vs collection size")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    client = app.test_client()
+    users.drop()
+    users.create_index("name")
+    users.create_index("age")
+
+    print(f"{'docs':>9}  {'page':<12} {'p50 ms':>8} {'p95 ms':>8}")
+    for n in args.sizes:
+        grow_to(n, rng)
+        middle = users.find({}, {"_id": 1}).sort("_id", -1).skip(n // 2).limit(1).next()["_id"]
+        pages = {
+            "first": "/",
+            "deep": f"/?after={middle}",
+            "name^": "/?q=user12",
+            "age 30-35": "/?min_age=30&max_age=35",
+        }
+        for label, url in pages.items():
+            p50, p95 = timed(client, url, args.repeat)
+            print(f"{n:>9}  {label:<12} {p50:>8.2f} {p95:>8.2f}")
+    users.database.client.drop_database(users.database.name)
+
+
+if __name__ == "__main__":
+    main()
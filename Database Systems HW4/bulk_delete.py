@@ -0,0 +1,111 @@
+import time
+
+from bson.objectid import ObjectId
+
+# --- Bulk delete: validated ids, bounded $in chunks ---
+DEFAULT_CHUNK_SIZE = 1000
+MAX_CHUNK_SIZE = 10000
+MAX_REPORTED_INVALID = 20
+
+
+def parse_ids(raw_ids):
+    """(unique ObjectIds in input order, invalid strings) -- bad ids no longer sink the batch."""
+    ids, seen, invalid = [], set(), []
+    for raw in raw_ids:
+        raw = str(raw).strip()
+        if not ObjectId.is_valid(raw):
+            invalid.append(raw)
+            continue
+        oid = ObjectId(raw)
+        if oid not in seen:
+            seen.add(oid)
+            ids.append(oid)
+    return ids, invalid
+
+
+def new_report(raw_ids, invalid):
+    return {
+        "requested": len(raw_ids),
+        "invalid": len(invalid),
+        "invalid_ids": invalid[:MAX_REPORTED_INVALID],
+        "deleted": 0,
+        "chunks": [],
+    }
+
+
+def record_chunk(report, size, deleted, started):
+    report["deleted"] += deleted
+    report["chunks"].append({
+        "ids": size,
+        "deleted": deleted,
+        "ms": round((time.perf_counter() - started) * 1000, 1),
+    })
+
+
+def delete_ids(collection, raw_ids, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Delete the given ids in chunks of at most chunk_size per
+    delete_many({"_id": {"$in": ...}}), so no single command carries a
+    huge $in array or holds the collection for long.
+    """
+    ids, invalid = parse_ids(raw_ids)
+    report, start = new_report(raw_ids, invalid), time.perf_counter()
+    for i in range(0, len(ids), chunk_size):
+        chunk = ids[i:i + chunk_size]
+        t0 = time.perf_counter()
+        result = collection.delete_many({"_id": {"$in": chunk}})
+        record_chunk(report, len(chunk), result.deleted_count, t0)
+    report["seconds"] = round(time.perf_counter() - start, 3)
+    return report
+
+
+async def delete_ids_async(collection, raw_ids, chunk_size=DEFAULT_CHUNK_SIZE):
+    """delete_ids for an AsyncMongoClient collection."""
+    ids, invalid = parse_ids(raw_ids)
+    report, start = new_report(raw_ids, invalid), time.perf_counter()
+    for i in range(0, len(ids), chunk_size):
+        chunk = ids[i:i + chunk_size]
+        t0 = time.perf_counter()
+        result = await collection.delete_many({"_id": {"$in": chunk}})
+        record_chunk(report, len(chunk), result.deleted_count, t0)
+    report["seconds"] = round(time.perf_counter() - start, 3)
+    return report
+
+
+def filter_report(deleted, started):
+    elapsed = time.perf_counter() - started
+    return {
+        "deleted": deleted,
+        "chunks": [{"deleted": deleted, "ms": round(elapsed * 1000, 1)}],
+        "seconds": round(elapsed, 3),
+    }
+
+
+def delete_matching(collection, query):
+    """Delete everything matching query in one server-side command; ids never leave the server."""
+    if not query:
+        raise ValueError("refusing to delete without a filter")
+    start = time.perf_counter()
+    return filter_report(collection.delete_many(query).deleted_count, start)
+
+
+async def delete_matching_async(collection, query):
+    """delete_matching for an AsyncMongoClient collection."""
+    if not query:
+        raise ValueError("refusing to delete without a filter")
+    start = time.perf_counter()
+    return filter_report((await collection.delete_many(query)).deleted_count, start)
+
+
+def summary(report):
+    """Flash messages for a delete report."""
+    message = f"Deleted {report['deleted']} user(s)"
+    if len(report["chunks"]) > 1:
+        slowest = max(c["ms"] for c in report["chunks"])
+        message += f" in {len(report['chunks'])} chunks (slowest {slowest} ms)"
+    messages = [message + "!"]
+    if report.get("invalid"):
+        messages.append(
+            f"Skipped {report['invalid']} invalid id(s): {', '.join(report['invalid_ids'][:5])}"
+        )
+    return messages
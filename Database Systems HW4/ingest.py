@@ -0,0 +1,242 @@
+import io
+import json
+import time
+
+from pymongo.errors import BulkWriteError
+
+# --- Bulk ingest: incremental parsing, validation, chunked insert_many ---
+READ_SIZE = 64 * 1024
+DEFAULT_CHUNK_SIZE = 1000
+MAX_CHUNK_SIZE = 10000
+MAX_NAME_LENGTH = 100
+MAX_REPORTED_ERRORS = 20
+# a user is a name and an age; anything this long without parsing is rejected
+# rather than buffered until EOF
+MAX_DOCUMENT_SIZE = 64 * 1024
+
+
+def iter_documents(stream):
+    """
+    Yield JSON values one at a time from a binary stream holding either a
+    JSON array or NDJSON (one document per line). Only READ_SIZE bytes plus
+    the document being decoded are held in memory. An NDJSON line that
+    doesn't parse, or runs over MAX_DOCUMENT_SIZE characters, is yielded as
+    a ValueError in place of its document and reading goes on at the next
+    line. In an array a syntax error -- an empty element, data after the
+    closing bracket, or a document still undecodable after
+    MAX_DOCUMENT_SIZE characters -- raises ValueError; nothing after it
+    can be trusted.
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig")
+    decoder = json.JSONDecoder()
+    buf, pos, eof = "", 0, False
+
+    def fill():
+        nonlocal buf, pos, eof
+        if len(buf) - pos > MAX_DOCUMENT_SIZE:
+            raise ValueError(f"invalid JSON, or a document over {MAX_DOCUMENT_SIZE} characters")
+        chunk = text.read(READ_SIZE)
+        eof = not chunk
+        buf = buf[pos:] + chunk
+        pos = 0
+
+    def peek():
+        """The next non-space character, left unconsumed; "" at the end of input."""
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos].isspace():
+                pos += 1
+            if pos < len(buf):
+                return buf[pos]
+            if eof:
+                return ""
+            fill()
+
+    def decode():
+        nonlocal pos
+        while True:
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError as e:
+                if eof:
+                    raise ValueError(f"invalid JSON: {e.msg}")
+                fill()  # document may continue in the next chunk
+                continue
+            if end == len(buf) and not eof and not isinstance(value, (dict, list, str)):
+                # a bare number/literal could be cut off by the chunk boundary
+                fill()
+                continue
+            pos = end
+            return value
+
+    def skip_line():
+        """Drop input up to and including the next newline."""
+        nonlocal buf, pos
+        while True:
+            end = buf.find("\n", pos)
+            if end != -1:
+                pos = end + 1
+                return
+            buf, pos = "", 0
+            if eof:
+                return
+            fill()
+
+    if peek() != "[":
+        while peek():
+            end = buf.find("\n", pos)
+            if end == -1 and not eof:
+                if len(buf) - pos <= MAX_DOCUMENT_SIZE:
+                    fill()  # line may continue in the next chunk
+                    continue
+                yield ValueError(f"line over {MAX_DOCUMENT_SIZE} characters")
+                skip_line()
+                continue
+            end = len(buf) if end == -1 else end
+            try:
+                yield json.loads(buf[pos:end])
+            except json.JSONDecodeError as e:
+                yield ValueError(f"invalid JSON: {e.msg}")
+            pos = end + 1
+        return
+
+    pos += 1
+    if peek() == "]":
+        pos += 1
+    else:
+        while True:
+            if peek() in (",", "]"):
+                raise ValueError("empty element in JSON array")
+            yield decode()
+            c = peek()
+            pos += 1
+            if c == "]":
+                break
+            if c != ",":
+                raise ValueError("unterminated JSON array" if not c
+                                 else "expected ',' or ']' in JSON array")
+    if peek():
+        raise ValueError("unexpected data after the JSON array")
+
+
+def normalize(doc):
+    """The stored shape of a user: {"name": str, "age": int}. Raises ValueError."""
+    if isinstance(doc, ValueError):
+        raise doc  # an NDJSON line iter_documents couldn't parse
+    if not isinstance(doc, dict):
+        raise ValueError("each user must be a JSON object")
+    name = doc.get("name")
+    if not isinstance(name, str) or not name.strip():
+        raise ValueError("name is required")
+    name = name.strip()
+    if len(name) > MAX_NAME_LENGTH:
+        raise ValueError(f"name is longer than {MAX_NAME_LENGTH} characters")
+    age = doc.get("age")
+    if isinstance(age, str) and age.strip().isdigit():
+        age = int(age)
+    if isinstance(age, float) and age.is_integer():
+        age = int(age)
+    if isinstance(age, bool) or not isinstance(age, int) or not 0 <= age <= 150:
+        raise ValueError("age must be a whole number between 0 and 150")
+    return {"name": name, "age": age}
+
+
+def new_report():
+    return {"inserted": 0, "invalid": 0, "failed": 0, "chunks": [], "errors": []}
+
+
+def report_error(report, where, message):
+    if len(report["errors"]) < MAX_REPORTED_ERRORS:
+        report["errors"].append({**where, "error": message})
+
+
+def valid_chunks(stream, chunk_size, report):
+    """
+    Yield lists of up to chunk_size normalized documents from stream.
+    Invalid documents and a parse error that stops the read go to report.
+    """
+    chunk, n = [], 0
+    try:
+        for n, doc in enumerate(iter_documents(stream), start=1):
+            try:
+                chunk.append(normalize(doc))
+            except ValueError as e:
+                report["invalid"] += 1
+                report_error(report, {"document": n}, str(e))
+                continue
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+    except (ValueError, UnicodeDecodeError) as e:
+        report_error(report, {"document": n + 1}, f"stopped reading: {e}")
+        report["aborted"] = True
+    if chunk:
+        yield chunk
+
+
+def record_chunk(report, size, started, error=None):
+    """Fold one insert_many outcome (None, or the BulkWriteError it raised) into report."""
+    inserted = size
+    if error is not None:
+        inserted = error.details.get("nInserted", 0)
+        for err in error.details.get("writeErrors", [])[:3]:
+            report_error(report, {"chunk": len(report["chunks"]) + 1},
+                         err.get("errmsg", "write error"))
+    report["inserted"] += inserted
+    report["failed"] += size - inserted
+    report["chunks"].append({
+        "inserted": inserted,
+        "failed": size - inserted,
+        "ms": round((time.perf_counter() - started) * 1000, 1),
+    })
+
+
+def finish(report, started):
+    elapsed = time.perf_counter() - started
+    report["seconds"] = round(elapsed, 3)
+    report["docs_per_second"] = round(report["inserted"] / elapsed, 1) if elapsed else None
+    return report
+
+
+def summary(report):
+    """Flash messages for a bulk_insert report."""
+    message = f"Inserted {report['inserted']} users in {len(report['chunks'])} chunk(s)"
+    if report["invalid"] or report["failed"]:
+        message += f"; {report['invalid']} invalid, {report['failed']} failed"
+    messages = [message + "!"]
+    for err in report["errors"][:5]:
+        where = f"Document {err['document']}" if "document" in err else f"Chunk {err['chunk']}"
+        messages.append(f"{where}: {err['error']}")
+    return messages
+
+
+def bulk_insert(collection, stream, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Validate documents from stream and write them with unordered
+    insert_many in chunks of chunk_size. Invalid documents are skipped
+    and reported; a failing document only loses itself, not its chunk.
+    """
+    report, started = new_report(), time.perf_counter()
+    for chunk in valid_chunks(stream, chunk_size, report):
+        t0 = time.perf_counter()
+        try:
+            collection.insert_many(chunk, ordered=False)
+        except BulkWriteError as e:
+            record_chunk(report, len(chunk), t0, e)
+        else:
+            record_chunk(report, len(chunk), t0)
+    return finish(report, started)
+
+
+async def bulk_insert_async(collection, stream, chunk_size=DEFAULT_CHUNK_SIZE):
+    """bulk_insert for an AsyncMongoClient collection."""
+    report, started = new_report(), time.perf_counter()
+    for chunk in valid_chunks(stream, chunk_size, report):
+        t0 = time.perf_counter()
+        try:
+            await collection.insert_many(chunk, ordered=False)
+        except BulkWriteError as e:
+            record_chunk(report, len(chunk), t0, e)
+        else:
+            record_chunk(report, len(chunk), t0)
+    return finish(report, started)
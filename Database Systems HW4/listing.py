@@ -0,0 +1,78 @@
+import re
+
+from bson.objectid import ObjectId
+
+# --- Index page: filters and _id keyset paging (shared by app.py and app_async.py) ---
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+LIST_FIELDS = {"name": 1, "age": 1}  # only what index.html renders (_id is implied)
+
+
+def age_value(values, name):
+    """Whole-number age bound from a form/args/JSON mapping; None when blank."""
+    raw = values.get(name)
+    if raw is None or raw == "":
+        return None
+    if isinstance(raw, str) and raw.strip().isdigit():
+        return int(raw)
+    if isinstance(raw, int) and not isinstance(raw, bool) and raw >= 0:
+        return raw
+    raise ValueError(f"{name} must be a whole number.")
+
+
+def user_filter(values):
+    """
+    Mongo filter from q (name prefix), min_age and max_age in a form/args
+    mapping. It also picks what delete_by_filter removes, so a value that
+    doesn't parse raises ValueError instead of being dropped (and widening
+    the match).
+    """
+    prefix = values.get("q", "")
+    if not isinstance(prefix, str):
+        raise ValueError("q must be a string.")
+    prefix = prefix.strip()
+    min_age = age_value(values, "min_age")
+    max_age = age_value(values, "max_age")
+    query = {}
+    if prefix:
+        # anchored, case-sensitive prefix regex can use the name index
+        query["name"] = {"$regex": "^" + re.escape(prefix)}
+    if min_age is not None or max_age is not None:
+        query["age"] = {}
+        if min_age is not None:
+            query["age"]["$gte"] = min_age
+        if max_age is not None:
+            query["age"]["$lte"] = max_age
+    return query
+
+
+def page_query(args):
+    """(filter, limit) for one page; raises ValueError for a malformed filter or "after" cursor."""
+    limit = min(max(args.get("limit", PAGE_SIZE, type=int), 1), MAX_PAGE_SIZE)
+    query = user_filter(args)
+    after = args.get("after")
+    if after:
+        if not ObjectId.is_valid(after):
+            raise ValueError("Invalid page link.")
+        # newest first: the next page continues below the last _id shown
+        query["_id"] = {"$lt": ObjectId(after)}
+    return query, limit
+
+
+def page_context(args, items, limit, url_for):
+    """Template variables for index.html; items holds up to limit + 1 rows (one lookahead)."""
+    rest = args.to_dict()
+    after = rest.pop("after", None)
+    next_url = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_url = url_for("index", **rest, after=str(items[-1]["_id"]))
+    return {
+        "items": items,
+        "next_url": next_url,
+        "first_url": url_for("index", **rest) if after else None,
+        "q": args.get("q", "").strip(),
+        "min_age": args.get("min_age", type=int),
+        "max_age": args.get("max_age", type=int),
+        "limit": limit,
+    }
@@ -0,0 +1,194 @@
+from models import db, Product, Sale, ProductSalesTotal, CategoryStats
+from sqlalchemy import select, update, insert, delete, case, func
+from sqlalchemy.exc import IntegrityError
+
+# float sums drift by rounding; anything below this is not reported
+TOLERANCE = 0.01
+
+
+def category_key(category):
+    return category or ""
+
+
+def snapshot(p):
+    """The parts of a product that feed the aggregates, coerced like the DB will."""
+    return (
+        category_key(p.category),
+        int(p.stock_quantity or 0),
+        float(p.price or 0),
+    )
+
+
+def bump_category(category, products=0, stock=0, value=0.0):
+    key = category_key(category)
+    stmt = (
+        update(CategoryStats)
+        .where(CategoryStats.category == key)
+        .values(
+            product_count=CategoryStats.product_count + products,
+            stock=CategoryStats.stock + stock,
+            stock_value=CategoryStats.stock_value + value,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if db.session.execute(stmt).rowcount:
+        return
+
+    # first product in the category
+    try:
+        with db.session.begin_nested():
+            db.session.execute(
+                insert(CategoryStats).values(
+                    category=key, product_count=products, stock=stock, stock_value=value
+                )
+            )
+    except IntegrityError:
+        # a concurrent write opened the category first; add onto its row
+        db.session.execute(stmt)
+
+
+# ---------- WRITE-PATH HOOKS (same transaction as the caller) ----------
+
+def product_added(p):
+    db.session.flush()
+    category, stock, price = snapshot(p)
+    db.session.execute(
+        insert(ProductSalesTotal).values(product_id=p.id, units_sold=0, revenue=0.0)
+    )
+    bump_category(category, 1, stock, stock * price)
+
+
+def product_changed(before, p):
+    """before is snapshot(p) taken prior to the update."""
+    old_category, old_stock, old_price = before
+    category, stock, price = snapshot(p)
+    if (old_category, old_stock, old_price) == (category, stock, price):
+        return
+
+    if old_category == category:
+        bump_category(category, 0, stock - old_stock,
+                      stock * price - old_stock * old_price)
+    else:
+        bump_category(old_category, -1, -old_stock, -old_stock * old_price)
+        bump_category(category, 1, stock, stock * price)
+
+
+def sales_recorded(products, totals):
+    """
+    products: {id: row with category/price}, totals: {id: qty sold}.
+    One UPDATE for per-product totals and one for per-category stock.
+    """
+    revenue = {pid: qty * products[pid].price for pid, qty in totals.items()}
+
+    result = db.session.execute(
+        update(ProductSalesTotal)
+        .where(ProductSalesTotal.product_id.in_(totals))
+        .values(
+            units_sold=ProductSalesTotal.units_sold
+            + case(totals, value=ProductSalesTotal.product_id),
+            revenue=ProductSalesTotal.revenue
+            + case(revenue, value=ProductSalesTotal.product_id),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != len(totals):
+        # products created before the aggregates existed; seed their rows
+        existing = set(db.session.scalars(
+            select(ProductSalesTotal.product_id)
+            .where(ProductSalesTotal.product_id.in_(totals))
+        ))
+        db.session.execute(insert(ProductSalesTotal), [
+            {"product_id": pid, "units_sold": totals[pid], "revenue": revenue[pid]}
+            for pid in totals if pid not in existing
+        ])
+
+    units_by_cat, value_by_cat = {}, {}
+    for pid, qty in totals.items():
+        key = category_key(products[pid].category)
+        units_by_cat[key] = units_by_cat.get(key, 0) + qty
+        value_by_cat[key] = value_by_cat.get(key, 0.0) + revenue[pid]
+
+    db.session.execute(
+        update(CategoryStats)
+        .where(CategoryStats.category.in_(units_by_cat))
+        .values(
+            stock=CategoryStats.stock - case(units_by_cat, value=CategoryStats.category),
+            stock_value=CategoryStats.stock_value
+            - case(value_by_cat, value=CategoryStats.category),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+# ---------- REBUILD / DRIFT CHECK ----------
+
+def compute():
+    """Recompute both aggregates from the base tables."""
+    sales = {pid: (0, 0.0) for pid in db.session.scalars(select(Product.id))}
+    for pid, units, revenue in db.session.execute(
+        select(Sale.product_id, func.sum(Sale.quantity_sold), func.sum(Sale.total_price))
+        .group_by(Sale.product_id)
+    ):
+        sales[pid] = (int(units or 0), float(revenue or 0.0))
+
+    categories = {}
+    for category, count, stock, value in db.session.execute(
+        select(
+            Product.category,
+            func.count(Product.id),
+            func.coalesce(func.sum(Product.stock_quantity), 0),
+            func.coalesce(func.sum(Product.stock_quantity * Product.price), 0.0),
+        ).group_by(Product.category)
+    ):
+        c, s, v = categories.get(category_key(category), (0, 0, 0.0))
+        categories[category_key(category)] = (c + count, s + int(stock), v + float(value))
+
+    return sales, categories
+
+
+def drift():
+    """List human-readable differences between stored and recomputed aggregates."""
+    sales, categories = compute()
+    problems = []
+
+    stored_sales = {
+        r.product_id: (r.units_sold, r.revenue)
+        for r in ProductSalesTotal.query.all()
+    }
+    for pid in sales.keys() | stored_sales.keys():
+        want = sales.get(pid)
+        have = stored_sales.get(pid)
+        if want is None or have is None or want[0] != have[0] \
+                or abs(want[1] - have[1]) > TOLERANCE:
+            problems.append(f"product {pid}: stored {have}, actual {want}")
+
+    stored_cats = {
+        r.category: (r.product_count, r.stock, r.stock_value)
+        for r in CategoryStats.query.all()
+        if r.product_count or r.stock or r.stock_value
+    }
+    for key in categories.keys() | stored_cats.keys():
+        want = categories.get(key)
+        have = stored_cats.get(key)
+        if want is None or have is None or want[:2] != have[:2] \
+                or abs(want[2] - have[2]) > TOLERANCE:
+            problems.append(f"category {key or 'Uncategorized'!r}: stored {have}, actual {want}")
+
+    return problems
+
+
+def rebuild():
+    sales, categories = compute()
+    db.session.execute(delete(ProductSalesTotal))
+    db.session.execute(delete(CategoryStats))
+    if sales:
+        db.session.execute(insert(ProductSalesTotal), [
+            {"product_id": pid, "units_sold": units, "revenue": revenue}
+            for pid, (units, revenue) in sales.items()
+        ])
+    if categories:
+        db.session.execute(insert(CategoryStats), [
+            {"category": key, "product_count": c, "stock": s, "stock_value": v}
+            for key, (c, s, v) in categories.items()
+        ])
+    db.session.commit()
@@ -1,6 +1,11 @@
 from flask import Flask
 from config import Config
 from models import db
+from cache import response_cache
+from reports import report_queue
+from instrumentation import request_metrics
+from database import pool_metrics
+from events import notification_events
 from routes import bp
 from flask_migrate import Migrate
 from flask_cors import CORS
@@ -9,9 +14,19 @@ def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
 
-    CORS(app, origins=["https://smart-inventory-system-frontend.onrender.com"])
+    CORS(
+        app,
+        origins=["https://smart-inventory-system-frontend.onrender.com"],
+        expose_headers=["Link", "X-Next-Cursor", "ETag", "Server-Timing"],
+    )
 
     db.init_app(app)
+    response_cache.init_app(app)
+    report_queue.init_app(app)
+    request_metrics.init_app(app)
+    request_metrics.register_collector("pool", pool_metrics(db))
+    notification_events.init_app(app, db.session)
+    request_metrics.register_collector("sse", notification_events.metrics)
     migrate = Migrate(app, db)
 
     app.register_blueprint(bp, url_prefix="/api")
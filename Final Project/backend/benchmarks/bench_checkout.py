@@ -0,0 +1,105 @@
+"""
+Checkout benchmark: per-line ORM loop vs the set-based engine in checkout.py.
+
+Reports SQL round trips and latency per basket at 1, 10 and 100 lines.
+
+    python benchmarks/bench_checkout.py            # temp SQLite file
+    DATABASE_URL=postgresql://... python benchmarks/bench_checkout.py
+"""
+import os
+import sys
+import tempfile
+import time
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+if not os.getenv("DATABASE_URL"):
+    _tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+    os.environ["DATABASE_URL"] = f"sqlite:///{_tmp.name}"
+
+from sqlalchemy import event
+from app import create_app
+from models import db, Product, Sale, Notification
+from checkout import run_checkout
+
+BASKET_SIZES = (1, 10, 100)
+ROUNDS = int(os.getenv("BENCH_ROUNDS", 50))
+STOCK = 10_000_000
+
+
+def legacy_checkout(items):
+    """The original create_sale loop, kept here as the baseline."""
+    created_sales = []
+    for it in items:
+        pid = it.get("product_id")
+        qty = int(it.get("quantity", 0) or 0)
+        if not pid or qty <= 0:
+            continue
+
+        product = Product.query.get_or_404(pid)
+        if product.stock_quantity < qty:
+            raise RuntimeError(f"Not enough stock for {product.name}")
+
+        product.stock_quantity -= qty
+        total = qty * product.price
+        db.session.add(Sale(product_id=product.id, quantity_sold=qty, total_price=total))
+        created_sales.append({
+            "product_id": product.id,
+            "product_name": product.name,
+            "qty": qty,
+            "total": total
+        })
+        if product.stock_quantity <= product.reorder_level:
+            msg = f"Low stock: {product.name} (qty: {product.stock_quantity})"
+            db.session.add(Notification(product_id=product.id, message=msg))
+    return created_sales
+
+
+def seed(n_products):
+    db.drop_all()
+    db.create_all()
+    db.session.add_all([
+        Product(name=f"Bench {i}", category="Bench", price=1.5,
+                stock_quantity=STOCK, reorder_level=5)
+        for i in range(n_products)
+    ])
+    db.session.commit()
+
+
+def measure(fn, basket):
+    counter = {"n": 0}
+
+    def on_execute(*_args):
+        counter["n"] += 1
+
+    engine = db.engine
+    event.listen(engine, "before_cursor_execute", on_execute)
+    timings = []
+    try:
+        for _ in range(ROUNDS):
+            start = time.perf_counter()
+            fn(basket)
+            db.session.commit()
+            timings.append((time.perf_counter() - start) * 1000)
+            # drop identity-map state so each round reloads like a fresh request
+            db.session.expire_all()
+    finally:
+        event.remove(engine, "before_cursor_execute", on_execute)
+    return counter["n"] / ROUNDS, statistics.median(timings)
+
+
+def main():
+    app = create_app()
+    with app.app_context():
+        seed(max(BASKET_SIZES))
+        print(f"{'lines':>6} {'impl':>8} {'queries':>8} {'p50 ms':>9}")
+        for size in BASKET_SIZES:
+            basket = [{"product_id": i + 1, "quantity": 1} for i in range(size)]
+            for label, fn in (("loop", legacy_checkout), ("batched", run_checkout)):
+                queries, p50 = measure(fn, basket)
+                print(f"{size:>6} {label:>8} {queries:>8.1f} {p50:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Streaming CSV export memory benchmark.
+
+For each row count one child process seeds a SQLite file with that many
+sales (in bounded batches) and a second, fresh child pulls
+/api/sales/export/csv through the test client without buffering, so its
+peak RSS reflects the export alone. It should stay flat as rows grow.
+
+    python benchmarks/bench_export.py                      # 10k .. 5M rows
+    EXPORT_ROWS=10000,100000 python benchmarks/bench_export.py
+"""
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+ROW_COUNTS = [
+    int(n) for n in os.getenv("EXPORT_ROWS", "10000,100000,1000000,5000000").split(",")
+]
+SEED_BATCH = 50_000
+
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 2**20
+
+
+def seed(rows):
+    from sqlalchemy import insert
+    from app import create_app
+    from models import db, Product, Sale
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        db.session.add_all([
+            Product(name=f"Export {i}", category="Bench", price=2.5, stock_quantity=0)
+            for i in range(20)
+        ])
+        db.session.commit()
+
+        start = datetime.utcnow() - timedelta(days=1)
+        for offset in range(0, rows, SEED_BATCH):
+            batch = min(SEED_BATCH, rows - offset)
+            db.session.execute(insert(Sale), [
+                {
+                    "product_id": (offset + i) % 20 + 1,
+                    "quantity_sold": 1,
+                    "total_price": 2.5,
+                    "sale_date": start + timedelta(microseconds=offset + i),
+                }
+                for i in range(batch)
+            ])
+            db.session.commit()
+
+
+def export(rows):
+    from app import create_app
+
+    app = create_app()
+    rss_before = peak_rss_mb()
+    client = app.test_client()
+    t0 = time.perf_counter()
+    resp = client.get("/api/sales/export/csv?from=2000-01-01", buffered=False)
+    size = sum(len(chunk) for chunk in resp.response)
+    resp.close()
+    elapsed = time.perf_counter() - t0
+    print(f"{rows:>9} {size / 2**20:>9.1f} {elapsed:>8.2f} "
+          f"{rss_before:>11.1f} {peak_rss_mb():>10.1f}")
+
+
+def run_child(mode, rows, env):
+    subprocess.run(
+        [sys.executable, os.path.abspath(__file__), mode, str(rows)],
+        env=env, check=True,
+    )
+
+
+def main():
+    if len(sys.argv) == 3 and sys.argv[1] in ("--seed", "--export"):
+        (seed if sys.argv[1] == "--seed" else export)(int(sys.argv[2]))
+        return
+
+    print(f"{'rows':>9} {'csv MB':>9} {'secs':>8} {'rss idle MB':>11} {'peak MB':>10}")
+    for rows in ROW_COUNTS:
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ, DATABASE_URL=f"sqlite:///{tmp}/export.db")
+            run_child("--seed", rows, env)
+            run_child("--export", rows, env)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Reorder-level forecasting benchmark.
+
+Seeds PRODUCTS products and DAYS days of daily sales rollups (Zipf-skewed
+popularity, weekly seasonality, Poisson daily demand; product-days with
+no sales have no row) into a temp SQLite database unless DATABASE_URL is
+set, then times forecast.run over the default 90-day lookback and over
+the full history, split into load / compute / write.
+
+    python benchmarks/bench_forecast.py                    # 100k x 730 days
+    PRODUCTS=20000 DAYS=365 python benchmarks/bench_forecast.py
+    ZIPF_S=0.5 python benchmarks/bench_forecast.py         # ~12% of product-days sell
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+if not os.getenv("DATABASE_URL"):
+    _tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+    os.environ["DATABASE_URL"] = f"sqlite:///{_tmp.name}"
+
+import numpy as np
+from sqlalchemy import insert
+from app import create_app
+from models import db, Product, ProductSalesRollup
+import forecast
+
+PRODUCTS = int(os.getenv("PRODUCTS", 100_000))
+DAYS = int(os.getenv("DAYS", 730))
+# popularity skew; lower means more products sell on most days (more rollup rows)
+ZIPF_S = float(os.getenv("ZIPF_S", 0.8))
+BATCH = 100_000
+
+
+def seed(today):
+    rng = np.random.default_rng(42)
+    db.drop_all()
+    db.create_all()
+
+    for offset in range(0, PRODUCTS, BATCH):
+        db.session.execute(insert(Product), [
+            {"id": i + 1, "name": f"Product {i + 1}", "category": "Bench", "price": 1.0,
+             "stock_quantity": int(rng.integers(0, 500)), "reorder_level": 5}
+            for i in range(offset, min(offset + BATCH, PRODUCTS))
+        ])
+    db.session.commit()
+
+    # mean daily units: a few best sellers, a long tail of slow movers
+    rates = (20.0 / np.arange(1, PRODUCTS + 1) ** ZIPF_S)[rng.permutation(PRODUCTS)]
+    start = datetime(today.year, today.month, today.day) - timedelta(days=DAYS)
+    rows = 0
+    batch = []
+    for d in range(DAYS):
+        day = start + timedelta(days=d)
+        counts = rng.poisson(rates * (1.3 if day.weekday() >= 5 else 1.0))
+        sold = np.flatnonzero(counts)
+        batch.extend(
+            {"period": "day", "product_id": pid, "bucket": day,
+             "units": units, "revenue": float(units), "sales": units}
+            for pid, units in zip((sold + 1).tolist(), counts[sold].tolist())
+        )
+        if len(batch) >= BATCH or d == DAYS - 1:
+            db.session.execute(insert(ProductSalesRollup), batch)
+            db.session.commit()
+            rows += len(batch)
+            batch = []
+    return rows
+
+
+def main():
+    app = create_app()
+    today = datetime.utcnow()
+    with app.app_context():
+        t0 = time.perf_counter()
+        rows = seed(today)
+        print(f"seeded {PRODUCTS:,} products, {rows:,} daily rollup rows over {DAYS} days "
+              f"in {time.perf_counter() - t0:.1f}s")
+
+        print(f"{'lookback':>8} {'cells':>12} {'load s':>7} {'compute s':>9} "
+              f"{'write s':>7} {'changed':>8}")
+        for lookback in (90, DAYS):
+            report = forecast.run(lookback_days=lookback, today=today)
+            t = report["timings"]
+            print(f"{lookback:>8} {report['history_cells']:>12,} {t['load']:>7.2f} "
+                  f"{t['compute']:>9.2f} {t['write']:>7.2f} {report['changed']:>8,}")
+
+
+if __name__ == "__main__":
+    main()
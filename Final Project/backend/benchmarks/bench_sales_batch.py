@@ -0,0 +1,116 @@
+"""
+Offline-terminal upload benchmark: baskets per second through
+/api/sales/batch at different batch sizes, against one POST /api/sales per
+basket.
+
+Uploads BASKETS baskets of 1-LINES random lines (temp SQLite unless
+DATABASE_URL is set) for each batch size, then resends the last upload to
+time replays. Batches larger than SALES_BATCH_CHUNK are split into one
+transaction per chunk.
+
+    python benchmarks/bench_sales_batch.py
+    BASKETS=5000 SALES_BATCH_CHUNK=250 python benchmarks/bench_sales_batch.py
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+if not os.getenv("DATABASE_URL"):
+    _tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+    os.environ["DATABASE_URL"] = f"sqlite:///{_tmp.name}"
+os.environ.setdefault("SLOW_REQUEST_MS", "100000")
+os.environ.setdefault("QUERY_BUDGET", "100000")
+
+from sqlalchemy import event, insert
+from app import create_app
+from models import db, Product
+
+PRODUCTS = int(os.getenv("PRODUCTS", 2000))
+BASKETS = int(os.getenv("BASKETS", 2000))
+LINES = int(os.getenv("LINES", 5))
+BATCH_SIZES = (1, 10, 50, 100, 500, 1000)
+STOCK = 10_000_000
+
+
+def seed():
+    db.drop_all()
+    db.create_all()
+    db.session.execute(insert(Product), [
+        {"id": i + 1, "name": f"Bench {i + 1}", "category": f"Category {i % 20}",
+         "price": 1.5, "stock_quantity": STOCK, "reorder_level": 5}
+        for i in range(PRODUCTS)
+    ])
+    db.session.commit()
+
+
+def baskets(rng, n):
+    return [
+        {"key": str(uuid.uuid4()),
+         "items": [{"product_id": rng.randint(1, PRODUCTS), "quantity": rng.randint(1, 3)}
+                   for _ in range(rng.randint(1, LINES))]}
+        for _ in range(n)
+    ]
+
+
+def upload(client, batch_size, work):
+    """(seconds, {status: baskets}) to upload work batch_size baskets per request."""
+    statuses = {}
+    t0 = time.perf_counter()
+    for start in range(0, len(work), batch_size):
+        resp = client.post("/api/sales/batch", json={"baskets": work[start:start + batch_size]})
+        assert resp.status_code == 200, resp.get_json()
+        for status, n in resp.get_json()["counts"].items():
+            statuses[status] = statuses.get(status, 0) + n
+    return time.perf_counter() - t0, statuses
+
+
+def main():
+    app = create_app()
+    rng = random.Random(42)
+    with app.app_context():
+        seed()
+        engine = db.engine
+
+    counter = {"n": 0}
+
+    def on_execute(*_args):
+        counter["n"] += 1
+
+    event.listen(engine, "before_cursor_execute", on_execute)
+    client = app.test_client()
+    chunk = app.config["SALES_BATCH_CHUNK"]
+    print(f"{BASKETS:,} baskets of 1-{LINES} lines, {chunk} baskets per transaction")
+    print(f"{'mode':<22} {'baskets/s':>10} {'queries/basket':>15}")
+
+    work = baskets(rng, BASKETS)
+    counter["n"] = 0
+    t0 = time.perf_counter()
+    for b in work:
+        resp = client.post("/api/sales", json={"items": b["items"]})
+        assert resp.status_code == 201, resp.get_json()
+    elapsed = time.perf_counter() - t0
+    print(f"{'POST /api/sales':<22} {BASKETS / elapsed:>10,.0f} {counter['n'] / BASKETS:>15.1f}")
+
+    for size in BATCH_SIZES:
+        work = baskets(rng, BASKETS)
+        counter["n"] = 0
+        elapsed, statuses = upload(client, size, work)
+        assert statuses.get("ok") == BASKETS, statuses
+        print(f"{f'batch of {size}':<22} {BASKETS / elapsed:>10,.0f} "
+              f"{counter['n'] / BASKETS:>15.1f}")
+
+    # the terminal never got the responses and sends the same baskets again
+    counter["n"] = 0
+    elapsed, statuses = upload(client, BATCH_SIZES[-1], work)
+    assert statuses.get("replayed") == BASKETS, statuses
+    print(f"{f'replay, batch of {BATCH_SIZES[-1]}':<22} {BASKETS / elapsed:>10,.0f} "
+          f"{counter['n'] / BASKETS:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+List endpoint serialization benchmark: Core rows + orjson vs. the old ORM path.
+
+Seeds PRODUCTS products, SALES sales and NOTIFICATIONS notifications into a
+temp SQLite database unless DATABASE_URL is set, and mounts the previous
+implementations (ORM instances, a dict per row with isoformat(), jsonify)
+under /legacy so both go through the same request handling. Reports
+median process CPU time per request and the response size.
+
+    python benchmarks/bench_serialization.py
+    PRODUCTS=20000 REPEAT=5 python benchmarks/bench_serialization.py
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+if not os.getenv("DATABASE_URL"):
+    _tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+    os.environ["DATABASE_URL"] = f"sqlite:///{_tmp.name}"
+os.environ.setdefault("SLOW_REQUEST_MS", "100000")
+
+from flask import Blueprint, jsonify, request
+from sqlalchemy import insert
+from app import create_app
+from cache import response_cache
+from models import db, Product, Sale, Notification
+
+PRODUCTS = int(os.getenv("PRODUCTS", 100_000))
+SALES = int(os.getenv("SALES", 100_000))
+NOTIFICATIONS = int(os.getenv("NOTIFICATIONS", 50_000))
+REPEAT = int(os.getenv("REPEAT", 9))
+BATCH = 50_000
+
+legacy = Blueprint("legacy", __name__, url_prefix="/legacy")
+
+
+def iso(v):
+    return v.isoformat() if v else None
+
+
+@legacy.route("/products")
+def legacy_products():
+    q = Product.query.order_by(Product.name.asc(), Product.id.asc())
+    if request.args.get("limit"):
+        q = q.limit(int(request.args["limit"]))
+    products = q.all()
+    return jsonify([
+        {"id": p.id, "name": p.name, "category": p.category, "price": p.price,
+         "stock_quantity": p.stock_quantity, "reorder_level": p.reorder_level,
+         "supplier_id": p.supplier_id, "created_at": iso(p.created_at)}
+        for p in products
+    ])
+
+
+@legacy.route("/sales")
+def legacy_sales():
+    rows = (
+        db.session.query(Sale, Product.name)
+        .join(Product, Sale.product_id == Product.id)
+        .order_by(Sale.sale_date.desc())
+        .limit(100)
+        .all()
+    )
+    return jsonify([
+        {"id": s.Sale.id, "product_name": s.name, "quantity_sold": s.Sale.quantity_sold,
+         "total_price": float(s.Sale.total_price), "sale_date": s.Sale.sale_date.isoformat()}
+        for s in rows
+    ])
+
+
+@legacy.route("/notifications")
+def legacy_notifications():
+    rows = (
+        Notification.query
+        .order_by(Notification.created_at.desc(), Notification.id.desc())
+        .limit(500)
+        .all()
+    )
+    return jsonify([
+        {"id": n.id, "product_id": n.product_id, "message": n.message, "seen": n.seen,
+         "occurrences": n.occurrences, "last_quantity": n.last_quantity,
+         "created_at": iso(n.created_at), "updated_at": iso(n.updated_at)}
+        for n in rows
+    ])
+
+
+def seed():
+    db.drop_all()
+    db.create_all()
+    now = datetime.utcnow().replace(microsecond=0)
+    for offset in range(0, PRODUCTS, BATCH):
+        db.session.execute(insert(Product), [
+            {"id": i + 1, "name": f"Product {i + 1:06d}", "category": f"Category {i % 40}",
+             "price": 1.0 + i % 500, "stock_quantity": i % 300, "reorder_level": 5,
+             "created_at": now - timedelta(minutes=i)}
+            for i in range(offset, min(offset + BATCH, PRODUCTS))
+        ])
+    for offset in range(0, SALES, BATCH):
+        db.session.execute(insert(Sale), [
+            {"product_id": i % PRODUCTS + 1, "quantity_sold": 1 + i % 5,
+             "total_price": 2.5 * (1 + i % 5), "sale_date": now - timedelta(seconds=i * 7)}
+            for i in range(offset, min(offset + BATCH, SALES))
+        ])
+    for offset in range(0, NOTIFICATIONS, BATCH):
+        db.session.execute(insert(Notification), [
+            {"product_id": i % PRODUCTS + 1, "message": f"Low stock: Product {i + 1:06d} (qty: 3)",
+             "seen": True, "occurrences": 1 + i % 9, "last_quantity": 3,
+             "created_at": now - timedelta(minutes=i), "updated_at": now - timedelta(minutes=i)}
+            for i in range(offset, min(offset + BATCH, NOTIFICATIONS))
+        ])
+    db.session.commit()
+
+
+def measure(client, url, follow=False):
+    """(median CPU ms, total bytes) for one request, or a whole page walk with follow."""
+    samples, size = [], 0
+    for _ in range(REPEAT):
+        t0 = time.process_time()
+        size, next_url = 0, url
+        while next_url:
+            resp = client.get(next_url)
+            assert resp.status_code == 200, (next_url, resp.status_code)
+            size += len(resp.get_data())
+            cursor = resp.headers.get("X-Next-Cursor")
+            next_url = f"{url}&cursor={cursor}" if follow and cursor else None
+        samples.append((time.process_time() - t0) * 1000)
+    return statistics.median(samples), size
+
+
+def main():
+    app = create_app()
+    app.register_blueprint(legacy)
+    response_cache.ttls = {}  # measure serialization, not the response cache
+    with app.app_context():
+        t0 = time.perf_counter()
+        seed()
+        print(f"seeded {PRODUCTS:,} products, {SALES:,} sales, {NOTIFICATIONS:,} notifications "
+              f"in {time.perf_counter() - t0:.1f}s")
+
+    client = app.test_client()
+    groups = [
+        (f"products, all {PRODUCTS:,}", [
+            ("legacy ORM + jsonify", "/legacy/products", False),
+            ("stream=1", "/api/products?stream=1", False),
+            ("pages of 500, rows", "/api/products?limit=500", True),
+            ("pages of 500, columnar", "/api/products?limit=500&format=columnar", True),
+        ]),
+        ("products, one page of 500", [
+            ("legacy ORM + jsonify", "/legacy/products?limit=500", False),
+            ("rows", "/api/products?limit=500", False),
+            ("columnar", "/api/products?limit=500&format=columnar", False),
+        ]),
+        ("sales, last 100", [
+            ("legacy ORM + jsonify", "/legacy/sales", False),
+            ("rows", "/api/sales?format=rows", False),
+            ("columnar", "/api/sales?format=columnar", False),
+        ]),
+        ("notifications, page of 500", [
+            ("legacy ORM + jsonify", "/legacy/notifications", False),
+            ("rows", "/api/notifications?limit=500", False),
+            ("columnar", "/api/notifications?limit=500&format=columnar", False),
+        ]),
+    ]
+    for title, cases in groups:
+        print(f"\n{title}")
+        print(f"  {'variant':<26} {'cpu ms':>9} {'bytes':>12}")
+        for name, url, follow in cases:
+            cpu, size = measure(client, url, follow)
+            print(f"  {name:<26} {cpu:>9.1f} {size:>12,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Sales time-series benchmark: rollup tables vs. scanning raw sales.
+
+Generates a year of sales with datagen (temp SQLite unless DATABASE_URL is
+set), rebuilds the rollups, then times /api/sales/timeseries for a range
+of granularities and filters against the equivalent GROUP BY over the
+sales table. Rollup latency should stay flat as SALES_PER_DAY grows.
+datagen wipes the database, so a DATABASE_URL that isn't a local *bench*
+database needs WIPE=1.
+
+    python benchmarks/bench_timeseries.py
+    SALES_PER_DAY=5000 YEARS=2 python benchmarks/bench_timeseries.py
+    DATABASE_URL=postgresql://db.internal/scratch WIPE=1 python benchmarks/bench_timeseries.py
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+if not os.getenv("DATABASE_URL"):
+    _tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+    os.environ["DATABASE_URL"] = f"sqlite:///{_tmp.name}"
+os.environ.setdefault("SLOW_REQUEST_MS", "10000")
+
+from sqlalchemy import select, func
+from app import create_app
+from cache import response_cache
+from models import db, Product, Sale
+from benchmarks.datagen import generate
+
+PRODUCTS = int(os.getenv("PRODUCTS", 2000))
+YEARS = float(os.getenv("YEARS", 1))
+SALES_PER_DAY = int(os.getenv("SALES_PER_DAY", 1000))
+REPEAT = int(os.getenv("REPEAT", 20))
+
+
+def timed(fn):
+    samples = []
+    for _ in range(REPEAT):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+def raw_daily(start, end, product_id=None, category=None):
+    """The same answer straight from the sales table."""
+    day = func.date(Sale.sale_date)
+    q = (
+        select(day, func.sum(Sale.quantity_sold), func.sum(Sale.total_price), func.count())
+        .where(Sale.sale_date >= start, Sale.sale_date < end)
+        .group_by(day)
+    )
+    if product_id is not None:
+        q = q.where(Sale.product_id == product_id)
+    if category is not None:
+        q = q.join(Product, Sale.product_id == Product.id).where(Product.category == category)
+    return db.session.execute(q).all()
+
+
+def main():
+    app = create_app()
+    response_cache.ttls = {}  # measure the query, not the response cache
+    with app.app_context():
+        t0 = time.perf_counter()
+        n_sales, timings = generate(products=PRODUCTS, years=YEARS, sales_per_day=SALES_PER_DAY,
+                                    wipe=os.getenv("WIPE") == "1")
+        print(f"{n_sales:,} sales generated in {time.perf_counter() - t0:.1f}s, "
+              f"rollups rebuilt in {timings['rollups']:.1f}s")
+
+        end = db.session.execute(select(func.max(Sale.sale_date))).scalar()
+        start = end - timedelta(days=365)
+        top = db.session.execute(
+            select(Sale.product_id).group_by(Sale.product_id)
+            .order_by(func.count().desc()).limit(1)
+        ).scalar()
+        category = db.session.execute(select(Product.category).limit(1)).scalar()
+
+    client = app.test_client()
+    window = f"from={start.isoformat()}&to={end.isoformat()}"
+    cases = [
+        ("year by day, all", f"granularity=day&{window}", {}),
+        ("year by week, all", f"granularity=week&{window}", {}),
+        ("year by month, category", f"granularity=month&{window}&category={category}",
+         {"category": category}),
+        ("year by day, product", f"granularity=day&{window}&product_id={top}",
+         {"product_id": top}),
+        ("week by hour, all", f"granularity=hour&from={(end - timedelta(days=7)).isoformat()}"
+                              f"&to={end.isoformat()}", None),
+    ]
+
+    print(f"{'case':<26} {'rollup ms':>10} {'raw scan ms':>12}")
+    for name, query, raw_filter in cases:
+        url = f"/api/sales/timeseries?{query}"
+        assert client.get(url).status_code == 200, url
+        rollup_ms = timed(lambda: client.get(url))
+        raw_ms = "-"
+        if raw_filter is not None:
+            with app.app_context():
+                raw_ms = f"{timed(lambda: raw_daily(start, end, **raw_filter)):.1f}"
+        print(f"{name:<26} {rollup_ms:>10.1f} {raw_ms:>12}")
+
+
+if __name__ == "__main__":
+    main()
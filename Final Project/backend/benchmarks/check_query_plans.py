@@ -0,0 +1,182 @@
+"""
+Query-plan regression check.
+
+Seeds a local database, calls the read endpoints through the test client,
+captures every SELECT they issue and runs EXPLAIN on it. Exits non-zero if a
+plan falls back to a full table scan on a table with more than
+PLAN_ROW_THRESHOLD rows.
+
+    python benchmarks/check_query_plans.py            # temp SQLite file
+    DATABASE_URL=postgresql://... python benchmarks/check_query_plans.py
+"""
+import json
+import os
+import re
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+if not os.getenv("DATABASE_URL"):
+    _tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+    os.environ["DATABASE_URL"] = f"sqlite:///{_tmp.name}"
+
+from sqlalchemy import event, insert, text
+from app import create_app
+from models import db, Supplier, Product, Sale, Notification
+import aggregates
+
+ROW_THRESHOLD = int(os.getenv("PLAN_ROW_THRESHOLD", 1000))
+PRODUCTS = 5000
+SALES = 50_000
+NOTIFICATIONS = 5000
+
+ENDPOINTS = [
+    "/api/products",
+    "/api/products?category=Cat3",
+    "/api/products?supplier_id=2",
+    "/api/products?low_stock=1",
+    "/api/sales",
+    "/api/notifications",
+    "/api/notifications?unseen=1",
+    "/api/notifications?product_id=7",
+    "/api/dashboard-summary",
+    "/api/sales/export/csv?product_id=5",
+]
+
+
+def seed():
+    db.drop_all()
+    db.create_all()
+    db.session.execute(insert(Supplier), [
+        {"name": f"Supplier {i}", "contact": None} for i in range(20)
+    ])
+    now = datetime.utcnow()
+    db.session.execute(insert(Product), [
+        {
+            "name": f"Product {i:05d}", "category": f"Cat{i % 40}", "price": 1.0 + i % 50,
+            "stock_quantity": i % 100, "reorder_level": 5, "supplier_id": i % 20 + 1,
+            "created_at": now,
+        }
+        for i in range(PRODUCTS)
+    ])
+    db.session.execute(insert(Sale), [
+        {
+            "product_id": i % PRODUCTS + 1, "quantity_sold": 1, "total_price": 2.0,
+            "sale_date": now - timedelta(minutes=i),
+        }
+        for i in range(SALES)
+    ])
+    db.session.execute(insert(Notification), [
+        {
+            "product_id": i % PRODUCTS + 1, "message": "Low stock", "seen": i % 10 != 0,
+            "created_at": now - timedelta(minutes=i),
+        }
+        for i in range(NOTIFICATIONS)
+    ])
+    db.session.commit()
+    aggregates.rebuild()
+
+    # fresh planner statistics, as a production database would have
+    if db.engine.dialect.name == "mysql":
+        for table in db.metadata.sorted_tables:
+            db.session.execute(text(f"ANALYZE TABLE {table.name}"))
+    else:
+        db.session.execute(text("ANALYZE"))
+    db.session.commit()
+
+
+def table_sizes():
+    sizes = {}
+    for table in db.metadata.sorted_tables:
+        sizes[table.name] = db.session.execute(
+            text(f"SELECT COUNT(*) FROM {table.name}")
+        ).scalar()
+    return sizes
+
+
+def capture(app):
+    statements = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and not executemany:
+            statements.append((statement, parameters))
+
+    event.listen(db.engine, "before_cursor_execute", on_execute)
+    client = app.test_client()
+    try:
+        for url in ENDPOINTS:
+            before = len(statements)
+            resp = client.get(url)
+            assert resp.status_code == 200, f"{url} -> {resp.status_code}"
+            for i in range(before, len(statements)):
+                statements[i] = (url,) + statements[i]
+    finally:
+        event.remove(db.engine, "before_cursor_execute", on_execute)
+    return statements
+
+
+def full_scans(statement, parameters):
+    """Tables the plan reads without any index."""
+    dialect = db.engine.dialect.name
+    raw = db.engine.raw_connection()
+    try:
+        cur = raw.cursor()
+        if dialect == "sqlite":
+            cur.execute("EXPLAIN QUERY PLAN " + statement, parameters)
+            details = [row[-1] for row in cur.fetchall()]
+            # "SCAN products" is a full scan; "SCAN ... USING INDEX" is not
+            return [
+                m.group(1) for d in details
+                for m in [re.match(r"SCAN (\w+)$", d)] if m
+            ]
+        if dialect == "postgresql":
+            cur.execute("EXPLAIN (FORMAT JSON) " + statement, parameters)
+            plan = cur.fetchone()[0]
+            plan = json.loads(plan) if isinstance(plan, str) else plan
+            found = []
+
+            def walk(node):
+                if node.get("Node Type") == "Seq Scan":
+                    found.append(node["Relation Name"])
+                for child in node.get("Plans", []):
+                    walk(child)
+
+            walk(plan[0]["Plan"])
+            return found
+        if dialect == "mysql":
+            cur.execute("EXPLAIN " + statement, parameters)
+            cols = [c[0] for c in cur.description]
+            return [
+                row["table"] for row in (dict(zip(cols, r)) for r in cur.fetchall())
+                if row["type"] == "ALL"
+            ]
+        raise SystemExit(f"EXPLAIN not supported for {dialect}")
+    finally:
+        raw.close()
+
+
+def main():
+    app = create_app()
+    with app.app_context():
+        seed()
+        sizes = table_sizes()
+        failures = 0
+        for url, statement, parameters in capture(app):
+            scans = [t for t in full_scans(statement, parameters)
+                     if sizes.get(t, 0) > ROW_THRESHOLD]
+            status = "FAIL" if scans else "ok"
+            failures += bool(scans)
+            first_line = " ".join(statement.split())[:90]
+            print(f"{status:>4}  {url:<40} {first_line}")
+            for t in scans:
+                print(f"      full scan on {t} ({sizes[t]} rows)")
+
+    if failures:
+        raise SystemExit(f"{failures} statement(s) scan tables above {ROW_THRESHOLD} rows")
+    print("no sequential scans above threshold ✔")
+
+
+if __name__ == "__main__":
+    main()
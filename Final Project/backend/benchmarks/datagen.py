@@ -0,0 +1,223 @@
+"""
+Synthetic data generator for scale testing.
+
+Creates suppliers, products and years of sales with weekly + yearly
+seasonality and Zipf-skewed product popularity, bulk-loaded in batches
+(COPY on PostgreSQL, executemany elsewhere). Wipes the target database,
+so it has to be asked for with --wipe; without it only a throwaway
+database is touched (see disposable()).
+
+    python benchmarks/datagen.py --wipe --products 20000 --years 2 --sales-per-day 5000
+    DATABASE_URL=postgresql://localhost/inventory_bench python benchmarks/datagen.py --wipe ...
+"""
+import argparse
+import csv
+import io
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert
+from sqlalchemy.engine import make_url
+
+CATEGORIES = [
+    "Drinks", "Snacks", "Food", "Essentials", "Frozen", "Dairy", "Bakery",
+    "Household", "Personal Care", "Stationery", "Pet", "Baby",
+]
+BATCH = 50_000
+LOCAL_HOSTS = ("", "localhost", "127.0.0.1", "::1")
+
+
+def seasonality(day):
+    """Multiplier for a calendar day: weekend bump plus a yearly wave."""
+    weekly = 1.3 if day.weekday() >= 5 else 1.0
+    yearly = 1.0 + 0.25 * math.sin(2 * math.pi * (day.timetuple().tm_yday - 80) / 365)
+    return weekly * yearly
+
+
+def zipf_weights(n, s=1.1):
+    """Cumulative popularity weights: a few best sellers, a long tail."""
+    cum, total = [], 0.0
+    for rank in range(1, n + 1):
+        total += 1.0 / rank ** s
+        cum.append(total)
+    return cum
+
+
+def copy_rows(table, columns, rows):
+    """PostgreSQL COPY ... FROM STDIN for one batch."""
+    from models import db
+
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    for row in rows:
+        writer.writerow(["\\N" if v is None else v for v in row])
+    buf.seek(0)
+    raw = db.engine.raw_connection()
+    try:
+        raw.cursor().copy_expert(
+            f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+            buf,
+        )
+        raw.commit()
+    finally:
+        raw.close()
+
+
+def load(model, columns, rows):
+    """Bulk-load an iterable of tuples in BATCH-sized chunks."""
+    from models import db
+
+    use_copy = db.engine.dialect.name == "postgresql"
+    table = model.__table__
+    batch, loaded = [], 0
+
+    def flush():
+        if use_copy:
+            copy_rows(table.name, columns, batch)
+        else:
+            db.session.execute(insert(table), [dict(zip(columns, r)) for r in batch])
+            db.session.commit()
+
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH:
+            flush()
+            loaded += len(batch)
+            batch = []
+    if batch:
+        flush()
+        loaded += len(batch)
+    return loaded
+
+
+def disposable(url):
+    """
+    Whether url is a database generate() may wipe without being told to:
+    in-memory SQLite or a SQLite file under the temp directory (what the
+    benchmarks create), or a database on this machine whose name has
+    "bench" in it.
+    """
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite":
+        if url.database in (None, "", ":memory:"):
+            return True
+        tmp = os.path.realpath(tempfile.gettempdir())
+        return os.path.realpath(url.database).startswith(tmp + os.sep)
+    return (url.host or "") in LOCAL_HOSTS and "bench" in (url.database or "").lower()
+
+
+def generate(suppliers=50, products=5000, years=1.0, sales_per_day=1000, seed=42, wipe=False):
+    """Drops and recreates every table; refuses unless wipe or the database is disposable()."""
+    from models import db, Supplier, Product, Sale
+    import aggregates
+    import rollups
+
+    if not wipe and not disposable(db.engine.url):
+        raise RuntimeError(
+            f"refusing to wipe {db.engine.url.render_as_string(hide_password=True)}; "
+            "pass --wipe if that's really the benchmark database"
+        )
+    rng = random.Random(seed)
+    db.drop_all()
+    db.create_all()
+    timings = {}
+
+    t0 = time.perf_counter()
+    load(Supplier, ("id", "name", "contact"), (
+        (i, f"Supplier {i}", f"supplier{i}@example.com") for i in range(1, suppliers + 1)
+    ))
+
+    prices = [round(rng.uniform(5, 200), 2) for _ in range(products)]
+    now = datetime.utcnow()
+    load(Product, (
+        "id", "name", "category", "price", "stock_quantity",
+        "reorder_level", "supplier_id", "created_at",
+    ), (
+        (
+            i + 1, f"Product {i + 1:07d}", rng.choice(CATEGORIES), prices[i],
+            rng.randint(0, 500), rng.choice((5, 10, 20, 30)),
+            rng.randint(1, suppliers), now,
+        )
+        for i in range(products)
+    ))
+    timings["catalog"] = time.perf_counter() - t0
+
+    # shuffle which products are popular so ids don't correlate with rank
+    ranked = list(range(1, products + 1))
+    rng.shuffle(ranked)
+    cum = zipf_weights(products)
+    start = (now - timedelta(days=int(365 * years))).replace(hour=0, minute=0, second=0, microsecond=0)
+    days = int(365 * years)
+
+    def sales():
+        for d in range(days):
+            day = start + timedelta(days=d)
+            n = max(0, int(rng.gauss(sales_per_day * seasonality(day), sales_per_day * 0.1)))
+            for pid in rng.choices(ranked, cum_weights=cum, k=n):
+                qty = rng.choice((1, 1, 1, 2, 2, 3, 5))
+                at = day + timedelta(seconds=rng.randint(8 * 3600, 22 * 3600))
+                yield (pid, qty, at, round(qty * prices[pid - 1], 2))
+
+    t0 = time.perf_counter()
+    n_sales = load(Sale, ("product_id", "quantity_sold", "sale_date", "total_price"), sales())
+    timings["sales"] = time.perf_counter() - t0
+
+    if db.engine.dialect.name == "postgresql":
+        # COPY with explicit ids does not advance the sequences
+        for table in ("suppliers", "products"):
+            db.session.execute(db.text(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                f"(SELECT MAX(id) FROM {table}))"
+            ))
+        db.session.commit()
+
+    t0 = time.perf_counter()
+    aggregates.rebuild()
+    timings["aggregates"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    rollups.rebuild()
+    timings["rollups"] = time.perf_counter() - t0
+
+    return n_sales, timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--suppliers", type=int, default=50)
+    parser.add_argument("--products", type=int, default=5000)
+    parser.add_argument("--years", type=float, default=1.0)
+    parser.add_argument("--sales-per-day", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--wipe", "--yes", action="store_true",
+                        help="drop every table in DATABASE_URL first (required unless it is a "
+                             "temp SQLite file or a local *bench* database)")
+    args = parser.parse_args()
+
+    from app import create_app
+
+    app = create_app()
+    with app.app_context():
+        try:
+            n_sales, timings = generate(
+                args.suppliers, args.products, args.years, args.sales_per_day, args.seed,
+                wipe=args.wipe,
+            )
+        except RuntimeError as e:
+            parser.error(str(e))
+    rate = n_sales / timings["sales"] if timings["sales"] else 0
+    print(f"{args.suppliers} suppliers, {args.products} products, {n_sales} sales")
+    print(f"catalog {timings['catalog']:.1f}s, sales {timings['sales']:.1f}s "
+          f"({rate:,.0f} rows/s), aggregates {timings['aggregates']:.1f}s, "
+          f"rollups {timings['rollups']:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""
+Repeatable load benchmark for the /api endpoints.
+
+Drives each endpoint at a given concurrency, either in-process through the
+Flask test client or over HTTP against a running server (e.g. gunicorn),
+and records p50/p95/p99 latency and throughput as JSON. A later run can be
+compared against that baseline and fails on regressions.
+
+    python benchmarks/datagen.py --wipe --products 20000 --years 1     # data first
+    python benchmarks/load_test.py --concurrency 8 --save baseline.json
+    python benchmarks/load_test.py --concurrency 8 --compare baseline.json
+    python benchmarks/load_test.py --url http://127.0.0.1:5002 --concurrency 32
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ENDPOINTS = [
+    ("GET", "/api/products"),
+    ("GET", "/api/products?low_stock=1&fields=id,name,stock_quantity"),
+    ("GET", "/api/suppliers"),
+    ("GET", "/api/sales"),
+    ("GET", "/api/notifications?unseen=1"),
+    ("GET", "/api/dashboard-summary"),
+    ("GET", "/api/sales/export/csv?product_id=1"),
+    ("POST", "/api/sales"),
+]
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+class InProcessClient:
+    def __init__(self, app):
+        self.app = app
+        self.local = threading.local()
+
+    def request(self, method, path, body=None):
+        client = getattr(self.local, "client", None)
+        if client is None:
+            client = self.local.client = self.app.test_client()
+        resp = client.open(path, method=method, json=body)
+        resp.get_data()
+        return resp.status_code
+
+
+class HttpClient:
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip("/")
+
+    def request(self, method, path, body=None):
+        data = json.dumps(body).encode() if body is not None else None
+        req = urllib.request.Request(
+            self.base_url + path, data=data, method=method,
+            headers={"Content-Type": "application/json"} if data else {},
+        )
+        try:
+            with urllib.request.urlopen(req, timeout=60) as resp:
+                resp.read()
+                return resp.status
+        except urllib.error.HTTPError as e:
+            return e.code
+
+
+def random_basket(max_product_id):
+    return {"items": [
+        {"product_id": random.randint(1, max_product_id), "quantity": 1}
+        for _ in range(random.randint(1, 5))
+    ]}
+
+
+def drive(client, method, path, concurrency, requests, max_product_id):
+    latencies, errors = [], 0
+    lock = threading.Lock()
+    per_worker = max(1, requests // concurrency)
+
+    def worker():
+        nonlocal errors
+        local, bad = [], 0
+        for _ in range(per_worker):
+            body = random_basket(max_product_id) if method == "POST" else None
+            t0 = time.perf_counter()
+            status = client.request(method, path, body)
+            local.append((time.perf_counter() - t0) * 1000)
+            # 400 from POST /api/sales just means the random basket ran out of stock
+            if status >= 500:
+                bad += 1
+        with lock:
+            latencies.extend(local)
+            errors += bad
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "mean_ms": round(statistics.fmean(latencies), 2) if latencies else 0.0,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Print deltas and return the endpoints whose p95 regressed past tolerance."""
+    regressions = []
+    for key, now in results["endpoints"].items():
+        before = baseline["endpoints"].get(key)
+        if not before:
+            continue
+        delta = (now["p95_ms"] - before["p95_ms"]) / before["p95_ms"] if before["p95_ms"] else 0
+        flag = "REGRESSED" if delta > tolerance else ""
+        print(f"  {key:<60} p95 {before['p95_ms']:>8.2f} -> {now['p95_ms']:>8.2f} "
+              f"({delta:+.0%}) {flag}")
+        if flag:
+            regressions.append(key)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load benchmark for the /api endpoints")
+    parser.add_argument("--url", help="base URL of a running server; default is in-process")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=400, help="per endpoint")
+    parser.add_argument("--max-product-id", type=int, default=1000,
+                        help="basket product ids for POST /api/sales over --url")
+    parser.add_argument("--no-cache", action="store_true", help="disable the response cache")
+    parser.add_argument("--save", help="write results JSON here")
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed p95 growth")
+    args = parser.parse_args()
+
+    if args.url:
+        client = HttpClient(args.url)
+        max_product_id = args.max_product_id
+    else:
+        from app import create_app
+        from cache import response_cache
+        from models import db, Product
+
+        app = create_app()
+        if args.no_cache:
+            response_cache.ttls = {}
+        with app.app_context():
+            max_product_id = db.session.query(db.func.max(Product.id)).scalar() or 1
+        client = InProcessClient(app)
+
+    results = {
+        "created_at": datetime.utcnow().isoformat(),
+        "target": args.url or "in-process",
+        "concurrency": args.concurrency,
+        "endpoints": {},
+    }
+    for method, path in ENDPOINTS:
+        key = f"{method} {path}"
+        stats = drive(client, method, path, args.concurrency, args.requests, max_product_id)
+        results["endpoints"][key] = stats
+        print(f"{key:<60} {stats['throughput_rps']:>8.1f} rps  p50 {stats['p50_ms']:>7.2f}  "
+              f"p95 {stats['p95_ms']:>7.2f}  p99 {stats['p99_ms']:>7.2f}  err {stats['errors']}")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"saved {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"compared with {args.compare}:")
+        if compare(results, baseline, args.tolerance):
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
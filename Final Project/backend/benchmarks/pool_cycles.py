@@ -0,0 +1,91 @@
+"""
+Connection-pool load test: alternating bursts and idle periods.
+
+Each cycle fires a burst of concurrent requests, then sits idle longer than
+DB_POOL_RECYCLE so pooled connections go stale. With pre-ping and recycle
+the burst after an idle period should look like the first one: no errors
+and a similar p95. Pool counters are printed after each burst.
+
+    python benchmarks/pool_cycles.py                    # temp SQLite file
+    DATABASE_URL=postgresql://... IDLE_SECONDS=600 python benchmarks/pool_cycles.py
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+if not os.getenv("DATABASE_URL"):
+    _tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+    os.environ["DATABASE_URL"] = f"sqlite:///{_tmp.name}"
+os.environ.setdefault("DB_POOL_RECYCLE", "2")
+os.environ.setdefault("SLOW_REQUEST_MS", "10000")  # keep the burst output readable
+
+from app import create_app
+from cache import response_cache
+from models import db, Product, Supplier
+from benchmarks.load_test import percentile
+
+CYCLES = int(os.getenv("CYCLES", 4))
+BURST_THREADS = int(os.getenv("BURST_THREADS", 24))
+BURST_REQUESTS = int(os.getenv("BURST_REQUESTS", 20))
+IDLE_SECONDS = float(os.getenv("IDLE_SECONDS", 3))
+PATHS = ("/api/products?limit=50", "/api/dashboard-summary", "/api/suppliers")
+
+
+def burst(app):
+    latencies, errors = [], []
+    lock = threading.Lock()
+
+    def worker():
+        client = app.test_client()
+        local, bad = [], 0
+        for i in range(BURST_REQUESTS):
+            t0 = time.perf_counter()
+            status = client.get(PATHS[i % len(PATHS)]).status_code
+            local.append((time.perf_counter() - t0) * 1000)
+            bad += status != 200
+        with lock:
+            latencies.extend(local)
+            errors.append(bad)
+
+    threads = [threading.Thread(target=worker) for _ in range(BURST_THREADS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    latencies.sort()
+    return latencies, sum(errors)
+
+
+def main():
+    app = create_app()
+    response_cache.ttls = {}  # every request must reach the database
+    with app.app_context():
+        db.create_all()
+        if not Product.query.first():
+            db.session.add(Supplier(name="Pool Supplier"))
+            db.session.add_all([
+                Product(name=f"Pool {i}", category=f"C{i % 5}", price=1, stock_quantity=i)
+                for i in range(500)
+            ])
+            db.session.commit()
+        pool = db.engine.pool
+
+    print(f"{'cycle':>5} {'reqs':>6} {'err':>4} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'p99 ms':>8} {'overflow':>8} {'wait ms':>8}")
+    for cycle in range(1, CYCLES + 1):
+        wait_before = getattr(pool, "wait_seconds", 0.0)
+        latencies, errors = burst(app)
+        wait = (getattr(pool, "wait_seconds", 0.0) - wait_before) * 1000
+        print(f"{cycle:>5} {len(latencies):>6} {errors:>4} {percentile(latencies, 50):>8.2f} "
+              f"{percentile(latencies, 95):>8.2f} {percentile(latencies, 99):>8.2f} "
+              f"{max(pool.overflow(), 0):>8} {wait:>8.1f}")
+        if cycle < CYCLES:
+            time.sleep(IDLE_SECONDS)
+
+
+if __name__ == "__main__":
+    main()
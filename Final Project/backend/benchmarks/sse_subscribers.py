@@ -0,0 +1,175 @@
+"""
+Load test for /api/notifications/stream: many idle subscribers, one event.
+
+Starts gunicorn (gthread worker, one thread per open stream) on a temp
+SQLite database, opens SUBSCRIBERS concurrent event streams, samples the
+worker's CPU time and RSS while they sit idle, then records a low-stock
+sale and measures how long the notification takes to reach every stream.
+
+    python benchmarks/sse_subscribers.py
+    SUBSCRIBERS=5000 IDLE_SECONDS=60 python benchmarks/sse_subscribers.py
+"""
+import asyncio
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+if not os.getenv("DATABASE_URL"):
+    _tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+    os.environ["DATABASE_URL"] = f"sqlite:///{_tmp.name}"
+os.environ.setdefault("SLOW_REQUEST_MS", "10000")
+
+from app import create_app
+from models import db, Product
+from benchmarks.load_test import percentile
+
+SUBSCRIBERS = int(os.getenv("SUBSCRIBERS", 2000))
+IDLE_SECONDS = float(os.getenv("IDLE_SECONDS", 20))
+HEARTBEAT = os.getenv("SSE_HEARTBEAT_SECONDS", "15")
+CLK_TCK = os.sysconf("SC_CLK_TCK")
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def seed():
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        product = Product.query.filter_by(name="SSE probe").first()
+        if product is None:
+            # reorder level above stock, so every sale raises a notification
+            product = Product(name="SSE probe", category="Bench", price=1,
+                              stock_quantity=1_000_000, reorder_level=10_000_000)
+            db.session.add(product)
+            db.session.commit()
+        return product.id
+
+
+def start_server(port):
+    env = dict(os.environ, SSE_HEARTBEAT_SECONDS=HEARTBEAT,
+               SSE_MAX_SECONDS=str(int(IDLE_SECONDS) + 600))
+    server = subprocess.Popen(
+        ["gunicorn", "-k", "gthread", "-w", "1", "--threads", str(SUBSCRIBERS + 16),
+         "--worker-connections", str(SUBSCRIBERS + 16), "--timeout", "120", "-b", f"127.0.0.1:{port}", "--log-level", "warning", "app:app"],
+        cwd=BACKEND, env=env,
+    )
+    for _ in range(100):
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1)
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise SystemExit("gunicorn did not start")
+
+
+def worker_pids(master):
+    try:
+        with open(f"/proc/{master}/task/{master}/children") as f:
+            return [int(p) for p in f.read().split()] or [master]
+    except OSError:
+        return [master]
+
+
+def cpu_seconds(pids):
+    total = 0
+    for pid in pids:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        total += int(fields[11]) + int(fields[12])  # utime + stime
+    return total / CLK_TCK
+
+
+def rss_mb(pids):
+    total = 0
+    for pid in pids:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    total += int(line.split()[1])
+    return total / 1024
+
+
+async def subscribe(port, ready, received):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port, limit=1 << 20)
+    writer.write(b"GET /api/notifications/stream HTTP/1.1\r\nHost: bench\r\n"
+                 b"Accept: text/event-stream\r\n\r\n")
+    await writer.drain()
+    status = await reader.readline()
+    if b" 200 " not in status:
+        raise RuntimeError(status.decode().strip())
+    ready.append(1)
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            if line.startswith(b"data:"):
+                received.append(time.perf_counter())
+                return
+    finally:
+        writer.close()
+
+
+async def run(port, pids, product_id):
+    ready, received = [], []
+    tasks = [asyncio.create_task(subscribe(port, ready, received)) for _ in range(SUBSCRIBERS)]
+    t0 = time.perf_counter()
+    while len(ready) < SUBSCRIBERS:
+        failed = [t for t in tasks if t.done() and t.exception()]
+        if failed:
+            raise SystemExit(f"{len(failed)} streams failed: {failed[0].exception()}")
+        await asyncio.sleep(0.1)
+    print(f"{SUBSCRIBERS} streams open in {time.perf_counter() - t0:.1f}s, "
+          f"worker RSS {rss_mb(pids):.0f} MB")
+
+    cpu0, wall0 = cpu_seconds(pids), time.perf_counter()
+    await asyncio.sleep(IDLE_SECONDS)
+    idle_cpu = cpu_seconds(pids) - cpu0
+    wall = time.perf_counter() - wall0
+    print(f"idle {wall:.0f}s: worker CPU {idle_cpu:.2f}s "
+          f"({100 * idle_cpu / wall:.1f}% of one core), RSS {rss_mb(pids):.0f} MB")
+
+    body = json.dumps({"items": [{"product_id": product_id, "quantity": 1}]}).encode()
+    sale = urllib.request.Request(f"http://127.0.0.1:{port}/api/sales", data=body,
+                                  headers={"Content-Type": "application/json"})
+    sent = time.perf_counter()
+    await asyncio.to_thread(urllib.request.urlopen, sale, timeout=30)
+    await asyncio.wait(tasks, timeout=30)
+    latencies = sorted((t - sent) * 1000 for t in received)
+    print(f"fan-out to {len(latencies)}/{SUBSCRIBERS} streams: "
+          f"p50 {percentile(latencies, 50):.0f} ms, p99 {percentile(latencies, 99):.0f} ms, "
+          f"last {latencies[-1]:.0f} ms" if latencies else "no stream received the event")
+    for t in tasks:
+        t.cancel()
+
+
+def main():
+    product_id = seed()
+    port = free_port()
+    server = start_server(port)
+    try:
+        asyncio.run(run(port, worker_pids(server.pid), product_id))
+    finally:
+        server.send_signal(signal.SIGINT)  # quick shutdown; SIGTERM would wait on the streams
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+
+if __name__ == "__main__":
+    main()
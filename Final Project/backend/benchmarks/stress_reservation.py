@@ -0,0 +1,113 @@
+"""
+Concurrency stress test for stock reservation.
+
+Many POS "terminals" (threads) hammer POST /api/sales for a handful of
+products until stock runs out. At the end the sold quantities must add up
+exactly to the stock that disappeared and no product may go negative.
+Sales per second is reported for each worker count.
+
+    python benchmarks/stress_reservation.py            # temp SQLite file
+    DATABASE_URL=postgresql://... python benchmarks/stress_reservation.py
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+if not os.getenv("DATABASE_URL"):
+    _tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+    os.environ["DATABASE_URL"] = f"sqlite:///{_tmp.name}"
+
+from sqlalchemy import func
+from app import create_app
+from models import db, Product, Sale
+
+WORKER_COUNTS = (1, 2, 4, 8, 16)
+PRODUCTS = 5
+STOCK_PER_PRODUCT = int(os.getenv("STRESS_STOCK", 400))
+
+
+def seed():
+    db.drop_all()
+    db.create_all()
+    db.session.add_all([
+        Product(name=f"Stress {i}", price=1.0,
+                stock_quantity=STOCK_PER_PRODUCT, reorder_level=0)
+        for i in range(PRODUCTS)
+    ])
+    db.session.commit()
+
+
+def terminal(app, results, lock):
+    client = app.test_client()
+    ok = failed = errors = 0
+    while True:
+        basket = [
+            {"product_id": random.randint(1, PRODUCTS), "quantity": random.randint(1, 3)}
+            for _ in range(random.randint(1, 3))
+        ]
+        res = client.post("/api/sales", json={"items": basket})
+        if res.status_code == 201:
+            ok += 1
+        elif res.status_code == 400:
+            failed += 1
+            # stop once everything is (nearly) gone
+            if failed > 50:
+                break
+        else:
+            errors += 1
+            if errors > 50:
+                break
+    with lock:
+        results.append((ok, failed, errors))
+
+
+def run(app, workers):
+    with app.app_context():
+        seed()
+
+    results, lock = [], threading.Lock()
+    threads = [
+        threading.Thread(target=terminal, args=(app, results, lock))
+        for _ in range(workers)
+    ]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    with app.app_context():
+        stock_left = db.session.query(func.sum(Product.stock_quantity)).scalar()
+        negative = Product.query.filter(Product.stock_quantity < 0).count()
+        sold = db.session.query(func.coalesce(func.sum(Sale.quantity_sold), 0)).scalar()
+        sales = Sale.query.count()
+
+    initial = PRODUCTS * STOCK_PER_PRODUCT
+    assert negative == 0, f"{negative} product(s) oversold below zero"
+    assert sold + stock_left == initial, (
+        f"lost update: sold {sold} + left {stock_left} != {initial}"
+    )
+
+    baskets = sum(r[0] for r in results)
+    errors = sum(r[2] for r in results)
+    print(f"{workers:>8} {baskets:>8} {sales:>8} {stock_left:>6} {errors:>7} "
+          f"{baskets / elapsed:>10.1f}")
+
+
+def main():
+    app = create_app()
+    print(f"{'workers':>8} {'baskets':>8} {'lines':>8} {'left':>6} {'errors':>7} "
+          f"{'sales/s':>10}")
+    for workers in WORKER_COUNTS:
+        run(app, workers)
+    print("zero oversell ✔")
+
+
+if __name__ == "__main__":
+    main()
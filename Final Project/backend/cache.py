@@ -0,0 +1,124 @@
+from flask import request, current_app, g
+from collections import OrderedDict
+from functools import wraps
+import hashlib
+import threading
+import time
+
+
+class ResponseCache:
+    """
+    Per-process LRU cache for serialized GET responses.
+
+    Entries are keyed by "<tag>:<path?query>" so a write endpoint can drop
+    every cached variant of a list with invalidate(tag). Each gunicorn worker
+    has its own copy; explicit invalidation only reaches the worker that
+    handled the write, the others catch up when their TTL runs out.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.ttls = {}
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def init_app(self, app):
+        self.max_entries = app.config.get("CACHE_MAX_ENTRIES", self.max_entries)
+        self.ttls = dict(app.config.get("CACHE_TTLS", {}))
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, *tags):
+        prefixes = tuple(f"{t}:" for t in tags)
+        with self._lock:
+            for key in [k for k in self._entries if k.startswith(prefixes)]:
+                del self._entries[key]
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "ttls": self.ttls,
+            }
+
+
+response_cache = ResponseCache()
+
+
+def cached(tag):
+    """
+    Cache a GET view's 200 response under `tag` for CACHE_TTLS[tag] seconds.
+    Responses carry a strong ETag, so If-None-Match revalidation returns 304.
+    Streamed responses pass through uncached.
+
+    A view whose response is going into the cache reads from the primary,
+    like a use_primary() view: a lagging replica's copy would otherwise be
+    served for the whole TTL, after invalidate() was meant to drop it.
+    Misses are few, so the replica still takes the uncached reads.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            ttl = response_cache.ttls.get(tag, 0)
+            key = f"{tag}:{request.full_path}"
+            entry = response_cache.get(key) if ttl > 0 else None
+
+            if entry is None:
+                if ttl > 0:
+                    g.db_primary = True
+                resp = current_app.make_response(view(*args, **kwargs))
+                if resp.status_code != 200 or resp.is_streamed:
+                    return resp  # streamed bodies aren't buffered into the cache
+                body = resp.get_data()
+                headers = [
+                    (k, v) for k, v in resp.headers
+                    if k not in ("Content-Type", "Content-Length")
+                ]
+                entry = (body, resp.mimetype, headers, hashlib.sha1(body).hexdigest())
+                if ttl > 0:
+                    response_cache.set(key, entry, ttl)
+
+            body, mimetype, headers, etag = entry
+            resp = current_app.response_class(body, mimetype=mimetype, headers=headers)
+            resp.set_etag(etag)
+            # let browsers keep a copy but always revalidate with the ETag
+            resp.headers["Cache-Control"] = "private, no-cache"
+            return resp.make_conditional(request)
+        return wrapper
+    return decorator
+
+
+def invalidate(*tags):
+    response_cache.invalidate(*tags)
@@ -0,0 +1,358 @@
+from models import db, Product, Sale, IdempotencyKey
+from inventory import (
+    reserve_statement, reserve_stock, short_products, run_in_transaction, InsufficientStock,
+)
+from aggregates import sales_recorded
+import rollups
+import notifications
+from sqlalchemy import select, insert, delete
+from sqlalchemy.exc import IntegrityError
+from datetime import datetime, timedelta, timezone
+import json
+import time
+
+MAX_KEY_LENGTH = 64
+# a chunk whose stock moved under it, or whose key a concurrent upload
+# claimed first, is re-read and retried this many times
+CHUNK_ATTEMPTS = 3
+
+PRODUCT_COLUMNS = (
+    Product.id,
+    Product.name,
+    Product.category,
+    Product.price,
+    Product.stock_quantity,
+    Product.reorder_level,
+)
+
+
+class CheckoutError(Exception):
+    """Raised when a basket cannot be sold; carries the HTTP status to return."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def parse_items(items):
+    """
+    Normalise the raw cart payload into (product_id, qty) lines.
+    Lines without a product or with a non-positive quantity are skipped,
+    same as the original per-line loop did.
+    """
+    lines = []
+    for it in items:
+        pid = it.get("product_id")
+        qty = int(it.get("quantity", 0) or 0)
+        if not pid or qty <= 0:
+            continue
+        lines.append((int(pid), qty))
+    return lines
+
+
+def load_products(product_ids):
+    """
+    Fetch every product in the basket with one IN (...) query. No row locks
+    are taken; stock is enforced by the conditional decrement in
+    inventory.reserve_stock.
+    """
+    stmt = select(*PRODUCT_COLUMNS).where(Product.id.in_(product_ids))
+    return {row.id: row for row in db.session.execute(stmt)}
+
+
+def check_basket(products, lines, totals):
+    """Raise the CheckoutError a basket fails with against a stock snapshot, if any."""
+    for pid, _ in lines:
+        if pid not in products:
+            raise CheckoutError("Product not found", status=404)
+    for pid, qty in totals.items():
+        if products[pid].stock_quantity < qty:
+            raise CheckoutError(f"Not enough stock for {products[pid].name}")
+
+
+def reserve_basket(lines, totals):
+    """
+    (products, {product_id: stock_after}) for a basket whose stock is now
+    taken. Where UPDATE ... RETURNING exists the conditional decrement
+    hands back the product columns as well (stock_quantity is then the
+    stock after the sale), so a basket that sells reads nothing first;
+    the snapshot is only loaded to explain a failure. Elsewhere the
+    basket is loaded and pre-checked, then reserved.
+
+    Raises CheckoutError for an unknown product or short stock, with the
+    transaction already rolled back.
+    """
+    if db.engine.dialect.update_returning:
+        rows = db.session.execute(
+            reserve_statement(totals).returning(*PRODUCT_COLUMNS)
+        ).all()
+        if len(rows) == len(totals):
+            return {row.id: row for row in rows}, {row.id: row.stock_quantity for row in rows}
+        db.session.rollback()
+        products = load_products(totals)
+        check_basket(products, lines, totals)
+        short = short_products(totals) or list(totals)
+        raise CheckoutError(f"Not enough stock for {products[short[0]].name}")
+
+    # cheap pre-check against the snapshot so obvious failures skip the write
+    products = load_products(totals)
+    check_basket(products, lines, totals)
+    try:
+        return products, reserve_stock(totals)
+    except InsufficientStock:
+        db.session.rollback()
+        short = short_products(totals) or list(totals)
+        raise CheckoutError(f"Not enough stock for {products[short[0]].name}")
+
+
+def run_checkout(items):
+    """
+    Set-based checkout: one atomic conditional UPDATE for all stock
+    decrements that also returns the basket's products (plus a SELECT
+    first where RETURNING isn't supported), one bulk INSERT for sales, one
+    UPDATE (plus an INSERT for new ones) for the coalesced low-stock
+    alerts, and the dashboard aggregate and sales rollup updates. Alerts are published
+    to /api/notifications/stream after the commit.
+
+    Returns the same list of sale dicts the old loop produced. Meant to be
+    run through inventory.run_in_transaction, which commits and retries
+    serialization conflicts.
+    """
+    lines = parse_items(items)
+    if not lines:
+        return []
+
+    totals = {}
+    for pid, qty in lines:
+        totals[pid] = totals.get(pid, 0) + qty
+    products, stock_after = reserve_basket(lines, totals)
+
+    now = datetime.utcnow()
+    book_sales(products, [(pid, qty, now) for pid, qty in lines], totals, stock_after, now)
+    return [sale_line(products[pid], qty) for pid, qty in lines]
+
+
+def sale_line(product, qty):
+    return {
+        "product_id": product.id,
+        "product_name": product.name,
+        "qty": qty,
+        "total": qty * product.price,
+    }
+
+
+def book_sales(products, lines, totals, stock_after, now):
+    """
+    Everything after the stock reservation, for lines of (product_id, qty,
+    sold_at): one bulk INSERT for sales, the coalesced low-stock alerts,
+    and the dashboard aggregate and sales rollup updates.
+    """
+    # replay the lines in order so repeated products get the same per-line
+    # low-stock checks the old loop made
+    remaining = {pid: stock_after[pid] + totals[pid] for pid in totals}
+    sale_rows = []
+    low = {}  # product id -> (quantity left, low-stock lines)
+    by_hour = {}  # rollup bucket -> [(product id, qty)]
+
+    for pid, qty, sold_at in lines:
+        product = products[pid]
+        remaining[pid] -= qty
+        sale_rows.append({
+            "product_id": pid,
+            "quantity_sold": qty,
+            "total_price": qty * product.price,
+            "sale_date": sold_at,
+        })
+        by_hour.setdefault(rollups.floor_hour(sold_at), []).append((pid, qty))
+
+        # low stock notification, coalesced per product
+        if remaining[pid] <= product.reorder_level:
+            low[pid] = (remaining[pid], low.get(pid, (0, 0))[1] + 1)
+
+    db.session.execute(insert(Sale), sale_rows)
+    if low:
+        notifications.low_stock(products, low, now)
+    sales_recorded(products, totals)
+    for hour, hour_lines in by_hour.items():
+        rollups.sales_recorded(products, hour_lines, hour)
+
+
+# ---------- BATCHED UPLOADS FROM OFFLINE TERMINALS ----------
+
+def sold(key, sales):
+    return {"key": key, "status": "ok", "sales": sales}
+
+
+def replayed(key, sales):
+    return {"key": key, "status": "replayed", "sales": sales}
+
+
+def rejected(key, message):
+    return {"key": key, "status": "error", "error": message}
+
+
+def parse_basket(raw, now):
+    """
+    {"key", "items", "sold_at"?} -> {"key", "lines", "sold_at"}. sold_at is
+    when the terminal rang the sale up (ISO 8601, default now); a clock
+    running ahead is clamped to now.
+    """
+    if not isinstance(raw, dict):
+        raise CheckoutError("Basket must be an object")
+    key = raw.get("key")
+    if not isinstance(key, str) or not 0 < len(key) <= MAX_KEY_LENGTH:
+        raise CheckoutError(f"key must be a string of 1-{MAX_KEY_LENGTH} characters")
+    try:
+        lines = parse_items(raw.get("items") or [])
+    except (AttributeError, TypeError, ValueError):
+        raise CheckoutError("Invalid items")
+    if not lines:
+        raise CheckoutError("No items in sale")
+
+    sold_at = now
+    if raw.get("sold_at"):
+        try:
+            sold_at = datetime.fromisoformat(str(raw["sold_at"]).replace("Z", "+00:00"))
+        except ValueError:
+            raise CheckoutError("sold_at must be an ISO datetime")
+        if sold_at.tzinfo is not None:
+            sold_at = sold_at.astimezone(timezone.utc).replace(tzinfo=None)
+        sold_at = min(sold_at, now)
+    return {"key": key, "lines": lines, "sold_at": sold_at}
+
+
+def receipts(keys):
+    """{key: sales} for the keys already recorded."""
+    rows = db.session.execute(
+        select(IdempotencyKey.key, IdempotencyKey.response)
+        .where(IdempotencyKey.key.in_(keys))
+    )
+    return {key: json.loads(response) for key, response in rows}
+
+
+def sell_baskets(baskets):
+    """
+    One chunk of parsed baskets, in order, in the caller's transaction.
+
+    Keys already recorded (or repeated within the chunk) are replayed
+    without selling anything. The rest are checked against one snapshot
+    of their products' stock: a basket naming an unknown product or more
+    than is left is rejected whole, and its key isn't recorded so the
+    terminal can send it again. The accepted baskets then cost what one
+    checkout does -- an INSERT of their keys, one conditional stock
+    UPDATE for all of them, one sales INSERT, alerts, aggregates and
+    rollups -- however many there are.
+
+    Raises InsufficientStock if stock moved since the snapshot, or
+    IntegrityError if a concurrent upload recorded one of the keys first.
+    """
+    stored = receipts({b["key"] for b in baskets})
+    products = load_products(
+        {pid for b in baskets if b["key"] not in stored for pid, _ in b["lines"]}
+    )
+    stock = {pid: p.stock_quantity for pid, p in products.items()}
+
+    results, claimed, accepted = [], {}, []
+    for b in baskets:
+        key = b["key"]
+        if key in stored or key in claimed:
+            results.append(replayed(key, stored[key] if key in stored else claimed[key]))
+            continue
+
+        totals = {}
+        for pid, qty in b["lines"]:
+            totals[pid] = totals.get(pid, 0) + qty
+        if any(pid not in products for pid in totals):
+            results.append(rejected(key, "Product not found"))
+            continue
+        short = [pid for pid, qty in totals.items() if stock[pid] < qty]
+        if short:
+            results.append(rejected(key, f"Not enough stock for {products[short[0]].name}"))
+            continue
+
+        for pid, qty in totals.items():
+            stock[pid] -= qty
+        claimed[key] = [sale_line(products[pid], qty) for pid, qty in b["lines"]]
+        accepted.append(b)
+        results.append(sold(key, claimed[key]))
+
+    if not accepted:
+        return results
+
+    now = datetime.utcnow()
+    db.session.execute(insert(IdempotencyKey), [
+        {"key": b["key"], "response": json.dumps(claimed[b["key"]]), "created_at": now}
+        for b in accepted
+    ])
+    lines = [(pid, qty, b["sold_at"]) for b in accepted for pid, qty in b["lines"]]
+    totals = {}
+    for pid, qty, _ in lines:
+        totals[pid] = totals.get(pid, 0) + qty
+    stock_after = reserve_stock(totals)
+    book_sales(products, lines, totals, stock_after, now)
+    return results
+
+
+def sell_chunk(baskets):
+    """sell_baskets in its own transaction, re-read and retried on a conflict."""
+    for _ in range(CHUNK_ATTEMPTS):
+        try:
+            return run_in_transaction(sell_baskets, baskets)
+        except (InsufficientStock, IntegrityError):
+            pass  # rolled back; the next attempt sees the other writer's changes
+
+    stored = receipts({b["key"] for b in baskets})
+    return [
+        replayed(b["key"], stored[b["key"]]) if b["key"] in stored
+        else rejected(b["key"], "Stock changed during the upload, send the basket again")
+        for b in baskets
+    ]
+
+
+def sell_batch(baskets, chunk_size):
+    """
+    Sell raw baskets chunk_size per transaction; one result per basket, in
+    order. Chunks commit independently, so if a later one fails the
+    earlier ones stay sold and resending the whole batch replays them.
+    """
+    now = datetime.utcnow()
+    results = [None] * len(baskets)
+    parsed = []
+    for i, raw in enumerate(baskets):
+        try:
+            parsed.append((i, parse_basket(raw, now)))
+        except CheckoutError as e:
+            key = raw.get("key") if isinstance(raw, dict) else None
+            results[i] = rejected(key, e.message)
+
+    for start in range(0, len(parsed), chunk_size):
+        chunk = parsed[start:start + chunk_size]
+        for (i, _), result in zip(chunk, sell_chunk([b for _, b in chunk])):
+            results[i] = result
+    return results
+
+
+def prune_keys(days, batch_size=1000, pause=0.0):
+    """
+    Forget idempotency keys older than `days` days, batch_size rows per
+    transaction; a basket resent after that would be sold again. Returns
+    the number of keys removed.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    removed = 0
+    while True:
+        ids = db.session.scalars(
+            select(IdempotencyKey.id)
+            .where(IdempotencyKey.created_at < cutoff)
+            .order_by(IdempotencyKey.id)
+            .limit(batch_size)
+        ).all()
+        if not ids:
+            break
+        db.session.execute(delete(IdempotencyKey).where(IdempotencyKey.id.in_(ids)))
+        db.session.commit()
+        removed += len(ids)
+        if pause:
+            time.sleep(pause)
+    return removed
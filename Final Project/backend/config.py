@@ -1,5 +1,78 @@
 import os
+import tempfile
+from database import engine_options
+
+# connection pool / engine tuning, per gunicorn worker (database.engine_options)
+POOL_OPTIONS = dict(
+    pool_size=int(os.getenv("DB_POOL_SIZE", 5)),
+    max_overflow=int(os.getenv("DB_MAX_OVERFLOW", 10)),
+    pool_timeout=int(os.getenv("DB_POOL_TIMEOUT", 10)),
+    pool_recycle=int(os.getenv("DB_POOL_RECYCLE", 1800)),
+    pool_pre_ping=os.getenv("DB_POOL_PRE_PING", "1") == "1",
+    statement_timeout_ms=int(os.getenv("DB_STATEMENT_TIMEOUT_MS", 15000)),
+)
 
 class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI, **POOL_OPTIONS)
+
+    # optional read replica: GET requests read from it (database.RoutingSession),
+    # except views filling the response cache, which read the primary
+    REPLICA_DATABASE_URL = os.getenv("REPLICA_DATABASE_URL")
+    SQLALCHEMY_BINDS = (
+        {"replica": dict(url=REPLICA_DATABASE_URL,
+                         **engine_options(REPLICA_DATABASE_URL, **POOL_OPTIONS))}
+        if REPLICA_DATABASE_URL else {}
+    )
+
+    # in-process response cache for read-heavy GET endpoints (cache.py)
+    CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", 256))
+    # seconds per endpoint tag, 0 disables caching for that tag
+    CACHE_TTLS = {
+        "products": int(os.getenv("CACHE_TTL_PRODUCTS", 30)),
+        "suppliers": int(os.getenv("CACHE_TTL_SUPPLIERS", 300)),
+        "dashboard": int(os.getenv("CACHE_TTL_DASHBOARD", 15)),
+    }
+
+    # background PDF reports (reports.py)
+    REPORTS_DIR = os.getenv(
+        "REPORTS_DIR", os.path.join(tempfile.gettempdir(), "sis-reports")
+    )
+    # rendering processes per web worker, each with its own connection pool
+    REPORT_WORKERS = int(os.getenv("REPORT_WORKERS", 2))
+    # queued/running jobs older than this are assumed lost and re-submitted
+    REPORT_STALE_SECONDS = int(os.getenv("REPORT_STALE_SECONDS", 600))
+
+    # request instrumentation (instrumentation.py)
+    METRICS_SERVER_TIMING = os.getenv("METRICS_SERVER_TIMING", "1") == "1"
+    SLOW_REQUEST_MS = int(os.getenv("SLOW_REQUEST_MS", 500))
+    QUERY_BUDGET = int(os.getenv("QUERY_BUDGET", 20))
+
+    # live notification stream, /api/notifications/stream (events.py)
+    SSE_HEARTBEAT_SECONDS = int(os.getenv("SSE_HEARTBEAT_SECONDS", 15))
+    # streams close after this long and the browser reconnects with Last-Event-ID
+    SSE_MAX_SECONDS = int(os.getenv("SSE_MAX_SECONDS", 300))
+    SSE_HISTORY = int(os.getenv("SSE_HISTORY", 1000))
+    SSE_BACKFILL_LIMIT = int(os.getenv("SSE_BACKFILL_LIMIT", 500))
+
+    # reorder level forecasting, `python manage.py forecast-reorder` (forecast.py)
+    FORECAST_LOOKBACK_DAYS = int(os.getenv("FORECAST_LOOKBACK_DAYS", 90))
+    # supplier lead time the reorder level has to cover
+    FORECAST_LEAD_DAYS = float(os.getenv("FORECAST_LEAD_DAYS", 7))
+    # safety stock in standard deviations of lead-time demand (1.65 ~ 95% service)
+    FORECAST_SERVICE_Z = float(os.getenv("FORECAST_SERVICE_Z", 1.65))
+    FORECAST_HALFLIFE_DAYS = float(os.getenv("FORECAST_HALFLIFE_DAYS", 14))
+    FORECAST_MIN_REORDER = int(os.getenv("FORECAST_MIN_REORDER", 1))
+
+    # notification retention, `python manage.py prune-notifications` (notifications.py)
+    NOTIFICATION_RETENTION_DAYS = int(os.getenv("NOTIFICATION_RETENTION_DAYS", 30))
+    NOTIFICATION_PRUNE_BATCH = int(os.getenv("NOTIFICATION_PRUNE_BATCH", 1000))
+
+    # offline POS uploads, /api/sales/batch (checkout.py)
+    SALES_BATCH_MAX = int(os.getenv("SALES_BATCH_MAX", 1000))
+    # baskets per transaction
+    SALES_BATCH_CHUNK = int(os.getenv("SALES_BATCH_CHUNK", 100))
+    # a basket resent after its key is pruned (`python manage.py
+    # prune-idempotency-keys`) would be sold again
+    IDEMPOTENCY_KEY_RETENTION_DAYS = int(os.getenv("IDEMPOTENCY_KEY_RETENTION_DAYS", 30))
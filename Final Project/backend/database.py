@@ -0,0 +1,132 @@
+from flask import g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+from functools import wraps
+import threading
+import time
+
+READ_METHODS = ("GET", "HEAD")
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long callers wait for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.wait_seconds = 0.0
+        self.checkouts = 0
+        self.timeouts = 0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except Exception:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            with self._stats_lock:
+                self.wait_seconds += time.perf_counter() - start
+                self.checkouts += 1
+
+
+def engine_options(url, pool_size=5, max_overflow=10, pool_timeout=10,
+                   pool_recycle=1800, pool_pre_ping=True, statement_timeout_ms=15000):
+    """
+    SQLALCHEMY_ENGINE_OPTIONS for one database URL. Pool sizes are per
+    gunicorn worker, so workers * (pool_size + max_overflow) must stay under
+    the server's connection limit.
+    """
+    if not url:
+        return {}
+    url = make_url(url)
+    backend = url.get_backend_name()
+
+    if backend == "sqlite" and url.database in (None, "", ":memory:"):
+        # single shared in-memory connection; Flask-SQLAlchemy picks the pool
+        return {}
+
+    options = {
+        "poolclass": TimedQueuePool,
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": pool_timeout,
+        "pool_recycle": pool_recycle,
+        "pool_pre_ping": pool_pre_ping,
+    }
+    if statement_timeout_ms:
+        if backend == "postgresql":
+            options["connect_args"] = {"options": f"-c statement_timeout={statement_timeout_ms}"}
+        elif backend in ("mysql", "mariadb"):
+            options["connect_args"] = {
+                "init_command": f"SET SESSION max_execution_time={statement_timeout_ms}"
+            }
+    return options
+
+
+class RoutingSession(Session):
+    """
+    Sends reads made while serving GET/HEAD requests to the "replica" bind
+    when one is configured. Flushes, writes, anything inside a
+    use_primary() view and views filling the response cache (see
+    cache.cached) stay on the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (
+            bind is None
+            and not self._flushing
+            and "replica" in self._db.engines
+            and has_request_context()
+            and request.method in READ_METHODS
+            and not g.get("db_primary")
+            and (clause is None or getattr(clause, "is_select", False))
+        ):
+            return self._db.engines["replica"]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def use_primary(view):
+    """For GET views that need read-your-writes (or write) on the primary."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        g.db_primary = True
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def pool_metrics(db):
+    """Prometheus lines for every engine's connection pool."""
+    def collect():
+        lines = [
+            "# HELP db_pool_size Configured pool_size.",
+            "# TYPE db_pool_size gauge",
+            "# HELP db_pool_checked_out Connections currently checked out.",
+            "# TYPE db_pool_checked_out gauge",
+            "# HELP db_pool_overflow Connections open beyond pool_size.",
+            "# TYPE db_pool_overflow gauge",
+            "# HELP db_pool_checkout_wait_seconds_total Time spent waiting for a connection.",
+            "# TYPE db_pool_checkout_wait_seconds_total counter",
+            "# HELP db_pool_checkouts_total Connections handed out.",
+            "# TYPE db_pool_checkouts_total counter",
+            "# HELP db_pool_timeouts_total Checkouts that failed (pool exhausted).",
+            "# TYPE db_pool_timeouts_total counter",
+        ]
+        for key, engine in db.engines.items():
+            pool = engine.pool
+            if not isinstance(pool, TimedQueuePool):
+                continue
+            label = f'bind="{key or "primary"}"'
+            lines += [
+                f"db_pool_size{{{label}}} {pool.size()}",
+                f"db_pool_checked_out{{{label}}} {pool.checkedout()}",
+                f"db_pool_overflow{{{label}}} {max(pool.overflow(), 0)}",
+                f"db_pool_checkout_wait_seconds_total{{{label}}} {pool.wait_seconds}",
+                f"db_pool_checkouts_total{{{label}}} {pool.checkouts}",
+                f"db_pool_timeouts_total{{{label}}} {pool.timeouts}",
+            ]
+        return lines
+    return collect
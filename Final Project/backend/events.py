@@ -0,0 +1,183 @@
+from flask import json
+from sqlalchemy import event
+from collections import deque
+from datetime import datetime
+import threading
+import time
+
+# SSE event types: a newly opened alert, and a coalesced alert updated in place
+CREATED = "notification"
+UPDATED = "notification-update"
+
+
+class NotificationBroker:
+    """
+    In-process pub/sub for new notifications, served as Server-Sent Events.
+
+    Writers stage payloads on the SQLAlchemy session (stage()); they are
+    published only when that session commits, and dropped when its
+    outermost transaction rolls back (a savepoint rollback keeps them).
+    Published events go into one shared ring buffer guarded by a Condition:
+    subscribers remember the last sequence number they sent and sleep on
+    the Condition until something newer arrives or a heartbeat is due, so
+    idle streams cost no CPU and no per-subscriber queue.
+
+    Event ids are notification ids, so a reconnect with Last-Event-ID
+    backfills from the database. Each gunicorn worker has its own broker
+    and only sees writes it handled; a client on another worker picks the
+    rest up from the database when its stream is recycled.
+    """
+
+    def __init__(self, history=1000):
+        self._cond = threading.Condition()
+        self._events = deque(maxlen=history)  # (seq, payload dict)
+        self._seq = 0
+        self.subscribers = 0
+        self.published = 0
+        self.app = None
+
+    def init_app(self, app, session):
+        self.app = app
+        self._events = deque(maxlen=app.config.get("SSE_HISTORY", 1000))
+        self.heartbeat = app.config.get("SSE_HEARTBEAT_SECONDS", 15)
+        self.max_seconds = app.config.get("SSE_MAX_SECONDS", 300)
+        self.backfill_limit = app.config.get("SSE_BACKFILL_LIMIT", 500)
+
+        # publish staged events when the session commits, drop them on rollback
+        if not event.contains(session, "after_commit", self._after_commit):
+            event.listen(session, "after_commit", self._after_commit)
+            event.listen(session, "after_soft_rollback", self._after_rollback)
+
+    # ---------- publishing ----------
+
+    def stage(self, session, payloads, kind=CREATED):
+        session.info.setdefault("pending_events", []).extend(
+            (kind, payload) for payload in payloads
+        )
+
+    def _after_commit(self, session):
+        pending = session.info.pop("pending_events", None)
+        if pending:
+            self.publish(pending)
+
+    def _after_rollback(self, session, previous_transaction):
+        # only the outermost transaction: a savepoint (or the flush inside
+        # one) rolls back within a transaction that may still commit
+        # (rollups.add, notifications.low_stock); stage outside them
+        if previous_transaction.parent is not None:
+            return
+        session.info.pop("pending_events", None)
+
+    def publish(self, events):
+        """events: [(kind, payload)]"""
+        with self._cond:
+            for kind, payload in events:
+                self._seq += 1
+                self._events.append((self._seq, kind, payload))
+            self.published += len(events)
+            self._cond.notify_all()
+
+    # ---------- subscribing ----------
+
+    def position(self):
+        with self._cond:
+            return self._seq
+
+    def wait(self, after_seq, timeout):
+        """
+        (new position, [(kind, payload)] published after after_seq, gap) --
+        blocks up to timeout when there is nothing new. gap is True when the
+        ring buffer already dropped some of them.
+        """
+        with self._cond:
+            if self._seq == after_seq:
+                self._cond.wait(timeout)
+            if self._seq == after_seq:
+                return after_seq, [], False
+            oldest = self._events[0][0] if self._events else self._seq + 1
+            events = [(kind, p) for seq, kind, p in self._events if seq > after_seq]
+            return self._seq, events, oldest > after_seq + 1
+
+    def stream(self, position, backlog, last_id, refill, matches):
+        """
+        SSE body: the backlog rows the view already loaded, then live events
+        published after position that pass matches(payload). If the ring
+        buffer overflows, refill(last_id) reloads the gap from the database.
+        Ends after max_seconds; EventSource reconnects with Last-Event-ID.
+
+        Only new alerts carry an SSE id and are replayed on reconnect;
+        in-place updates are sent without one, so a reconnecting client
+        should re-read /api/notifications for the current counts.
+        """
+        deadline = time.monotonic() + self.max_seconds
+        sent = set()
+        with self._cond:
+            self.subscribers += 1
+        try:
+            yield "retry: 3000\n\n"
+            for payload in backlog:
+                sent.add(payload["id"])
+                last_id = max(last_id, payload["id"])
+                yield format_event(CREATED, payload)
+
+            while time.monotonic() < deadline:
+                position, events, gap = self.wait(position, self.heartbeat)
+                if gap:
+                    with self.app.app_context():
+                        events = [(CREATED, p) for p in refill(last_id)]
+                delivered = False
+                for kind, payload in events:
+                    if not matches(payload):
+                        continue
+                    if kind == CREATED:
+                        # commits can land out of id order, so only skip what
+                        # was already sent rather than everything below last_id
+                        if payload["id"] in sent:
+                            continue
+                        sent.add(payload["id"])
+                        last_id = max(last_id, payload["id"])
+                    delivered = True
+                    yield format_event(kind, payload)
+                if not delivered:
+                    yield ": keep-alive\n\n"
+                if len(sent) > self.backfill_limit:
+                    sent = {i for i in sent if i > last_id - self.backfill_limit}
+        finally:
+            with self._cond:
+                self.subscribers -= 1
+
+    def metrics(self):
+        return [
+            "# HELP sse_subscribers Open notification streams in this process.",
+            "# TYPE sse_subscribers gauge",
+            f"sse_subscribers {self.subscribers}",
+            "# HELP sse_events_published_total Notifications published to streams.",
+            "# TYPE sse_events_published_total counter",
+            f"sse_events_published_total {self.published}",
+        ]
+
+
+def notification_payload(n):
+    """Same shape as a /api/notifications row."""
+    return {
+        "id": n.id,
+        "product_id": n.product_id,
+        "message": n.message,
+        "seen": n.seen,
+        "occurrences": n.occurrences,
+        "last_quantity": n.last_quantity,
+        "created_at": iso(n.created_at),
+        "updated_at": iso(n.updated_at),
+    }
+
+
+def iso(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def format_event(kind, payload):
+    event_id = f"id: {payload['id']}\n" if kind == CREATED else ""
+    return f"{event_id}event: {kind}\ndata: {json.dumps(payload)}\n\n"
+
+
+notification_events = NotificationBroker()
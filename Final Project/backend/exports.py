@@ -0,0 +1,132 @@
+from flask import request
+from models import db, Product, Sale
+from sqlalchemy import select
+from datetime import datetime, timedelta, timezone
+import csv
+import io
+import zlib
+
+DEFAULT_DAYS = 30
+CHUNK_ROWS = 2000
+
+
+class ReportRangeError(ValueError):
+    pass
+
+
+def parse_when(raw, end=False):
+    """
+    YYYY-MM-DD or full ISO timestamp; a bare `to` date covers the whole day.
+    Timestamps with an offset are converted to naive UTC, like sale_date.
+    """
+    raw = str(raw)
+    try:
+        value = datetime.fromisoformat(raw.replace("Z", "+00:00"))
+    except ValueError:
+        raise ReportRangeError(f"Invalid date: {raw}")
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    if end and len(raw) == 10:
+        value += timedelta(days=1)
+    return value
+
+
+def parse_report_filters(args=None):
+    """
+    Read `from`, `to`, `product_id` and `category` from the query string.
+    Defaults to the last 30 days. `to` is exclusive once normalised.
+    """
+    args = request.args if args is None else args
+    now = datetime.utcnow()
+
+    since = parse_when(args["from"]) if args.get("from") else now - timedelta(days=DEFAULT_DAYS)
+    until = parse_when(args["to"], end=True) if args.get("to") else now
+    try:
+        if since >= until:
+            raise ReportRangeError("`from` must be before `to`")
+    except TypeError:
+        raise ReportRangeError("`from` and `to` can't be compared")
+
+    product_id = args.get("product_id")
+    if product_id is not None:
+        try:
+            product_id = int(product_id)
+        except ValueError:
+            raise ReportRangeError("product_id must be an integer")
+
+    return {
+        "since": since,
+        "until": until,
+        "product_id": product_id,
+        "category": args.get("category") or None,
+    }
+
+
+def sales_report_query(filters):
+    """Plain column rows (no ORM hydration), newest first."""
+    q = (
+        select(Sale.sale_date, Product.name, Sale.quantity_sold, Sale.total_price)
+        .join(Product, Sale.product_id == Product.id)
+        .where(Sale.sale_date >= filters["since"], Sale.sale_date < filters["until"])
+    )
+    if filters["product_id"] is not None:
+        q = q.where(Sale.product_id == filters["product_id"])
+    if filters["category"]:
+        q = q.where(Product.category == filters["category"])
+    return q.order_by(Sale.sale_date.desc())
+
+
+def iter_csv(filters, chunk_rows=CHUNK_ROWS):
+    """
+    Yield the report as CSV text, one chunk per `chunk_rows` rows. Rows come
+    through a server-side cursor (yield_per) so memory stays flat no matter
+    how long the range is.
+    """
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(["Date", "Product", "Quantity", "Total"])
+
+    result = db.session.execute(
+        sales_report_query(filters).execution_options(yield_per=chunk_rows)
+    )
+    try:
+        for partition in result.partitions():
+            for sale_date, name, qty, total in partition:
+                writer.writerow([
+                    sale_date.strftime("%Y-%m-%d %H:%M"),
+                    name,
+                    qty,
+                    float(total),
+                ])
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    finally:
+        result.close()
+
+    if buf.tell():
+        yield buf.getvalue()
+
+
+def encode(chunks, gzip=False):
+    """UTF-8 encode a text stream, optionally gzip-compressing on the fly."""
+    if not gzip:
+        for chunk in chunks:
+            yield chunk.encode("utf-8")
+        return
+
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # 31 -> gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode("utf-8"))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def report_filename(filters, ext):
+    if not request.args.get("from") and not request.args.get("to"):
+        return f"sales_last_{DEFAULT_DAYS}_days.{ext}"
+    return (
+        f"sales_{filters['since']:%Y%m%d}_"
+        f"{filters['until'] - timedelta(seconds=1):%Y%m%d}.{ext}"
+    )
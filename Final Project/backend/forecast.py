@@ -0,0 +1,128 @@
+from models import db, Product, ProductSalesRollup
+from sqlalchemy import select, update
+from datetime import datetime, timedelta
+import numpy as np
+import time
+
+# rollup rows converted to arrays per fetch, so the raw rows never all sit in memory
+HISTORY_BATCH = 100_000
+
+
+def load_history(start, days):
+    """
+    (product ids, current stock, current reorder level, units[products, days])
+    for every product, from the daily sales rollups: one query for the
+    catalog and one for all of the history, streamed in HISTORY_BATCH row
+    chunks and scattered into a dense matrix.
+    """
+    catalog = db.session.execute(
+        select(Product.id, Product.stock_quantity, Product.reorder_level).order_by(Product.id)
+    ).all()
+    if not catalog:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty, np.zeros((0, days), dtype=np.float32)
+    ids, stock, reorder = (np.array(col, dtype=np.int64) for col in zip(*catalog))
+
+    result = db.session.execute(
+        select(ProductSalesRollup.product_id, ProductSalesRollup.bucket, ProductSalesRollup.units)
+        .where(ProductSalesRollup.period == "day",
+               ProductSalesRollup.bucket >= start,
+               ProductSalesRollup.bucket < start + timedelta(days=days)),
+        execution_options={"yield_per": HISTORY_BATCH},
+    )
+
+    units = np.zeros((len(ids), days), dtype=np.float32)
+    offsets = {start + timedelta(days=d): d for d in range(days)}
+    for part in result.partitions():
+        pids, buckets, sold = zip(*part)
+        pids = np.array(pids, dtype=np.int64)
+        row = np.minimum(np.searchsorted(ids, pids), len(ids) - 1)
+        day = np.fromiter(map(offsets.__getitem__, buckets), dtype=np.int64, count=len(buckets))
+        known = ids[row] == pids  # rollups of since-deleted products are ignored
+        units[row[known], day[known]] = np.array(sold, dtype=np.float32)[known]
+    return ids, stock, reorder, units
+
+
+def compute(units, stock, lead_days, service_z, halflife_days, min_level):
+    """
+    Per-product demand statistics for the whole catalog at once; every
+    step is an array operation over the [products, days] matrix.
+
+    velocity is an exponentially weighted daily mean (recent days count
+    more), and the suggested reorder level covers expected demand over
+    the lead time plus service_z standard deviations of it:
+
+        ceil(velocity * lead_days + service_z * std * sqrt(lead_days))
+
+    Products with no sales in the window keep their current level.
+    """
+    days = units.shape[1]
+    age = np.arange(days - 1, -1, -1, dtype=np.float32)  # 0 = most recent day
+    weights = 0.5 ** (age / halflife_days)
+    weights /= weights.sum()
+
+    velocity = units @ weights
+    std = units.std(axis=1)
+    ma7 = units[:, -7:].mean(axis=1)
+    ma28 = units[:, -28:].mean(axis=1)
+    active = units.any(axis=1)
+
+    suggested = np.ceil(velocity * lead_days + service_z * std * np.sqrt(lead_days))
+    suggested = np.maximum(suggested, min_level).astype(np.int64)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cover = np.where(velocity > 0, stock / velocity, np.inf)
+
+    return {
+        "velocity": velocity,
+        "std": std,
+        "ma7": ma7,
+        "ma28": ma28,
+        "days_of_cover": cover,
+        "active": active,
+        "suggested": suggested,
+    }
+
+
+def run(lookback_days=90, lead_days=7, service_z=1.65, halflife_days=14,
+        min_level=1, apply=True, today=None):
+    """
+    Forecast every product from the daily rollups of the lookback_days
+    complete UTC days before today and, unless apply is False, write the
+    changed reorder levels back in one executemany UPDATE keyed by primary
+    key. Returns a report with the stats arrays and per-phase timings.
+    """
+    today = today or datetime.utcnow()
+    start = datetime(today.year, today.month, today.day) - timedelta(days=lookback_days)
+    timings = {}
+
+    t0 = time.perf_counter()
+    ids, stock, reorder, units = load_history(start, lookback_days)
+    timings["load"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    stats = compute(units, stock, lead_days, service_z, halflife_days, min_level)
+    changed = stats["active"] & (stats["suggested"] != reorder)
+    timings["compute"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    if apply and changed.any():
+        db.session.execute(update(Product), [
+            {"id": pid, "reorder_level": level}
+            for pid, level in zip(ids[changed].tolist(), stats["suggested"][changed].tolist())
+        ])
+        db.session.commit()
+    timings["write"] = time.perf_counter() - t0
+
+    return {
+        "ids": ids,
+        "stock": stock,
+        "reorder": reorder,
+        "stats": stats,
+        "products": len(ids),
+        "history_cells": units.size,
+        "active": int(stats["active"].sum()),
+        "changed": int(changed.sum()),
+        "applied": apply,
+        "timings": timings,
+    }
@@ -0,0 +1,209 @@
+from flask import g, request, has_request_context, Response
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+import threading
+import time
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+SLOWEST_KEPT = 3
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """Adds the time spent encoding JSON to the current request's metrics."""
+
+    def dumps(self, obj, **kwargs):
+        start = time.perf_counter()
+        try:
+            return super().dumps(obj, **kwargs)
+        finally:
+            if has_request_context() and "metrics_start" in g:
+                g.metrics_serialize += time.perf_counter() - start
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.total += 1
+        self.sum += value
+
+
+class RequestMetrics:
+    """
+    Per-request SQL and latency instrumentation.
+
+    SQLAlchemy cursor events count statements and DB time into flask.g,
+    the JSON provider times serialization, and after_request folds it all
+    into per-endpoint counters / histograms served at /metrics in
+    Prometheus text format. Counters are per process (one set per gunicorn
+    worker).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = {}
+        self.latency = {}
+        self.queries = {}
+        self.db_seconds = {}
+        self.serialize_seconds = {}
+        self.slow_requests = {}
+        self.collectors = {}
+
+    def register_collector(self, name, fn):
+        """
+        fn() returns extra Prometheus text lines to append to /metrics.
+        Registering a name again replaces it, so building the app twice
+        (manage.py, benchmarks) doesn't repeat series.
+        """
+        self.collectors[name] = fn
+
+    def init_app(self, app):
+        self.app = app
+        self.server_timing = app.config.get("METRICS_SERVER_TIMING", True)
+        self.slow_ms = app.config.get("SLOW_REQUEST_MS", 500)
+        self.query_budget = app.config.get("QUERY_BUDGET", 20)
+
+        app.json_provider_class = TimedJSONProvider
+        app.json = TimedJSONProvider(app)
+
+        if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+            event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+            event.listen(Engine, "handle_error", _handle_error)
+
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        app.add_url_rule("/metrics", "metrics", self.render)
+
+    def _start(self):
+        g.metrics_start = time.perf_counter()
+        g.metrics_queries = 0
+        g.metrics_db = 0.0
+        g.metrics_serialize = 0.0
+        g.metrics_slowest = []
+
+    def _finish(self, response):
+        if "metrics_start" not in g or request.endpoint == "metrics":
+            return response
+
+        elapsed = time.perf_counter() - g.metrics_start
+        endpoint = request.endpoint or "unmatched"
+        key = (endpoint, request.method, str(response.status_code))
+
+        with self._lock:
+            self.requests[key] = self.requests.get(key, 0) + 1
+            self.latency.setdefault(endpoint, Histogram(LATENCY_BUCKETS)).observe(elapsed)
+            self.queries.setdefault(endpoint, Histogram(QUERY_BUCKETS)).observe(g.metrics_queries)
+            self.db_seconds[endpoint] = self.db_seconds.get(endpoint, 0.0) + g.metrics_db
+            self.serialize_seconds[endpoint] = (
+                self.serialize_seconds.get(endpoint, 0.0) + g.metrics_serialize
+            )
+
+        over_time = elapsed * 1000 > self.slow_ms
+        over_budget = g.metrics_queries > self.query_budget
+        if over_time or over_budget:
+            with self._lock:
+                self.slow_requests[endpoint] = self.slow_requests.get(endpoint, 0) + 1
+            self.app.logger.warning(
+                "slow request %s %s: %.1f ms, %d queries (%.1f ms db, %.1f ms json); slowest: %s",
+                request.method, request.full_path.rstrip("?"), elapsed * 1000,
+                g.metrics_queries, g.metrics_db * 1000, g.metrics_serialize * 1000,
+                "; ".join(f"{d * 1000:.1f} ms {s}" for d, s in g.metrics_slowest) or "-",
+            )
+
+        if self.server_timing:
+            response.headers.add(
+                "Server-Timing",
+                f'db;dur={g.metrics_db * 1000:.1f};desc="{g.metrics_queries} queries", '
+                f"json;dur={g.metrics_serialize * 1000:.1f}, "
+                f"total;dur={elapsed * 1000:.1f}",
+            )
+        return response
+
+    def render(self):
+        lines = []
+
+        def metric(name, kind, help_text):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        def histogram(name, data):
+            for endpoint, h in sorted(data.items()):
+                for bound, count in zip(h.buckets, h.counts):
+                    lines.append(f'{name}_bucket{{endpoint="{endpoint}",le="{bound}"}} {count}')
+                lines.append(f'{name}_bucket{{endpoint="{endpoint}",le="+Inf"}} {h.total}')
+                lines.append(f'{name}_sum{{endpoint="{endpoint}"}} {h.sum}')
+                lines.append(f'{name}_count{{endpoint="{endpoint}"}} {h.total}')
+
+        def counter(name, data):
+            for endpoint, value in sorted(data.items()):
+                lines.append(f'{name}{{endpoint="{endpoint}"}} {value}')
+
+        with self._lock:
+            metric("http_requests_total", "counter", "Requests by endpoint, method and status.")
+            for (endpoint, method, status), n in sorted(self.requests.items()):
+                lines.append(
+                    f'http_requests_total{{endpoint="{endpoint}",method="{method}",'
+                    f'status="{status}"}} {n}'
+                )
+            metric("http_request_duration_seconds", "histogram", "Request latency.")
+            histogram("http_request_duration_seconds", self.latency)
+            metric("db_queries_per_request", "histogram", "SQL statements issued per request.")
+            histogram("db_queries_per_request", self.queries)
+            metric("db_time_seconds_total", "counter", "Time spent in SQL statements.")
+            counter("db_time_seconds_total", self.db_seconds)
+            metric("json_serialize_seconds_total", "counter", "Time spent encoding JSON.")
+            counter("json_serialize_seconds_total", self.serialize_seconds)
+            metric("slow_requests_total", "counter",
+                   "Requests over SLOW_REQUEST_MS or QUERY_BUDGET.")
+            counter("slow_requests_total", self.slow_requests)
+
+        for collect in self.collectors.values():
+            lines.extend(collect())
+
+        return Response("\n".join(lines) + "\n", mimetype="text/plain; version=0.0.4")
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _record(conn, statement)
+
+
+def _handle_error(exception_context):
+    # after_cursor_execute doesn't run for a statement that raised; its
+    # start time would otherwise stay on the connection for good
+    conn = exception_context.connection
+    if conn is not None and exception_context.statement is not None:
+        _record(conn, exception_context.statement)
+
+
+def _record(conn, statement):
+    started = conn.info.get("metrics_query_start")
+    if not started:
+        return
+    duration = time.perf_counter() - started.pop()
+    if not has_request_context() or "metrics_start" not in g:
+        return
+
+    g.metrics_queries += 1
+    g.metrics_db += duration
+    slowest = g.metrics_slowest
+    if len(slowest) < SLOWEST_KEPT or duration > slowest[-1][0]:
+        slowest.append((duration, " ".join(statement.split())[:200]))
+        slowest.sort(key=lambda s: s[0], reverse=True)
+        del slowest[SLOWEST_KEPT:]
+
+
+request_metrics = RequestMetrics()
@@ -0,0 +1,106 @@
+from models import db, Product
+from sqlalchemy import select, update, case
+from sqlalchemy.exc import DBAPIError
+import random
+import time
+
+# PostgreSQL serialization_failure / deadlock_detected
+RETRYABLE_SQLSTATES = {"40001", "40P01"}
+# MySQL lock wait timeout / deadlock
+RETRYABLE_MYSQL_CODES = {1205, 1213}
+
+MAX_ATTEMPTS = 5
+BASE_DELAY = 0.02
+MAX_DELAY = 0.5
+
+
+class InsufficientStock(Exception):
+    """At least one product could not cover the requested quantity."""
+
+
+def is_retryable(exc):
+    orig = getattr(exc, "orig", None)
+    if getattr(orig, "pgcode", None) in RETRYABLE_SQLSTATES:
+        return True
+    args = getattr(orig, "args", ())
+    if args and args[0] in RETRYABLE_MYSQL_CODES:
+        return True
+    return "database is locked" in str(orig)
+
+
+def run_in_transaction(fn, *args, **kwargs):
+    """
+    Run fn and commit, retrying serialization conflicts / deadlocks with
+    jittered exponential backoff. Any other error is rolled back and re-raised.
+    """
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        try:
+            result = fn(*args, **kwargs)
+            db.session.commit()
+            return result
+        except DBAPIError as e:
+            db.session.rollback()
+            if attempt == MAX_ATTEMPTS or not is_retryable(e):
+                raise
+            delay = min(MAX_DELAY, BASE_DELAY * 2 ** (attempt - 1))
+            time.sleep(random.uniform(0, delay))
+        except Exception:
+            db.session.rollback()
+            raise
+
+
+def reserve_statement(quantities):
+    """The conditional decrement behind reserve_stock, for callers adding RETURNING."""
+    qty = case(quantities, value=Product.id)
+    return (
+        update(Product)
+        .where(Product.id.in_(quantities), Product.stock_quantity >= qty)
+        .values(stock_quantity=Product.stock_quantity - qty)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def reserve_stock(quantities):
+    """
+    Atomically take {product_id: qty} out of stock with a single
+
+        UPDATE products SET stock_quantity = stock_quantity - :q
+        WHERE id = :id AND stock_quantity >= :q
+
+    (one CASE expression covers every product). If fewer rows are affected
+    than requested, some line was short and InsufficientStock is raised;
+    the caller must roll back the transaction.
+
+    Returns {product_id: stock_after} for the reserved products.
+    """
+    if not quantities:
+        return {}
+
+    stmt = reserve_statement(quantities)
+    if db.engine.dialect.update_returning:
+        rows = db.session.execute(
+            stmt.returning(Product.id, Product.stock_quantity)
+        ).all()
+        if len(rows) != len(quantities):
+            raise InsufficientStock()
+        return {pid: stock for pid, stock in rows}
+
+    result = db.session.execute(stmt)
+    if result.rowcount != len(quantities):
+        raise InsufficientStock()
+
+    # the rows are now locked by our UPDATE, so this read is consistent
+    rows = db.session.execute(
+        select(Product.id, Product.stock_quantity)
+        .where(Product.id.in_(quantities))
+    )
+    return {pid: stock for pid, stock in rows}
+
+
+def short_products(quantities):
+    """Ids whose current stock is below the requested quantity."""
+    rows = db.session.execute(
+        select(Product.id, Product.stock_quantity)
+        .where(Product.id.in_(quantities))
+    )
+    return [pid for pid, stock in rows if stock < quantities[pid]]
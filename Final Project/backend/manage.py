@@ -1,9 +1,124 @@
+import click
+from flask import current_app
 from flask.cli import FlaskGroup
 from app import create_app
 from models import db
+import aggregates
+import rollups
+import forecast
+import notifications
+import checkout
 
 app = create_app()
 cli = FlaskGroup(create_app=create_app)
 
+
+@cli.command("rebuild-aggregates")
+@click.option("--check", is_flag=True, help="Only report drift, do not rewrite the tables.")
+def rebuild_aggregates(check):
+    """Recompute the dashboard aggregate tables from products and sales."""
+    problems = aggregates.drift()
+    for line in problems:
+        click.echo(f"drift: {line}")
+    if not problems:
+        click.echo("aggregates in sync ✔")
+
+    if check:
+        if problems:
+            raise SystemExit(1)
+        return
+
+    aggregates.rebuild()
+    click.echo("aggregates rebuilt ✔")
+
+
+@cli.command("rollup-sales")
+@click.option("--since", type=click.DateTime(formats=["%Y-%m-%d"]),
+              help="Only redo days from this UTC date on (default: all sales).")
+@click.option("--check", is_flag=True, help="Only report drift, do not rewrite the rollups.")
+def rollup_sales(since, check):
+    """Recompute the hourly / daily sales rollups from the sales table."""
+    if check:
+        problems = rollups.drift(since)
+        for line in problems:
+            click.echo(f"drift: {line}")
+        if problems:
+            raise SystemExit(1)
+        click.echo("rollups in sync ✔")
+        return
+
+    days = rollups.rebuild(since)
+    click.echo(f"rollups rebuilt for {days} day(s) ✔")
+
+
+@cli.command("forecast-reorder")
+@click.option("--lookback", type=int, help="Days of sales history (FORECAST_LOOKBACK_DAYS).")
+@click.option("--lead-days", type=float, help="Supplier lead time in days (FORECAST_LEAD_DAYS).")
+@click.option("--dry-run", is_flag=True, help="Print the forecast without updating products.")
+@click.option("--top", type=int, default=10, show_default=True,
+              help="How many products with the least days of cover to list.")
+def forecast_reorder(lookback, lead_days, dry_run, top):
+    """Set reorder levels from forecast demand over the supplier lead time."""
+    config = current_app.config
+    report = forecast.run(
+        lookback_days=lookback or config["FORECAST_LOOKBACK_DAYS"],
+        lead_days=lead_days or config["FORECAST_LEAD_DAYS"],
+        service_z=config["FORECAST_SERVICE_Z"],
+        halflife_days=config["FORECAST_HALFLIFE_DAYS"],
+        min_level=config["FORECAST_MIN_REORDER"],
+        apply=not dry_run,
+    )
+    t = report["timings"]
+    click.echo(
+        f"{report['products']} products, {report['active']} with sales; "
+        f"load {t['load']:.2f}s, compute {t['compute']:.2f}s, write {t['write']:.2f}s"
+    )
+
+    stats = report["stats"]
+    for i in stats["days_of_cover"].argsort()[:top]:
+        if not stats["active"][i]:
+            break
+        click.echo(
+            f"  product {report['ids'][i]}: {stats['velocity'][i]:.1f}/day "
+            f"(7d {stats['ma7'][i]:.1f}, 28d {stats['ma28'][i]:.1f}), "
+            f"stock {report['stock'][i]}, {stats['days_of_cover'][i]:.1f} days of cover, "
+            f"reorder level {report['reorder'][i]} -> {stats['suggested'][i]}"
+        )
+    verb = "would change" if dry_run else "updated"
+    click.echo(f"reorder levels {verb} for {report['changed']} product(s) ✔")
+
+
+@cli.command("prune-notifications")
+@click.option("--days", type=int,
+              help="Remove seen notifications idle this long (NOTIFICATION_RETENTION_DAYS).")
+@click.option("--batch-size", type=int, help="Rows per transaction (NOTIFICATION_PRUNE_BATCH).")
+@click.option("--archive", is_flag=True, help="Copy them to notifications_archive first.")
+@click.option("--pause", type=float, default=0.0, show_default=True,
+              help="Seconds to sleep between batches.")
+def prune_notifications(days, batch_size, archive, pause):
+    """Delete or archive old seen notifications in bounded batches."""
+    config = current_app.config
+    days = days if days is not None else config["NOTIFICATION_RETENTION_DAYS"]
+    removed = notifications.prune(
+        days, batch_size or config["NOTIFICATION_PRUNE_BATCH"], archive, pause
+    )
+    verb = "archived" if archive else "deleted"
+    click.echo(f"{removed} seen notification(s) older than {days} day(s) {verb} ✔")
+
+
+@cli.command("prune-idempotency-keys")
+@click.option("--days", type=int,
+              help="Forget keys older than this (IDEMPOTENCY_KEY_RETENTION_DAYS).")
+@click.option("--batch-size", type=int, default=1000, show_default=True,
+              help="Rows per transaction.")
+@click.option("--pause", type=float, default=0.0, show_default=True,
+              help="Seconds to sleep between batches.")
+def prune_idempotency_keys(days, batch_size, pause):
+    """Delete old /api/sales/batch idempotency keys in bounded batches."""
+    days = days if days is not None else current_app.config["IDEMPOTENCY_KEY_RETENTION_DAYS"]
+    removed = checkout.prune_keys(days, batch_size, pause)
+    click.echo(f"{removed} idempotency key(s) older than {days} day(s) deleted ✔")
+
+
 if __name__ == "__main__":
     cli()
@@ -0,0 +1,71 @@
+"""initial schema
+
+Databases from before migrations were built by db.create_all() with these
+four tables; upgrade() only creates the ones that aren't there, so
+`flask db upgrade` adopts such a database and carries on from here.
+
+Revision ID: 3a1f0c2d9b10
+Revises: 
+Create Date: 2026-10-18 08:15:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3a1f0c2d9b10'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+    if 'suppliers' not in existing:
+        op.create_table('suppliers',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=128), nullable=False),
+        sa.Column('contact', sa.String(length=256), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+        )
+    if 'products' not in existing:
+        op.create_table('products',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=256), nullable=False),
+        sa.Column('category', sa.String(length=128), nullable=True),
+        sa.Column('price', sa.Float(), nullable=False),
+        sa.Column('stock_quantity', sa.Integer(), nullable=False),
+        sa.Column('reorder_level', sa.Integer(), nullable=False),
+        sa.Column('supplier_id', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['supplier_id'], ['suppliers.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+    if 'sales' not in existing:
+        op.create_table('sales',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('quantity_sold', sa.Integer(), nullable=False),
+        sa.Column('sale_date', sa.DateTime(), nullable=True),
+        sa.Column('total_price', sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+    if 'notifications' not in existing:
+        op.create_table('notifications',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('product_id', sa.Integer(), nullable=True),
+        sa.Column('message', sa.String(length=512), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('seen', sa.Boolean(), nullable=True),
+        sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+
+
+def downgrade():
+    op.drop_table('notifications')
+    op.drop_table('sales')
+    op.drop_table('products')
+    op.drop_table('suppliers')
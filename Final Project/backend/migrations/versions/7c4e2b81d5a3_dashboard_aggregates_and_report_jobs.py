@@ -0,0 +1,69 @@
+"""dashboard aggregates and report jobs
+
+Revision ID: 7c4e2b81d5a3
+Revises: 3a1f0c2d9b10
+Create Date: 2026-10-18 08:16:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c4e2b81d5a3'
+down_revision = '3a1f0c2d9b10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('product_sales_totals',
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('units_sold', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+    sa.PrimaryKeyConstraint('product_id')
+    )
+    op.create_table('category_stats',
+    sa.Column('category', sa.String(length=128), nullable=False),
+    sa.Column('product_count', sa.Integer(), nullable=False),
+    sa.Column('stock', sa.Integer(), nullable=False),
+    sa.Column('stock_value', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('category')
+    )
+    op.create_table('report_jobs',
+    sa.Column('id', sa.String(length=32), nullable=False),
+    sa.Column('dedup_key', sa.String(length=64), nullable=False),
+    sa.Column('params', sa.Text(), nullable=False),
+    sa.Column('status', sa.String(length=16), nullable=False),
+    sa.Column('error', sa.String(length=512), nullable=True),
+    sa.Column('artifact', sa.String(length=256), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('report_jobs', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_report_jobs_dedup_key'), ['dedup_key'], unique=False)
+
+    # fill the aggregates from what is already there, as aggregates.compute() does
+    op.execute(sa.text(
+        "INSERT INTO product_sales_totals (product_id, units_sold, revenue) "
+        "SELECT p.id, COALESCE(SUM(s.quantity_sold), 0), COALESCE(SUM(s.total_price), 0) "
+        "FROM products p LEFT JOIN sales s ON s.product_id = p.id "
+        "GROUP BY p.id"
+    ))
+    op.execute(sa.text(
+        "INSERT INTO category_stats (category, product_count, stock, stock_value) "
+        "SELECT COALESCE(category, ''), COUNT(id), COALESCE(SUM(stock_quantity), 0), "
+        "COALESCE(SUM(stock_quantity * price), 0) "
+        "FROM products GROUP BY COALESCE(category, '')"
+    ))
+
+
+def downgrade():
+    with op.batch_alter_table('report_jobs', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_report_jobs_dedup_key'))
+
+    op.drop_table('report_jobs')
+    op.drop_table('category_stats')
+    op.drop_table('product_sales_totals')
@@ -0,0 +1,31 @@
+"""one active report job per dedup key
+
+Revision ID: a7e3c5f1b8d4
+Revises: f2b7d9c4a1e6
+Create Date: 2026-10-18 13:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7e3c5f1b8d4'
+down_revision = 'f2b7d9c4a1e6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('report_jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('active_key', sa.String(length=64), nullable=True))
+        batch_op.create_index('ux_report_jobs_active_key', ['active_key'], unique=True)
+
+    # jobs queued before this revision keep a NULL active_key; submit() still
+    # finds them by dedup_key, and they are not unique-checked
+
+
+def downgrade():
+    with op.batch_alter_table('report_jobs', schema=None) as batch_op:
+        batch_op.drop_index('ux_report_jobs_active_key')
+        batch_op.drop_column('active_key')
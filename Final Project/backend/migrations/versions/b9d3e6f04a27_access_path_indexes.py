@@ -0,0 +1,70 @@
+"""indexes for the API's access paths
+
+Revision ID: b9d3e6f04a27
+Revises: 7c4e2b81d5a3
+Create Date: 2026-10-18 08:17:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b9d3e6f04a27'
+down_revision = '7c4e2b81d5a3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+
+    # /api/products keyset order, category / supplier filters
+    op.create_index('ix_products_name_id', 'products', ['name', 'id'], unique=False)
+    op.create_index('ix_products_category', 'products', ['category'], unique=False)
+    op.create_index('ix_products_supplier_id', 'products', ['supplier_id'], unique=False)
+    # low stock: models.low_stock_filter() compares this expression to 0
+    op.create_index(
+        'ix_products_stock_margin', 'products',
+        [sa.text('(stock_quantity - reorder_level)')], unique=False,
+    )
+
+    # recent sales / export ranges, and per-product joins over a date range
+    op.create_index('ix_sales_sale_date', 'sales', ['sale_date'], unique=False)
+    op.create_index('ix_sales_product_id_sale_date', 'sales', ['product_id', 'sale_date'], unique=False)
+
+    # notifications newest-first keyset, per-product lookups, unread list
+    op.create_index('ix_notifications_created_at_id', 'notifications', ['created_at', 'id'], unique=False)
+    op.create_index('ix_notifications_product_id', 'notifications', ['product_id'], unique=False)
+    if dialect in ('postgresql', 'sqlite'):
+        op.create_index(
+            'ix_notifications_unseen', 'notifications', ['created_at', 'id'], unique=False,
+            postgresql_where=sa.text('NOT seen'),
+            sqlite_where=sa.text('seen = 0'),
+        )
+    else:
+        op.create_index(
+            'ix_notifications_seen_created_at', 'notifications',
+            ['seen', 'created_at', 'id'], unique=False,
+        )
+
+    # dashboard top products
+    op.create_index('ix_product_sales_totals_revenue', 'product_sales_totals', ['revenue'], unique=False)
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+
+    op.drop_index('ix_product_sales_totals_revenue', table_name='product_sales_totals')
+    if dialect in ('postgresql', 'sqlite'):
+        op.drop_index('ix_notifications_unseen', table_name='notifications')
+    else:
+        op.drop_index('ix_notifications_seen_created_at', table_name='notifications')
+    op.drop_index('ix_notifications_product_id', table_name='notifications')
+    op.drop_index('ix_notifications_created_at_id', table_name='notifications')
+    op.drop_index('ix_sales_product_id_sale_date', table_name='sales')
+    op.drop_index('ix_sales_sale_date', table_name='sales')
+    op.drop_index('ix_products_stock_margin', table_name='products')
+    op.drop_index('ix_products_supplier_id', table_name='products')
+    op.drop_index('ix_products_category', table_name='products')
+    op.drop_index('ix_products_name_id', table_name='products')
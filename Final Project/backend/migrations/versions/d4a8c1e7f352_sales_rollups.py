@@ -0,0 +1,80 @@
+"""hourly and daily sales rollups
+
+Revision ID: d4a8c1e7f352
+Revises: b9d3e6f04a27
+Create Date: 2026-10-18 09:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4a8c1e7f352'
+down_revision = 'b9d3e6f04a27'
+branch_labels = None
+depends_on = None
+
+
+# start of the UTC hour / day holding sale_date, as rollups.floor_hour / floor_day
+# compute it, in the stored DateTime format of each dialect
+BUCKETS = {
+    'postgresql': {'hour': "date_trunc('hour', s.sale_date)",
+                   'day': "date_trunc('day', s.sale_date)"},
+    'mysql': {'hour': "CAST(DATE_FORMAT(s.sale_date, '%Y-%m-%d %H:00:00') AS DATETIME)",
+              'day': "CAST(DATE(s.sale_date) AS DATETIME)"},
+    'sqlite': {'hour': "strftime('%Y-%m-%d %H:00:00.000000', s.sale_date)",
+               'day': "strftime('%Y-%m-%d 00:00:00.000000', s.sale_date)"},
+}
+
+
+def backfill(dialect):
+    """Roll the existing sales up with INSERT ... SELECT ... GROUP BY."""
+    for period, bucket in BUCKETS[dialect].items():
+        for table, key, source in (
+            ('product_sales_rollups', 'product_id', "s.product_id"),
+            ('category_sales_rollups', 'category', "COALESCE(p.category, '')"),
+        ):
+            op.execute(sa.text(
+                f"INSERT INTO {table} (period, {key}, bucket, units, revenue, sales) "
+                f"SELECT '{period}', {source}, {bucket}, SUM(s.quantity_sold), "
+                f"COALESCE(SUM(s.total_price), 0), COUNT(*) "
+                f"FROM sales s JOIN products p ON p.id = s.product_id "
+                f"WHERE s.sale_date IS NOT NULL "
+                f"GROUP BY {source}, {bucket}"
+            ))
+
+
+def upgrade():
+    op.create_table('product_sales_rollups',
+    sa.Column('period', sa.String(length=8), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('bucket', sa.DateTime(), nullable=False),
+    sa.Column('units', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Float(), nullable=False),
+    sa.Column('sales', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+    sa.PrimaryKeyConstraint('period', 'product_id', 'bucket')
+    )
+    op.create_table('category_sales_rollups',
+    sa.Column('period', sa.String(length=8), nullable=False),
+    sa.Column('category', sa.String(length=128), nullable=False),
+    sa.Column('bucket', sa.DateTime(), nullable=False),
+    sa.Column('units', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Float(), nullable=False),
+    sa.Column('sales', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('period', 'category', 'bucket')
+    )
+    op.create_index('ix_category_sales_rollups_period_bucket', 'category_sales_rollups',
+                    ['period', 'bucket'], unique=False)
+
+    dialect = op.get_bind().dialect.name
+    if dialect in BUCKETS:
+        backfill(dialect)
+    # other databases: run `python manage.py rollup-sales` afterwards to fill the new tables
+
+
+def downgrade():
+    op.drop_index('ix_category_sales_rollups_period_bucket', table_name='category_sales_rollups')
+    op.drop_table('category_sales_rollups')
+    op.drop_table('product_sales_rollups')
@@ -0,0 +1,88 @@
+"""coalesced low-stock notifications and notification archive
+
+Revision ID: e6f19a3c8b52
+Revises: d4a8c1e7f352
+Create Date: 2026-10-18 09:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e6f19a3c8b52'
+down_revision = 'd4a8c1e7f352'
+branch_labels = None
+depends_on = None
+
+
+notifications = sa.table('notifications',
+    sa.column('id', sa.Integer),
+    sa.column('product_id', sa.Integer),
+    sa.column('seen', sa.Boolean),
+    sa.column('created_at', sa.DateTime),
+    sa.column('open_product_id', sa.Integer),
+    sa.column('occurrences', sa.Integer),
+    sa.column('updated_at', sa.DateTime),
+)
+
+
+def upgrade():
+    with op.batch_alter_table('notifications', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('open_product_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('occurrences', sa.Integer(), nullable=False,
+                                      server_default='1'))
+        batch_op.add_column(sa.Column('last_quantity', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+    # fold the existing duplicates: per product, the newest unseen row stays
+    # open and counts the others, which are marked seen
+    bind = op.get_bind()
+    bind.execute(notifications.update().values(updated_at=notifications.c.created_at))
+    unseen = sa.or_(notifications.c.seen == sa.false(), notifications.c.seen.is_(None))
+    latest = bind.execute(
+        sa.select(notifications.c.product_id, sa.func.max(notifications.c.id),
+                  sa.func.count())
+        .where(unseen, notifications.c.product_id.isnot(None))
+        .group_by(notifications.c.product_id)
+    ).all()
+    for product_id, newest, count in latest:
+        bind.execute(
+            notifications.update()
+            .where(notifications.c.id == newest)
+            .values(open_product_id=product_id, occurrences=count)
+        )
+        bind.execute(
+            notifications.update()
+            .where(unseen, notifications.c.product_id == product_id,
+                   notifications.c.id != newest)
+            .values(seen=True)
+        )
+
+    with op.batch_alter_table('notifications', schema=None) as batch_op:
+        batch_op.create_index('ux_notifications_open_product_id', ['open_product_id'], unique=True)
+        batch_op.create_index('ix_notifications_seen_updated_at', ['seen', 'updated_at'], unique=False)
+
+    op.create_table('notifications_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=True),
+    sa.Column('message', sa.String(length=512), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('occurrences', sa.Integer(), nullable=False),
+    sa.Column('last_quantity', sa.Integer(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('notifications_archive')
+
+    with op.batch_alter_table('notifications', schema=None) as batch_op:
+        batch_op.drop_index('ix_notifications_seen_updated_at')
+        batch_op.drop_index('ux_notifications_open_product_id')
+        batch_op.drop_column('updated_at')
+        batch_op.drop_column('last_quantity')
+        batch_op.drop_column('occurrences')
+        batch_op.drop_column('open_product_id')
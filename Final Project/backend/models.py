@@ -1,7 +1,8 @@
 from flask_sqlalchemy import SQLAlchemy
+from database import RoutingSession
 from datetime import datetime
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 
 class Supplier(db.Model):
     __tablename__ = "suppliers"
@@ -21,6 +22,19 @@ class Product(db.Model):
     supplier_id = db.Column(db.Integer, db.ForeignKey("suppliers.id"), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        # keyset pagination / default ordering of /api/products
+        db.Index("ix_products_name_id", "name", "id"),
+        db.Index("ix_products_category", "category"),
+        db.Index("ix_products_supplier_id", "supplier_id"),
+        # expression index matched by low_stock_filter()
+        db.Index("ix_products_stock_margin", db.text("(stock_quantity - reorder_level)")),
+    )
+
+def low_stock_filter():
+    """stock_quantity <= reorder_level, written so ix_products_stock_margin applies."""
+    return (Product.stock_quantity - Product.reorder_level) <= 0
+
 class Sale(db.Model):
     __tablename__ = "sales"
     id = db.Column(db.Integer, primary_key=True)
@@ -30,6 +44,26 @@ class Sale(db.Model):
     total_price = db.Column(db.Float, nullable=False)
     product = db.relationship("Product")
 
+    __table_args__ = (
+        db.Index("ix_sales_sale_date", "sale_date"),
+        db.Index("ix_sales_product_id_sale_date", "product_id", "sale_date"),
+    )
+
+# one per basket sold through /api/sales/batch: the terminal's key and the
+# result it was given, replayed when the same key is sent again
+class IdempotencyKey(db.Model):
+    __tablename__ = "idempotency_keys"
+    id = db.Column(db.Integer, primary_key=True)
+    key = db.Column(db.String(64), nullable=False)
+    response = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # the unique index is what stops two concurrent uploads selling twice
+        db.Index("ux_idempotency_keys_key", "key", unique=True),
+        db.Index("ix_idempotency_keys_created_at", "created_at"),
+    )
+
 class Notification(db.Model):
     __tablename__ = "notifications"
     id = db.Column(db.Integer, primary_key=True)
@@ -37,4 +71,114 @@ class Notification(db.Model):
     message = db.Column(db.String(512))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     seen = db.Column(db.Boolean, default=False)
+    # low-stock alerts are coalesced (notifications.py): while unseen, the
+    # alert holds its product id here and later sales update it in place;
+    # marking it seen clears this, so the next low-stock sale opens a new one
+    open_product_id = db.Column(db.Integer)
+    occurrences = db.Column(db.Integer, nullable=False, default=1)
+    last_quantity = db.Column(db.Integer)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    product = db.relationship("Product")
+
+    __table_args__ = (
+        db.Index("ix_notifications_created_at_id", "created_at", "id"),
+        db.Index("ix_notifications_product_id", "product_id"),
+        # at most one open alert per product (NULLs don't collide)
+        db.Index("ux_notifications_open_product_id", "open_product_id", unique=True),
+        # retention job: seen alerts by age
+        db.Index("ix_notifications_seen_updated_at", "seen", "updated_at"),
+        # partial index for the unread list where the backend supports it,
+        # a plain composite one elsewhere
+        db.Index(
+            "ix_notifications_unseen", "created_at", "id",
+            postgresql_where=db.text("NOT seen"),
+            sqlite_where=db.text("seen = 0"),
+        ).ddl_if(dialect=("postgresql", "sqlite")),
+        db.Index(
+            "ix_notifications_seen_created_at", "seen", "created_at", "id",
+        ).ddl_if(dialect="mysql"),
+    )
+
+# seen notifications moved out by `python manage.py prune-notifications --archive`
+class NotificationArchive(db.Model):
+    __tablename__ = "notifications_archive"
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    product_id = db.Column(db.Integer)
+    message = db.Column(db.String(512))
+    created_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime)
+    occurrences = db.Column(db.Integer, nullable=False, default=1)
+    last_quantity = db.Column(db.Integer)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+# ---------- MATERIALIZED DASHBOARD AGGREGATES ----------
+# kept in step with products / sales by aggregates.py, rebuilt with
+# `python manage.py rebuild-aggregates`
+
+class ProductSalesTotal(db.Model):
+    __tablename__ = "product_sales_totals"
+    product_id = db.Column(db.Integer, db.ForeignKey("products.id"), primary_key=True)
+    units_sold = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Float, nullable=False, default=0.0)
     product = db.relationship("Product")
+
+    __table_args__ = (
+        # top products chart on the dashboard
+        db.Index("ix_product_sales_totals_revenue", "revenue"),
+    )
+
+class CategoryStats(db.Model):
+    __tablename__ = "category_stats"
+    # "" stands for products without a category
+    category = db.Column(db.String(128), primary_key=True)
+    product_count = db.Column(db.Integer, nullable=False, default=0)
+    stock = db.Column(db.Integer, nullable=False, default=0)
+    stock_value = db.Column(db.Float, nullable=False, default=0.0)
+
+# ---------- SALES ROLLUPS ----------
+# hourly / daily sales buckets behind /api/sales/timeseries, kept in step
+# with sales by rollups.py, rebuilt with `python manage.py rollup-sales`.
+# period is "hour" or "day"; bucket is the UTC start of the hour / day.
+
+class ProductSalesRollup(db.Model):
+    __tablename__ = "product_sales_rollups"
+    period = db.Column(db.String(8), primary_key=True)
+    product_id = db.Column(db.Integer, db.ForeignKey("products.id"), primary_key=True)
+    bucket = db.Column(db.DateTime, primary_key=True)
+    units = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Float, nullable=False, default=0.0)
+    sales = db.Column(db.Integer, nullable=False, default=0)
+
+class CategorySalesRollup(db.Model):
+    __tablename__ = "category_sales_rollups"
+    period = db.Column(db.String(8), primary_key=True)
+    # category at the time of the sale, "" for uncategorized
+    category = db.Column(db.String(128), primary_key=True)
+    bucket = db.Column(db.DateTime, primary_key=True)
+    units = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Float, nullable=False, default=0.0)
+    sales = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        # all-category series: every category's rows for a range
+        db.Index("ix_category_sales_rollups_period_bucket", "period", "bucket"),
+    )
+
+class ReportJob(db.Model):
+    __tablename__ = "report_jobs"
+    id = db.Column(db.String(32), primary_key=True)
+    # identical requests share one job, see reports.submit
+    dedup_key = db.Column(db.String(64), nullable=False, index=True)
+    # dedup_key while queued / running, NULL once finished: the unique index
+    # lets only one active job per key exist however requests race
+    active_key = db.Column(db.String(64))
+    params = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(16), nullable=False, default="queued")
+    error = db.Column(db.String(512))
+    artifact = db.Column(db.String(256))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        db.Index("ux_report_jobs_active_key", "active_key", unique=True),
+    )
@@ -0,0 +1,146 @@
+from models import db, Notification, NotificationArchive
+from events import notification_events, notification_payload, CREATED, UPDATED
+from sqlalchemy import select, update, insert, delete, case, literal
+from sqlalchemy.exc import IntegrityError
+from datetime import datetime, timedelta
+import time
+
+OPEN_ATTEMPTS = 3
+
+
+def low_stock_message(name, qty):
+    return f"Low stock: {name} (qty: {qty})"
+
+
+# ---------- COALESCED LOW-STOCK ALERTS (same transaction as the checkout) ----------
+
+def bump(products, low, pids, now):
+    """Update the open alerts of pids in place with one UPDATE; returns rows hit."""
+    key = Notification.open_product_id
+    return db.session.execute(
+        update(Notification)
+        .where(key.in_(pids))
+        .values(
+            occurrences=Notification.occurrences + case({p: low[p][1] for p in pids}, value=key),
+            last_quantity=case({p: low[p][0] for p in pids}, value=key),
+            message=case({p: low_stock_message(products[p].name, low[p][0]) for p in pids},
+                         value=key),
+            updated_at=now,
+        )
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+
+def low_stock(products, low, now):
+    """
+    low: {product_id: (quantity left, low-stock lines in the basket)}.
+
+    Each product keeps at most one open (unseen) alert: an existing one
+    gets its occurrence count, latest quantity and message updated in
+    place, otherwise a new one is opened. Both are staged for the SSE
+    stream, published when the checkout commits.
+    """
+    pending = list(low)
+    updated, created = [], []
+    for attempt in range(1, OPEN_ATTEMPTS + 1):
+        if bump(products, low, pending, now):
+            rows = db.session.scalars(
+                select(Notification)
+                .where(Notification.open_product_id.in_(pending))
+                .execution_options(populate_existing=True)
+            ).all()
+            updated.extend(rows)
+            done = {n.open_product_id for n in rows}
+            pending = [p for p in pending if p not in done]
+        if not pending:
+            break
+        try:
+            with db.session.begin_nested():
+                created = [
+                    Notification(
+                        product_id=p, open_product_id=p,
+                        message=low_stock_message(products[p].name, low[p][0]),
+                        occurrences=low[p][1], last_quantity=low[p][0],
+                        created_at=now, updated_at=now, seen=False,
+                    )
+                    for p in pending
+                ]
+                db.session.add_all(created)
+        except IntegrityError:
+            # a concurrent checkout opened some of these alerts first; bump theirs
+            created = []
+            if attempt == OPEN_ATTEMPTS:
+                raise
+        else:
+            break
+
+    notification_events.stage(db.session, [notification_payload(n) for n in created], CREATED)
+    notification_events.stage(db.session, [notification_payload(n) for n in updated], UPDATED)
+
+
+# ---------- ACKNOWLEDGEMENT ----------
+
+def mark_seen(ids=None, product_id=None, before=None):
+    """
+    Mark unseen notifications seen -- the given ids, or everything matching
+    the filter -- with one UPDATE. Closing an alert frees its product for
+    the next one. Returns the number of rows changed.
+    """
+    q = update(Notification).where(Notification.seen == False)  # noqa: E712
+    if ids is not None:
+        q = q.where(Notification.id.in_(ids))
+    if product_id is not None:
+        q = q.where(Notification.product_id == product_id)
+    if before is not None:
+        q = q.where(Notification.created_at < before)
+    result = db.session.execute(
+        q.values(seen=True, open_product_id=None)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return result.rowcount
+
+
+# ---------- RETENTION ----------
+
+ARCHIVE_COLUMNS = ("id", "product_id", "message", "created_at", "updated_at",
+                   "occurrences", "last_quantity")
+
+
+def prune(days, batch_size=1000, archive=False, pause=0.0):
+    """
+    Delete (or, with archive, move to notifications_archive) seen
+    notifications not updated for `days` days, batch_size rows per
+    transaction so locks stay short and replicas keep up. Returns the
+    number of rows removed.
+    """
+    now = datetime.utcnow()
+    cutoff = now - timedelta(days=days)
+    removed = 0
+    while True:
+        ids = db.session.scalars(
+            select(Notification.id)
+            .where(Notification.seen == True,  # noqa: E712
+                   Notification.updated_at < cutoff)
+            .order_by(Notification.id)
+            .limit(batch_size)
+        ).all()
+        if not ids:
+            break
+        if archive:
+            db.session.execute(
+                insert(NotificationArchive).from_select(
+                    ARCHIVE_COLUMNS + ("archived_at",),
+                    select(*(getattr(Notification, c) for c in ARCHIVE_COLUMNS), literal(now))
+                    .where(Notification.id.in_(ids)),
+                )
+            )
+        db.session.execute(
+            delete(Notification).where(Notification.id.in_(ids))
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        removed += len(ids)
+        if pause:
+            time.sleep(pause)
+    return removed
@@ -0,0 +1,80 @@
+from flask import request
+from urllib.parse import urlencode
+from datetime import datetime
+import base64
+import json
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 500
+
+
+class PaginationError(ValueError):
+    pass
+
+
+def encode_cursor(values):
+    raw = json.dumps(
+        [v.isoformat() if isinstance(v, datetime) else v for v in values],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token, types):
+    """Decode a cursor into a tuple, converting each value with the matching type."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        values = json.loads(raw)
+        if len(values) != len(types):
+            raise ValueError
+        return tuple(
+            datetime.fromisoformat(v) if t is datetime else t(v)
+            for t, v in zip(types, values)
+        )
+    except (ValueError, TypeError):
+        raise PaginationError("Invalid cursor")
+
+
+def parse_limit():
+    raw = request.args.get("limit")
+    if raw is None:
+        return DEFAULT_LIMIT
+    try:
+        limit = int(raw)
+    except ValueError:
+        raise PaginationError("limit must be an integer")
+    if limit <= 0:
+        raise PaginationError("limit must be positive")
+    return min(limit, MAX_LIMIT)
+
+
+def parse_fields(allowed):
+    """`fields=a,b` -> ["a", "b"]; all allowed fields when absent."""
+    raw = request.args.get("fields")
+    if not raw:
+        return list(allowed)
+    fields = [f.strip() for f in raw.split(",") if f.strip()]
+    unknown = [f for f in fields if f not in allowed]
+    if unknown:
+        raise PaginationError(f"Unknown field(s): {', '.join(unknown)}")
+    return fields
+
+
+def parse_bool(name):
+    raw = request.args.get(name)
+    if raw is None:
+        return None
+    return raw.lower() in ("1", "true", "yes")
+
+
+def link_next(resp, next_cursor):
+    """
+    When there are more rows, advertise the next page on resp in both a
+    `Link: <...>; rel="next"` and an `X-Next-Cursor` header.
+    """
+    if next_cursor:
+        args = request.args.to_dict()
+        args["cursor"] = next_cursor
+        resp.headers["X-Next-Cursor"] = next_cursor
+        resp.headers["Link"] = f'<{request.path}?{urlencode(args)}>; rel="next"'
+    return resp
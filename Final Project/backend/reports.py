@@ -0,0 +1,210 @@
+from models import db, ReportJob
+from exports import sales_report_query
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from fpdf import FPDF
+import multiprocessing
+import hashlib
+import json
+import os
+import uuid
+
+ACTIVE = ("queued", "running")
+CHUNK_ROWS = 2000
+
+
+class SalesReportPDF(FPDF):
+    """Sales table that repeats its title and column header on every page."""
+
+    COLUMNS = (("Date", 40, "L"), ("Product", 60, "L"), ("Qty", 25, "R"), ("Total", 35, "R"))
+
+    def __init__(self, title):
+        super().__init__()
+        self.report_title = title
+        self.set_auto_page_break(True, margin=15)
+
+    def header(self):
+        self.set_font("Helvetica", size=16)
+        self.cell(0, 10, self.report_title, ln=True, align="C")
+        self.ln(4)
+        self.set_font("Helvetica", size=10)
+        for label, width, align in self.COLUMNS:
+            self.cell(width, 8, label, border=1, align=align)
+        self.ln(8)
+
+    def footer(self):
+        self.set_y(-12)
+        self.set_font("Helvetica", size=8)
+        self.cell(0, 8, f"Page {self.page_no()}/{{nb}}", align="C")
+
+    def row(self, *values):
+        for value, (_, width, align) in zip(values, self.COLUMNS):
+            self.cell(width, 8, value, border=1, align=align)
+        self.ln(8)
+
+
+def render_pdf(filters, path):
+    since, until = filters["since"], filters["until"]
+    pdf = SalesReportPDF(
+        f"Sales Report ({since:%Y-%m-%d} to {until - timedelta(seconds=1):%Y-%m-%d})"
+    )
+    pdf.add_page()
+
+    count = qty_total = revenue = 0
+    result = db.session.execute(
+        sales_report_query(filters).execution_options(yield_per=CHUNK_ROWS)
+    )
+    for sale_date, name, qty, total in result:
+        pdf.row(sale_date.strftime("%Y-%m-%d"), name[:28], str(qty), f"${float(total):.2f}")
+        count += 1
+        qty_total += qty
+        revenue += float(total)
+
+    # totals section
+    pdf.ln(4)
+    pdf.set_font("Helvetica", style="B", size=10)
+    pdf.cell(100, 8, f"Totals ({count} sales)", border=1)
+    pdf.cell(25, 8, str(qty_total), border=1, align="R")
+    pdf.cell(35, 8, f"${revenue:.2f}", border=1, align="R")
+    pdf.ln(8)
+
+    pdf.output(path)
+
+
+def dump_filters(filters):
+    return json.dumps({
+        k: v.isoformat() if isinstance(v, datetime) else v
+        for k, v in filters.items()
+    }, sort_keys=True)
+
+
+def load_filters(params):
+    filters = json.loads(params)
+    filters["since"] = datetime.fromisoformat(filters["since"])
+    filters["until"] = datetime.fromisoformat(filters["until"])
+    return filters
+
+
+def run_job(job_id):
+    """
+    Report process entry point. Each process imports the app module once,
+    which builds its own app and connection pool from the environment.
+    """
+    from app import app
+
+    report_queue.run(app, job_id)
+
+
+class ReportQueue:
+    """
+    Renders report jobs in a small pool of separate processes, so web
+    requests only enqueue and poll and FPDF doesn't hold the web worker's
+    GIL. Job state lives in report_jobs so any gunicorn worker can answer
+    status requests; finished files go to REPORTS_DIR.
+    """
+
+    def __init__(self):
+        self.executor = None
+
+    def init_app(self, app):
+        self.directory = app.config["REPORTS_DIR"]
+        self.workers = app.config.get("REPORT_WORKERS", 2)
+        self.stale_after = timedelta(seconds=app.config.get("REPORT_STALE_SECONDS", 600))
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _pool(self):
+        if self.executor is None:
+            # spawn, not fork: the web worker has threads and open connections
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self.executor
+
+    def artifact_path(self, job):
+        return os.path.join(self.directory, job.artifact) if job.artifact else None
+
+    def submit(self, filters, fmt="pdf"):
+        """Return the existing job for identical parameters, or queue a new one."""
+        # minute precision so "last 30 days" requests made together dedupe;
+        # `until` rounds up so sales from the current minute are included
+        filters = dict(filters)
+        filters["since"] = filters["since"].replace(second=0, microsecond=0)
+        until = filters["until"].replace(second=0, microsecond=0)
+        if until < filters["until"]:
+            until += timedelta(minutes=1)
+        filters["until"] = until
+        params = dump_filters(dict(filters, format=fmt))
+        key = hashlib.sha256(params.encode()).hexdigest()
+
+        now = datetime.utcnow()
+        fresh = now - self.stale_after
+        for job in self.latest(key):
+            if job.status in ACTIVE and job.created_at >= fresh:
+                return job
+            if job.status == "done" and os.path.exists(self.artifact_path(job)):
+                return job
+
+        # an active job past REPORT_STALE_SECONDS is lost; release its key
+        db.session.execute(
+            update(ReportJob)
+            .where(ReportJob.active_key == key, ReportJob.created_at < fresh)
+            .values(status="failed", error="no worker finished the job",
+                    active_key=None, finished_at=now)
+        )
+        job = ReportJob(id=uuid.uuid4().hex, dedup_key=key, active_key=key,
+                        params=params, status="queued")
+        try:
+            with db.session.begin_nested():
+                db.session.add(job)
+        except IntegrityError:
+            # an identical request queued its job first; share that one
+            db.session.commit()
+            return self.latest(key).first()
+        db.session.commit()
+        self._pool().submit(run_job, job.id)
+        return job
+
+    def latest(self, key):
+        return ReportJob.query.filter_by(dedup_key=key).order_by(ReportJob.created_at.desc())
+
+    def run(self, app, job_id):
+        with app.app_context():
+            job = db.session.get(ReportJob, job_id)
+            job.status = "running"
+            db.session.commit()
+
+            filename = f"{job.id}.pdf"
+            tmp = os.path.join(self.directory, filename + ".part")
+            try:
+                render_pdf(load_filters(job.params), tmp)
+                os.replace(tmp, os.path.join(self.directory, filename))
+                job.status = "done"
+                job.artifact = filename
+                job.active_key = None
+            except Exception as e:
+                db.session.rollback()
+                job = db.session.get(ReportJob, job_id)
+                job.status = "failed"
+                job.error = str(e)[:512]
+                job.active_key = None
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+            job.finished_at = datetime.utcnow()
+            db.session.commit()
+
+
+report_queue = ReportQueue()
+
+
+def job_payload(job):
+    return {
+        "id": job.id,
+        "status": job.status,
+        "error": job.error,
+        "params": json.loads(job.params),
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+        "download_url": f"/api/reports/{job.id}/file" if job.status == "done" else None,
+    }
@@ -0,0 +1,292 @@
+from models import db, Product, Sale, ProductSalesRollup, CategorySalesRollup
+from aggregates import category_key, TOLERANCE
+from sqlalchemy import select, update, insert, delete, case, func, tuple_
+from sqlalchemy.exc import IntegrityError
+from datetime import timedelta
+
+# rollups are stored per hour and per day; coarser granularities are
+# folded from the daily rows when queried
+GRANULARITIES = ("hour", "day", "week", "month")
+MAX_BUCKETS = 10000
+# tries at opening new rollup rows when concurrent checkouts race for them
+OPEN_ATTEMPTS = 3
+
+HOUR, DAY = timedelta(hours=1), timedelta(days=1)
+
+
+def floor_hour(ts):
+    return ts.replace(minute=0, second=0, microsecond=0)
+
+
+def floor_day(ts):
+    return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def bucket_start(ts, granularity):
+    if granularity == "hour":
+        return floor_hour(ts)
+    day = floor_day(ts)
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())  # ISO weeks start on Monday
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def next_bucket(ts, granularity):
+    if granularity == "hour":
+        return ts + HOUR
+    if granularity == "week":
+        return ts + timedelta(days=7)
+    if granularity == "month":
+        return (ts.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return ts + DAY
+
+
+# ---------- WRITE PATH (same transaction as the checkout) ----------
+
+def bump(model, key, deltas, rows):
+    """
+    Add deltas[k] = (units, revenue, sales) onto the given (period, bucket,
+    k) rows with one UPDATE; returns the set of rows it hit. Without
+    RETURNING the rows must exist (add() has them locked) and a short
+    rowcount raises.
+    """
+    rows = list(rows)
+    keys = {k for _, _, k in rows}
+    stmt = (
+        update(model)
+        .where(tuple_(model.period, model.bucket, key).in_(rows))
+        .values(
+            units=model.units + case({k: deltas[k][0] for k in keys}, value=key),
+            revenue=model.revenue + case({k: deltas[k][1] for k in keys}, value=key),
+            sales=model.sales + case({k: deltas[k][2] for k in keys}, value=key),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if db.engine.dialect.update_returning:
+        return set(db.session.execute(stmt.returning(model.period, model.bucket, key)).all())
+    hit = db.session.execute(stmt).rowcount
+    if hit != len(rows):
+        raise RuntimeError(f"{model.__tablename__}: updated {hit} of {len(rows)} rollup rows")
+    return set(rows)
+
+
+def add(model, key, buckets, deltas):
+    """
+    Add deltas onto the rows of every key in every (period, bucket),
+    opening the rows that don't exist yet. Every row is applied exactly
+    once: a row a concurrent checkout opens first is picked up by the
+    next attempt, which re-reads what exists and inserts only the rest.
+    """
+    pending = {(period, bucket, k) for period, bucket in buckets for k in deltas}
+    if db.engine.dialect.update_returning:
+        # common case: every row exists, one UPDATE and RETURNING says so
+        pending -= bump(model, key, deltas, pending)
+
+    for attempt in range(1, OPEN_ATTEMPTS + 1):
+        if not pending:
+            return
+        # first sale of this product / category in some of the buckets
+        existing = set(db.session.execute(
+            select(model.period, model.bucket, key)
+            .where(tuple_(model.period, model.bucket, key).in_(list(pending)))
+            .with_for_update()
+        ).all()) & pending
+        if existing:
+            pending -= bump(model, key, deltas, existing)
+        if not pending:
+            return
+        try:
+            with db.session.begin_nested():
+                db.session.execute(insert(model), [
+                    {"period": period, key.key: k, "bucket": bucket,
+                     "units": deltas[k][0], "revenue": deltas[k][1], "sales": deltas[k][2]}
+                    for period, bucket, k in pending
+                ])
+        except IntegrityError:
+            # a concurrent checkout opened some of these rows first; the
+            # savepoint undid the whole INSERT, so go round and add onto theirs
+            if attempt == OPEN_ATTEMPTS:
+                raise
+        else:
+            return
+
+
+def sales_recorded(products, lines, when):
+    """
+    products: {id: row with category/price}, lines: [(product_id, qty)],
+    one sale row each, all sold at `when`. One UPDATE ... RETURNING per
+    rollup table covers both the hour and the day bucket in the common
+    case, plus a SELECT and an INSERT when a bucket is new (a locking
+    SELECT and the UPDATE without RETURNING, as on MySQL).
+    """
+    by_product, by_category = {}, {}
+    for pid, qty in lines:
+        revenue = qty * products[pid].price
+        for deltas, key in ((by_product, pid),
+                            (by_category, category_key(products[pid].category))):
+            units, total, count = deltas.get(key, (0, 0.0, 0))
+            deltas[key] = (units + qty, total + revenue, count + 1)
+
+    buckets = (("hour", floor_hour(when)), ("day", floor_day(when)))
+    add(ProductSalesRollup, ProductSalesRollup.product_id, buckets, by_product)
+    add(CategorySalesRollup, CategorySalesRollup.category, buckets, by_category)
+
+
+# ---------- CATCH-UP / DRIFT CHECK ----------
+
+def compute_day(day):
+    """{(model, period, key, bucket): [units, revenue, sales]} recomputed from one day of sales."""
+    rows = {}
+    for product_id, category, sold_at, qty, total in db.session.execute(
+        select(Sale.product_id, Product.category, Sale.sale_date,
+               Sale.quantity_sold, Sale.total_price)
+        .join(Product, Sale.product_id == Product.id)
+        .where(Sale.sale_date >= day, Sale.sale_date < day + DAY)
+    ):
+        for model, key in ((ProductSalesRollup, product_id),
+                           (CategorySalesRollup, category_key(category))):
+            for period, bucket in (("hour", floor_hour(sold_at)), ("day", day)):
+                acc = rows.setdefault((model, period, key, bucket), [0, 0.0, 0])
+                acc[0] += qty
+                acc[1] += float(total or 0)
+                acc[2] += 1
+    return rows
+
+
+def stored_day(day):
+    rows = {}
+    for model, key in ((ProductSalesRollup, ProductSalesRollup.product_id),
+                       (CategorySalesRollup, CategorySalesRollup.category)):
+        for period, k, bucket, units, revenue, sales in db.session.execute(
+            select(model.period, key, model.bucket, model.units, model.revenue, model.sales)
+            .where(model.bucket >= day, model.bucket < day + DAY)
+        ):
+            rows[(model, period, k, bucket)] = [units, revenue, sales]
+    return rows
+
+
+def days(since=None):
+    """UTC days from since (or the first sale) through the last sale."""
+    first, last = db.session.execute(
+        select(func.min(Sale.sale_date), func.max(Sale.sale_date))
+    ).one()
+    if last is None:
+        return
+    day = floor_day(max(since, first) if since else first)
+    while day <= last:
+        yield day
+        day += DAY
+
+
+def drift(since=None):
+    """Human-readable differences between stored rollups and the sales table."""
+    problems = []
+    for day in days(since):
+        want, have = compute_day(day), stored_day(day)
+        for k in want.keys() | have.keys():
+            w, h = want.get(k), have.get(k)
+            if w is None or h is None or w[0] != h[0] or w[2] != h[2] \
+                    or abs(w[1] - h[1]) > TOLERANCE:
+                model, period, key, bucket = k
+                problems.append(
+                    f"{model.__tablename__} {period} {key!r} {bucket:%Y-%m-%d %H:00}: "
+                    f"stored {h}, actual {w}"
+                )
+    return problems
+
+
+def rebuild(since=None):
+    """
+    Recompute the rollups for every day from since (default: all sales),
+    one day of sales in memory at a time and one commit per day. Checkouts
+    running meanwhile on a day being rebuilt can be lost; run it for past
+    days, or with writes paused.
+    """
+    start = floor_day(since) if since else None
+    for model in (ProductSalesRollup, CategorySalesRollup):
+        stmt = delete(model)
+        if start is not None:
+            stmt = stmt.where(model.bucket >= start)
+        db.session.execute(stmt)
+
+    count = 0
+    for day in days(start):
+        rows = compute_day(day)
+        for model in (ProductSalesRollup, CategorySalesRollup):
+            key = "product_id" if model is ProductSalesRollup else "category"
+            batch = [
+                {"period": period, key: k, "bucket": bucket,
+                 "units": units, "revenue": revenue, "sales": sales}
+                for (m, period, k, bucket), (units, revenue, sales) in rows.items()
+                if m is model
+            ]
+            if batch:
+                db.session.execute(insert(model), batch)
+        db.session.commit()
+        count += 1
+    db.session.commit()
+    return count
+
+
+# ---------- READ PATH ----------
+
+def read(period, lo, hi, product_id=None, category=None):
+    """(bucket, units, revenue, sales) per bucket in [lo, hi), summed across keys."""
+    if lo >= hi:
+        return []
+    if product_id is not None:
+        model, where = ProductSalesRollup, [ProductSalesRollup.product_id == product_id]
+    else:
+        model = CategorySalesRollup
+        where = [CategorySalesRollup.category == category] if category is not None else []
+    return db.session.execute(
+        select(model.bucket, func.sum(model.units), func.sum(model.revenue), func.sum(model.sales))
+        .where(model.period == period, model.bucket >= lo, model.bucket < hi, *where)
+        .group_by(model.bucket)
+    ).all()
+
+
+def series(granularity, start, end, product_id=None, category=None):
+    """
+    Sales per `granularity` bucket over [start, end), both rounded out to
+    whole hours, zero-filled. Whole days are read from the daily rows and
+    only the ragged hours at either end from the hourly ones, so a year at
+    day granularity touches about 365 + 48 rows per key whatever the number
+    of raw sales. Raises ValueError for a bad granularity or too many buckets.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"granularity must be one of {', '.join(GRANULARITIES)}")
+    start = floor_hour(start)
+    end = floor_hour(end) + (HOUR if end != floor_hour(end) else timedelta())
+    if end <= start:
+        raise ValueError("'to' must be after 'from'")
+
+    buckets = {}
+    b = bucket_start(start, granularity)
+    while b < end:
+        buckets[b] = [0, 0.0, 0]
+        if len(buckets) > MAX_BUCKETS:
+            raise ValueError(f"more than {MAX_BUCKETS} buckets; use a coarser granularity")
+        b = next_bucket(b, granularity)
+
+    first_day = floor_day(start) + (DAY if start != floor_day(start) else timedelta())
+    last_day = floor_day(end)
+    if granularity == "hour" or first_day >= last_day:
+        parts = [("hour", start, end)]
+    else:
+        parts = [("hour", start, first_day), ("day", first_day, last_day),
+                 ("hour", last_day, end)]
+
+    for period, lo, hi in parts:
+        for bucket, units, revenue, sales in read(period, lo, hi, product_id, category):
+            acc = buckets[bucket_start(bucket, granularity)]
+            acc[0] += int(units or 0)
+            acc[1] += float(revenue or 0)
+            acc[2] += int(sales or 0)
+
+    return [
+        {"bucket": b.isoformat(), "units": units, "revenue": round(revenue, 2), "sales": sales}
+        for b, (units, revenue, sales) in buckets.items()
+    ]
@@ -1,17 +1,39 @@
-from flask import Blueprint, request, jsonify, send_file
-from models import db, Product, Supplier, Sale, Notification
+from flask import (
+    Blueprint, request, jsonify, send_file, Response, stream_with_context, current_app, abort,
+)
+from models import (
+    db, Product, Supplier, Sale, Notification, ProductSalesTotal, CategoryStats, ReportJob,
+    low_stock_filter,
+)
+from checkout import run_checkout, sell_batch, CheckoutError
+from inventory import run_in_transaction
+import aggregates
+import rollups
+import notifications
+from cache import cached, invalidate, response_cache
+from pagination import (
+    PaginationError, decode_cursor, encode_cursor,
+    parse_bool, parse_fields, parse_limit,
+)
+from serialization import page_json, parse_format, projector, stream_json
+from exports import (
+    ReportRangeError, parse_report_filters, iter_csv, encode, report_filename,
+)
+from reports import report_queue, job_payload
+from database import use_primary
+from events import notification_events
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy import func
-from datetime import datetime, timedelta
-import io
-import csv
-from fpdf import FPDF
+from sqlalchemy import select, func, or_, and_
+from datetime import datetime, timedelta, timezone
+import json
+import os
 
 bp = Blueprint("api", __name__, url_prefix="/api")
 
 # ---------- SUPPLIERS CRUD ----------
 
 @bp.route("/suppliers", methods=["GET"])
+@cached("suppliers")
 def list_suppliers():
     suppliers = Supplier.query.order_by(Supplier.name.asc()).all()
     return jsonify([
@@ -32,27 +54,91 @@ def add_supplier():
     s = Supplier(name=name, contact=contact)
     db.session.add(s)
     db.session.commit()
+    invalidate("suppliers", "dashboard")
     return jsonify({"id": s.id, "name": s.name, "contact": s.contact}), 201
 
 
 # ---------- PRODUCTS CRUD ----------
 
+PRODUCT_FIELDS = {
+    "id": Product.id,
+    "name": Product.name,
+    "category": Product.category,
+    "price": Product.price,
+    "stock_quantity": Product.stock_quantity,
+    "reorder_level": Product.reorder_level,
+    "supplier_id": Product.supplier_id,
+    "created_at": Product.created_at,
+}
+
+
+def serialize_row(row, fields):
+    out = {}
+    for f in fields:
+        v = getattr(row, f)
+        out[f] = v.isoformat() if isinstance(v, datetime) else v
+    return out
+
+
+def select_fields(columns, fields, keys):
+    """Only the requested columns, plus whatever the keyset cursor needs."""
+    wanted = list(keys) + [f for f in fields if f not in keys]
+    return select(*[columns[f] for f in wanted])
+
+
 @bp.route("/products", methods=["GET"])
+@cached("products")
 def list_products():
-    prods = Product.query.order_by(Product.name.asc()).all()
-    return jsonify([
-        {
-            "id": p.id,
-            "name": p.name,
-            "category": p.category,
-            "price": p.price,
-            "stock_quantity": p.stock_quantity,
-            "reorder_level": p.reorder_level,
-            "supplier_id": p.supplier_id,
-            "created_at": p.created_at.isoformat() if p.created_at else None
-        }
-        for p in prods
-    ])
+    """
+    Keyset-paginated on (name, id).
+    Query params: limit, cursor, fields=a,b, category, supplier_id, low_stock,
+    format=rows|columnar, stream (every matching row after the cursor in
+    one streamed array, no limit)
+    """
+    try:
+        limit = parse_limit()
+        fields = parse_fields(PRODUCT_FIELDS)
+        fmt = parse_format()
+        cursor = request.args.get("cursor")
+        after = decode_cursor(cursor, (str, int)) if cursor else None
+        supplier_id = request.args.get("supplier_id", type=int)
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+
+    q = select_fields(PRODUCT_FIELDS, fields, ("name", "id"))
+
+    category = request.args.get("category")
+    if category:
+        q = q.where(Product.category == category)
+    if supplier_id is not None:
+        q = q.where(Product.supplier_id == supplier_id)
+    low_stock = parse_bool("low_stock")
+    if low_stock is True:
+        q = q.where(low_stock_filter())
+    elif low_stock is False:
+        q = q.where(~low_stock_filter())
+
+    if after:
+        name, pid = after
+        q = q.where(or_(
+            Product.name > name,
+            and_(Product.name == name, Product.id > pid),
+        ))
+
+    q = q.order_by(Product.name.asc(), Product.id.asc())
+    if parse_bool("stream"):
+        if fmt == "columnar":
+            return jsonify({"error": "columnar responses can't be streamed"}), 400
+        return stream_json(q, fields)
+
+    rows = db.session.execute(q.limit(limit + 1)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor((rows[-1].name, rows[-1].id))
+
+    return page_json(rows, fields, projector(q, fields), fmt, next_cursor)
 
 
 @bp.route("/products", methods=["POST"])
@@ -79,20 +165,33 @@ def add_product():
         supplier_id=supplier_id,
     )
     db.session.add(p)
+    aggregates.product_added(p)
     db.session.commit()
+    invalidate("products", "dashboard")
     return jsonify({"id": p.id}), 201
 
 
 @bp.route("/products/<int:id>", methods=["PUT"])
 def update_product(id):
-    p = Product.query.get_or_404(id)
+    # locked so a concurrent checkout can't move the stock between the
+    # snapshot and the update, which would make the aggregate delta stale
+    p = db.session.execute(
+        select(Product).where(Product.id == id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    ).scalar_one_or_none()
+    if p is None:
+        abort(404)
     data = request.json or {}
+    before = aggregates.snapshot(p)
 
     for k in ("name", "category", "price", "stock_quantity", "reorder_level", "supplier_id"):
         if k in data:
             setattr(p, k, data[k])
 
+    aggregates.product_changed(before, p)
     db.session.commit()
+    invalidate("products", "dashboard")
     return jsonify({"id": p.id})
 
 
@@ -114,120 +213,310 @@ def create_sale():
     if not items:
         return jsonify({"error": "No items in sale"}), 400
 
-    created_sales = []
     try:
-        for it in items:
-            pid = it.get("product_id")
-            qty = int(it.get("quantity", 0) or 0)
-
-            if not pid or qty <= 0:
-                continue
-
-            product = Product.query.get_or_404(pid)
-
-            if product.stock_quantity < qty:
-                return jsonify({"error": f"Not enough stock for {product.name}"}), 400
-
-            product.stock_quantity -= qty
-            total = qty * product.price
-
-            sale = Sale(
-                product_id=product.id,
-                quantity_sold=qty,
-                total_price=total
-            )
-            db.session.add(sale)
-            created_sales.append({
-                "product_id": product.id,
-                "product_name": product.name,
-                "qty": qty,
-                "total": total
-            })
-
-            # low stock notification
-            if product.stock_quantity <= product.reorder_level:
-                msg = f"Low stock: {product.name} (qty: {product.stock_quantity})"
-                notif = Notification(product_id=product.id, message=msg)
-                db.session.add(notif)
-
-        db.session.commit()
+        created_sales = run_in_transaction(run_checkout, items)
+        invalidate("products", "dashboard")
         return jsonify({"status": "ok", "sales": created_sales}), 201
 
+    except CheckoutError as e:
+        db.session.rollback()
+        return jsonify({"error": e.message}), e.status
+
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        return jsonify({"error": "db error", "detail": str(e)}), 500
+
+
+@bp.route("/sales/batch", methods=["POST"])
+def create_sales_batch():
+    """
+    Sales queued by an offline terminal, uploaded together:
+    {
+        "baskets": [
+            {"key": "<uuid per basket>", "items": [...], "sold_at": "2026-10-18T09:30:00Z"},
+            ...
+        ]
+    }
+    Each key sells at most once. Results come back per basket, in order:
+    "ok", "replayed" (key seen before: the original sales, nothing sold
+    again) or "error" (nothing sold and the key not kept, so resending is
+    safe). Baskets are sold SALES_BATCH_CHUNK per transaction.
+    """
+    data = request.json or {}
+    baskets = data.get("baskets")
+    if not isinstance(baskets, list) or not baskets:
+        return jsonify({"error": "No baskets in batch"}), 400
+    limit = current_app.config["SALES_BATCH_MAX"]
+    if len(baskets) > limit:
+        return jsonify({"error": f"At most {limit} baskets per batch"}), 400
+
+    try:
+        results = sell_batch(baskets, current_app.config["SALES_BATCH_CHUNK"])
     except SQLAlchemyError as e:
         db.session.rollback()
         return jsonify({"error": "db error", "detail": str(e)}), 500
 
+    counts = {"ok": 0, "replayed": 0, "error": 0}
+    for r in results:
+        counts[r["status"]] += 1
+    if counts["ok"]:
+        invalidate("products", "dashboard")
+    return jsonify({"results": results, "counts": counts})
+
 
 # ---------- SALES LIST (FOR DASHBOARD / REPORTS) ----------
 
+SALE_FIELDS = {
+    "id": Sale.id,
+    "product_name": Product.name.label("product_name"),
+    "quantity_sold": Sale.quantity_sold,
+    "total_price": Sale.total_price,
+    "sale_date": Sale.sale_date,
+}
+
+
 @bp.route("/sales", methods=["GET"])
 def list_sales():
     """
     Returns last 100 sales joined with product name
+    Query params: format=rows|columnar
     """
-    rows = (
-        db.session.query(Sale, Product.name)
-        .join(Product, Sale.product_id == Product.id)
+    try:
+        fmt = parse_format()
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+
+    q = (
+        select(*SALE_FIELDS.values())
+        .join_from(Sale, Product, Sale.product_id == Product.id)
         .order_by(Sale.sale_date.desc())
         .limit(100)
-        .all()
     )
+    rows = db.session.execute(q).all()
+    return page_json(rows, list(SALE_FIELDS), None, fmt)
 
-    return jsonify([
-        {
-            "id": s.Sale.id,
-            "product_name": s.name,
-            "quantity_sold": s.Sale.quantity_sold,
-            "total_price": float(s.Sale.total_price),
-            "sale_date": s.Sale.sale_date.isoformat()
-        }
-        for s in rows
-    ])
+
+# ---------- SALES TIME SERIES (FROM THE ROLLUP TABLES) ----------
+
+def parse_time(name, default):
+    raw = request.args.get(name)
+    if not raw:
+        return default
+    try:
+        ts = datetime.fromisoformat(raw)
+    except ValueError:
+        raise ValueError(f"{name} must be an ISO date or datetime")
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return ts
+
+
+@bp.route("/sales/timeseries", methods=["GET"])
+@cached("dashboard")
+def sales_timeseries():
+    """
+    Units, revenue and sale count per bucket, answered from the hourly /
+    daily rollups rather than the sales table.
+    Query params: granularity (hour|day|week|month, default day),
+    from / to (ISO, UTC unless an offset is given; default the last 30 days),
+    product_id or category
+    """
+    granularity = request.args.get("granularity", "day")
+    product_id = request.args.get("product_id", type=int)
+    category = request.args.get("category")
+    try:
+        end = parse_time("to", datetime.utcnow())
+        start = parse_time("from", end - timedelta(days=30))
+        if product_id is not None and category is not None:
+            raise ValueError("filter by product_id or category, not both")
+        buckets = rollups.series(granularity, start, end, product_id, category)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify({
+        "granularity": granularity,
+        "from": start.isoformat(),
+        "to": end.isoformat(),
+        "product_id": product_id,
+        "category": category,
+        "buckets": buckets,
+        "totals": {
+            "units": sum(b["units"] for b in buckets),
+            "revenue": round(sum(b["revenue"] for b in buckets), 2),
+            "sales": sum(b["sales"] for b in buckets),
+        },
+    })
 
 
 # ---------- NOTIFICATIONS ----------
 
+NOTIFICATION_FIELDS = {
+    "id": Notification.id,
+    "product_id": Notification.product_id,
+    "message": Notification.message,
+    "seen": Notification.seen,
+    "occurrences": Notification.occurrences,
+    "last_quantity": Notification.last_quantity,
+    "created_at": Notification.created_at,
+    "updated_at": Notification.updated_at,
+}
+
+
 @bp.route("/notifications", methods=["GET"])
 def list_notifications():
-    notifs = Notification.query.order_by(Notification.created_at.desc()).all()
-    return jsonify([
-        {
-            "id": n.id,
-            "product_id": n.product_id,
-            "message": n.message,
-            "seen": n.seen,
-            "created_at": n.created_at.isoformat() if n.created_at else None
-        }
-        for n in notifs
-    ])
+    """
+    Newest first, keyset-paginated on (created_at, id). Low-stock alerts
+    are coalesced: one open row per product, with occurrences and
+    last_quantity kept current by later sales.
+    Query params: limit, cursor, fields=a,b, unseen, product_id,
+    format=rows|columnar, stream (as for products)
+    """
+    try:
+        limit = parse_limit()
+        fields = parse_fields(NOTIFICATION_FIELDS)
+        fmt = parse_format()
+        cursor = request.args.get("cursor")
+        after = decode_cursor(cursor, (datetime, int)) if cursor else None
+        product_id = request.args.get("product_id", type=int)
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+
+    q = select_fields(NOTIFICATION_FIELDS, fields, ("created_at", "id"))
+
+    unseen = parse_bool("unseen")
+    if unseen is True:
+        q = q.where(Notification.seen == False)  # noqa: E712
+    elif unseen is False:
+        q = q.where(Notification.seen == True)  # noqa: E712
+    if product_id is not None:
+        q = q.where(Notification.product_id == product_id)
+
+    if after:
+        created_at, nid = after
+        q = q.where(or_(
+            Notification.created_at < created_at,
+            and_(Notification.created_at == created_at, Notification.id < nid),
+        ))
+
+    q = q.order_by(Notification.created_at.desc(), Notification.id.desc())
+    if parse_bool("stream"):
+        if fmt == "columnar":
+            return jsonify({"error": "columnar responses can't be streamed"}), 400
+        return stream_json(q, fields)
+
+    rows = db.session.execute(q.limit(limit + 1)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor((rows[-1].created_at, rows[-1].id))
+
+    return page_json(rows, fields, projector(q, fields), fmt, next_cursor)
 
 
 @bp.route("/notifications/<int:id>/seen", methods=["POST"])
 def mark_seen(id):
     n = Notification.query.get_or_404(id)
     n.seen = True
+    n.open_product_id = None
     db.session.commit()
     return jsonify({"id": n.id, "seen": n.seen})
 
 
+@bp.route("/notifications/seen", methods=["POST"])
+def mark_seen_bulk():
+    """
+    Acknowledge many notifications with one UPDATE.
+    JSON: {"ids": [1, 2]} or a filter {"product_id": 3, "before": ISO}
+    (either or both), or {"all": true}. Returns {"updated": n}.
+    """
+    data = request.json or {}
+    ids = data.get("ids")
+    product_id = data.get("product_id")
+    before = data.get("before")
+    if ids is not None and (not isinstance(ids, list)
+                            or not all(isinstance(i, int) for i in ids)):
+        return jsonify({"error": "ids must be a list of integers"}), 400
+    if ids is None and product_id is None and before is None and data.get("all") is not True:
+        return jsonify({"error": "send ids, a product_id / before filter, or all: true"}), 400
+    try:
+        product_id = int(product_id) if product_id is not None else None
+        before = datetime.fromisoformat(before) if before is not None else None
+    except (TypeError, ValueError):
+        return jsonify({"error": "product_id must be an integer and before an ISO datetime"}), 400
+    if before is not None and before.tzinfo is not None:
+        before = before.astimezone(timezone.utc).replace(tzinfo=None)
+
+    updated = notifications.mark_seen(ids, product_id, before)
+    return jsonify({"updated": updated})
+
+
+def notifications_after(last_id, product_id=None):
+    """Notification payloads with id > last_id, oldest first, up to SSE_BACKFILL_LIMIT."""
+    q = select(*NOTIFICATION_FIELDS.values()).where(Notification.id > last_id)
+    if product_id is not None:
+        q = q.where(Notification.product_id == product_id)
+    rows = db.session.execute(
+        q.order_by(Notification.id.asc()).limit(notification_events.backfill_limit)
+    ).all()
+    return [serialize_row(n, NOTIFICATION_FIELDS) for n in rows]
+
+
+@bp.route("/notifications/stream", methods=["GET"])
+@use_primary
+def notification_stream():
+    """
+    Server-Sent Events feed of new notifications (event: notification,
+    data: same shape as a /notifications row, id: notification id).
+    Only new rows are sent; a client reconnecting with Last-Event-ID (or
+    ?last_event_id=) first gets whatever it missed from the database.
+    Query params: product_id
+    """
+    product_id = request.args.get("product_id", type=int)
+    last_id = request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
+    try:
+        last_id = int(last_id) if last_id else None
+    except ValueError:
+        return jsonify({"error": "Last-Event-ID must be a notification id"}), 400
+
+    # take the broker position before reading the table so nothing committed
+    # in between is missed; the stream drops anything sent twice
+    position = notification_events.position()
+    if last_id is None:
+        last_id = db.session.execute(select(func.max(Notification.id))).scalar() or 0
+        backlog = []
+    else:
+        backlog = notifications_after(last_id, product_id)
+    db.session.close()  # the stream may stay open for minutes; don't pin a connection
+
+    body = notification_events.stream(
+        position, backlog, last_id,
+        refill=lambda after: notifications_after(after, product_id),
+        matches=lambda n: product_id is None or n["product_id"] == product_id,
+    )
+    return Response(body, mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",  # nginx / Render proxy must not buffer events
+    })
+
+
 # ---------- DASHBOARD SUMMARY (KPIs + CHART DATA) ----------
 
 @bp.route("/dashboard-summary", methods=["GET"])
+@cached("dashboard")
 def dashboard_summary():
-    product_count = Product.query.count()
+    # product count + stock value come from the per-category aggregate rows
+    categories = CategoryStats.query.filter(
+        CategoryStats.product_count > 0
+    ).order_by(CategoryStats.category.asc()).all()
+
+    product_count = sum(c.product_count for c in categories)
+    stock_value = sum(c.stock_value for c in categories)
     supplier_count = Supplier.query.count()
 
-    low_stock_items = Product.query.filter(
-        Product.stock_quantity <= Product.reorder_level
-    ).all()
+    low_stock_items = Product.query.filter(low_stock_filter()).all()
     low_stock_count = len(low_stock_items)
 
-    stock_value = (
-        db.session.query(
-            func.coalesce(func.sum(Product.stock_quantity * Product.price), 0.0)
-        ).scalar()
-    )
-
     # low stock items
     low_stock_payload = [
         {
@@ -260,28 +549,17 @@ def dashboard_summary():
     ]
 
     # stock by category (for chart)
-    stock_by_category_raw = (
-        db.session.query(
-            Product.category,
-            func.coalesce(func.sum(Product.stock_quantity), 0)
-        )
-        .group_by(Product.category)
-        .all()
-    )
     stock_by_category = [
-        {"category": c or "Uncategorized", "stock": int(qty)}
-        for c, qty in stock_by_category_raw
+        {"category": c.category or "Uncategorized", "stock": int(c.stock)}
+        for c in categories
     ]
 
-    # sales by product (for chart)
+    # sales by product (for chart) -- top 7 from the running totals
     sales_by_product_raw = (
-        db.session.query(
-            Product.name,
-            func.coalesce(func.sum(Sale.total_price), 0)
-        )
-        .join(Product, Sale.product_id == Product.id)
-        .group_by(Product.name)
-        .order_by(func.sum(Sale.total_price).desc())
+        db.session.query(Product.name, ProductSalesTotal.revenue)
+        .join(Product, ProductSalesTotal.product_id == Product.id)
+        .filter(ProductSalesTotal.units_sold > 0)
+        .order_by(ProductSalesTotal.revenue.desc())
         .limit(7)
         .all()
     )
@@ -302,82 +580,110 @@ def dashboard_summary():
     })
 
 
+# ---------- CACHE STATS (OPS) ----------
+
+@bp.route("/cache/stats", methods=["GET"])
+def cache_stats():
+    return jsonify(response_cache.stats())
+
+
 # ---------- EXPORT SALES (CSV + PDF) ----------
 
 @bp.route("/sales/export/csv", methods=["GET"])
 def export_sales_csv():
-    since = datetime.utcnow() - timedelta(days=30)
-    rows = (
-        db.session.query(Sale, Product.name)
-        .join(Product, Sale.product_id == Product.id)
-        .filter(Sale.sale_date >= since)
-        .order_by(Sale.sale_date.desc())
-        .all()
-    )
-
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(["Date", "Product", "Quantity", "Total"])
-
-    for r in rows:
-        writer.writerow([
-            r.Sale.sale_date.strftime("%Y-%m-%d %H:%M"),
-            r.name,
-            r.Sale.quantity_sold,
-            float(r.Sale.total_price),
-        ])
+    """
+    Streams the sales report as CSV (chunked transfer, nothing buffered).
+    Query params: from, to (YYYY-MM-DD or ISO), product_id, category, gzip=1
+    """
+    try:
+        filters = parse_report_filters()
+    except ReportRangeError as e:
+        return jsonify({"error": str(e)}), 400
 
-    mem = io.BytesIO()
-    mem.write(output.getvalue().encode("utf-8"))
-    mem.seek(0)
+    gzip = parse_bool("gzip") is True
+    name = report_filename(filters, "csv.gz" if gzip else "csv")
 
-    return send_file(
-        mem,
-        as_attachment=True,
-        download_name="sales_last_30_days.csv",
-        mimetype="text/csv"
+    return Response(
+        stream_with_context(encode(iter_csv(filters), gzip=gzip)),
+        mimetype="application/gzip" if gzip else "text/csv",
+        headers={"Content-Disposition": f"attachment; filename={name}"},
     )
 
 
 @bp.route("/sales/export/pdf", methods=["GET"])
+@use_primary
 def export_sales_pdf():
-    since = datetime.utcnow() - timedelta(days=30)
-    rows = (
-        db.session.query(Sale, Product.name)
-        .join(Product, Sale.product_id == Product.id)
-        .filter(Sale.sale_date >= since)
-        .order_by(Sale.sale_date.desc())
-        .all()
-    )
+    """
+    Same filters as the CSV export. Rendering happens on the report queue:
+    returns the file once it exists, otherwise 202 with the job to poll.
+    """
+    try:
+        filters = parse_report_filters()
+    except ReportRangeError as e:
+        return jsonify({"error": str(e)}), 400
+
+    job = report_queue.submit(filters)
+    if job.status == "done":
+        return send_file(
+            report_queue.artifact_path(job),
+            as_attachment=True,
+            download_name=report_filename(filters, "pdf"),
+            mimetype="application/pdf"
+        )
+
+    resp = jsonify(job_payload(job))
+    resp.status_code = 202
+    resp.headers["Retry-After"] = "2"
+    resp.headers["Location"] = f"/api/reports/{job.id}"
+    return resp
+
+
+# ---------- REPORT JOBS (ASYNC PDF) ----------
+
+@bp.route("/reports", methods=["POST"])
+def create_report():
+    """
+    Expected JSON (all optional):
+    {"format": "pdf", "from": "2025-01-01", "to": "2025-01-31",
+     "product_id": 1, "category": "Drinks"}
+    """
+    data = request.json or {}
+    if data.get("format", "pdf") != "pdf":
+        return jsonify({"error": "Only pdf reports are supported"}), 400
+    try:
+        filters = parse_report_filters(data)
+    except ReportRangeError as e:
+        return jsonify({"error": str(e)}), 400
+
+    job = report_queue.submit(filters)
+    resp = jsonify(job_payload(job))
+    resp.status_code = 200 if job.status == "done" else 202
+    resp.headers["Location"] = f"/api/reports/{job.id}"
+    return resp
 
-    pdf = FPDF()
-    pdf.add_page()
-    pdf.set_font("Helvetica", size=16)
-    pdf.cell(0, 10, "Sales Report (Last 30 Days)", ln=True, align="C")
-    pdf.ln(4)
 
-    pdf.set_font("Helvetica", size=10)
+@bp.route("/reports/<job_id>", methods=["GET"])
+@use_primary
+def get_report(job_id):
+    job = ReportJob.query.get_or_404(job_id)
+    return jsonify(job_payload(job))
 
-    # table header
-    pdf.cell(40, 8, "Date", border=1)
-    pdf.cell(60, 8, "Product", border=1)
-    pdf.cell(25, 8, "Qty", border=1, align="R")
-    pdf.cell(35, 8, "Total", border=1, align="R")
-    pdf.ln(8)
 
-    for r in rows:
-        pdf.cell(40, 8, r.Sale.sale_date.strftime("%Y-%m-%d"), border=1)
-        pdf.cell(60, 8, r.name[:28], border=1)
-        pdf.cell(25, 8, str(r.Sale.quantity_sold), border=1, align="R")
-        pdf.cell(35, 8, f"${float(r.Sale.total_price):.2f}", border=1, align="R")
-        pdf.ln(8)
+@bp.route("/reports/<job_id>/file", methods=["GET"])
+@use_primary
+def download_report(job_id):
+    job = ReportJob.query.get_or_404(job_id)
+    if job.status != "done":
+        return jsonify({"error": f"Report is {job.status}"}), 409
 
-    mem = io.BytesIO(pdf.output(dest="S"))
-    mem.seek(0)
+    path = report_queue.artifact_path(job)
+    if not os.path.exists(path):
+        return jsonify({"error": "Report file expired, submit it again"}), 410
 
+    since = datetime.fromisoformat(json.loads(job.params)["since"])
     return send_file(
-        mem,
+        path,
         as_attachment=True,
-        download_name="sales_last_30_days.pdf",
+        download_name=f"sales_report_{since:%Y%m%d}_{job.id[:8]}.pdf",
         mimetype="application/pdf"
     )
@@ -1,6 +1,8 @@
 from app import create_app
 from models import db, Supplier, Product, Sale
 from datetime import datetime, timedelta
+import aggregates
+import rollups
 import random
 
 app = create_app()
@@ -67,4 +69,8 @@ with app.app_context():
         p.stock_quantity = max(0, p.stock_quantity - qty)
 
     db.session.commit()
+
+    # dashboard aggregate and sales rollup tables
+    aggregates.rebuild()
+    rollups.rebuild()
     print("Seeded suppliers, products, and sales ✔")
@@ -0,0 +1,70 @@
+"""
+Staged SSE events follow the outermost transaction: published on commit,
+dropped on rollback, untouched by a savepoint rolling back.
+
+    python -m pytest tests
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+if not os.getenv("DATABASE_URL"):
+    _tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+    os.environ["DATABASE_URL"] = f"sqlite:///{_tmp.name}"
+
+from sqlalchemy.exc import IntegrityError
+from app import create_app
+from models import db, Product
+from events import notification_events
+
+
+@pytest.fixture
+def app():
+    app = create_app()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        db.session.add(Product(id=1, name="A", category="C", price=1.0,
+                               stock_quantity=1, reorder_level=0))
+        db.session.commit()
+        yield app
+        db.session.remove()
+
+
+def published_since(pos):
+    _, events, _ = notification_events.wait(pos, 0)
+    return [payload for _, payload in events]
+
+
+def test_commit_publishes(app):
+    pos = notification_events.position()
+    notification_events.stage(db.session, [{"id": 1}])
+    db.session.commit()
+    assert published_since(pos) == [{"id": 1}]
+
+
+def test_rollback_drops(app):
+    pos = notification_events.position()
+    db.session.get(Product, 1).stock_quantity = 0
+    notification_events.stage(db.session, [{"id": 2}])
+    db.session.rollback()
+    db.session.commit()
+    assert published_since(pos) == []
+
+
+def test_savepoint_rollback_keeps_staged_events(app):
+    pos = notification_events.position()
+    notification_events.stage(db.session, [{"id": 3}])
+    # the rollups.add fallback: a savepoint INSERT loses a race and rolls back
+    with pytest.raises(IntegrityError):
+        with db.session.begin_nested():
+            db.session.add(Product(id=1, name="dup", category="C", price=1.0,
+                                   stock_quantity=1, reorder_level=0))
+            db.session.flush()
+    assert db.session.info.get("pending_events")
+    db.session.commit()
+    assert published_since(pos) == [{"id": 3}]
@@ -6,4 +6,18 @@ const api = axios.create({
   baseURL: API_BASE,
 });
 
+// list endpoints are keyset-paginated: follow X-Next-Cursor until exhausted
+export async function getAllPages(path, params = {}) {
+  const rows = [];
+  let cursor;
+  do {
+    const res = await api.get(path, {
+      params: { ...params, ...(cursor ? { cursor } : {}) },
+    });
+    rows.push(...res.data);
+    cursor = res.headers["x-next-cursor"];
+  } while (cursor);
+  return rows;
+}
+
 export default api;
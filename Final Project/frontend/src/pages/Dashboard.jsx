@@ -14,6 +14,25 @@ export default function Dashboard() {
   const [summary, setSummary] = useState(null);
   const [loading, setLoading] = useState(true);
   const [chartKey, setChartKey] = useState(0); // redraw charts on theme change
+  const [pdfStatus, setPdfStatus] = useState("");
+
+  // PDF reports render in the background: queue a job, poll, then download
+  async function exportPdf() {
+    try {
+      setPdfStatus("Preparing PDF…");
+      let { data: job } = await api.post("/api/reports", { format: "pdf" });
+      while (job.status === "queued" || job.status === "running") {
+        await new Promise((resolve) => setTimeout(resolve, 1500));
+        ({ data: job } = await api.get(`/api/reports/${job.id}`));
+      }
+      if (job.status !== "done") throw new Error(job.error || "Report failed");
+      window.open(`${api.defaults.baseURL}${job.download_url}`, "_blank");
+      setPdfStatus("");
+    } catch (err) {
+      console.error("Failed to export PDF", err);
+      setPdfStatus("PDF export failed.");
+    }
+  }
 
   // Detect theme changes and re-render charts
   useEffect(() => {
@@ -83,10 +102,11 @@ export default function Dashboard() {
             Export Sales (CSV)
           </button>
           <button
-            onClick={() => window.open("https://smart-inventory-system-backend.onrender.com/api/sales/export/pdf", "_blank")}
+            onClick={exportPdf}
+            disabled={pdfStatus === "Preparing PDF…"}
             className="text-xs px-3 py-2 rounded-full border border-slate-900 bg-slate-900 text-white hover:bg-slate-800 dark:bg-slate-100 dark:text-slate-900 dark:hover:bg-slate-200"
           >
-            Export Sales (PDF)
+            {pdfStatus || "Export Sales (PDF)"}
           </button>
         </div>
       </div>
@@ -1,5 +1,5 @@
-import React, { useEffect, useState } from "react";
-import api from "../apiClient";
+import React, { useEffect, useRef, useState } from "react";
+import api, { getAllPages } from "../apiClient";
 
 export default function POS() {
   const [products, setProducts] = useState([]);
@@ -7,14 +7,15 @@ export default function POS() {
   const [selectedId, setSelectedId] = useState("");
   const [qty, setQty] = useState(1);
   const [status, setStatus] = useState("");
+  // one key per cart: resending after a dropped response can't sell it twice
+  const saleKey = useRef(null);
 
   useEffect(() => {
     fetchProducts();
   }, []);
 
   async function fetchProducts() {
-    const res = await api.get("/api/products");
-    setProducts(res.data);
+    setProducts(await getAllPages("/api/products", { limit: 500 }));
   }
 
   function addToCart() {
@@ -31,6 +32,7 @@ export default function POS() {
       }
       return [...prev, { product, quantity: qty }];
     });
+    saleKey.current = null;
     setQty(1);
     setSelectedId("");
   }
@@ -42,18 +44,30 @@ export default function POS() {
 
   async function handleCheckout() {
     if (cart.length === 0) return;
+    saleKey.current = saleKey.current || crypto.randomUUID();
     try {
       const payload = {
-        items: cart.map((item) => ({
-          product_id: item.product.id,
-          quantity: item.quantity,
-        })),
+        baskets: [
+          {
+            key: saleKey.current,
+            items: cart.map((item) => ({
+              product_id: item.product.id,
+              quantity: item.quantity,
+            })),
+          },
+        ],
       };
-      const res = await api.post("/api/sales", payload);
+      const res = await api.post("/api/sales/batch", payload);
+      const [result] = res.data.results;
+      if (result.status === "error") {
+        setStatus(result.error);
+        return;
+      }
       setStatus("Sale recorded successfully.");
       setCart([]);
+      saleKey.current = null;
       fetchProducts();
-      console.log(res.data);
+      console.log(result);
     } catch (err) {
       console.error(err);
       setStatus(
@@ -1,5 +1,5 @@
 import React, { useEffect, useMemo, useState } from "react";
-import api from '../apiClient';
+import api, { getAllPages } from '../apiClient';
 
 export default function Products() {
   const [products, setProducts] = useState([]);
@@ -21,8 +21,7 @@ export default function Products() {
   }, []);
 
   async function fetchProducts() {
-    const res = await api.get('/api/products');
-    setProducts(res.data);
+    setProducts(await getAllPages('/api/products', { limit: 500 }));
   }
 
   async function fetchSuppliers() {